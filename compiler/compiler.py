@@ -15,12 +15,17 @@ class ExecutionStep(BaseModel):
     config: Dict[str, Any]
     depends_on: List[str] # List of node_ids this step depends on
     input_bindings: List[InputBinding] = []
+    consumers: List[str] = [] # step_ids that read this step's output (liveness)
+    retain_output: bool = True # False once the output is dead after its last consumer ran
 
 class ExecutionPlan(BaseModel):
     flow_id: str
     steps: List[ExecutionStep]
     metadata: Dict[str, Any]
 
+# Outputs of these node types are the flow's results and are never released early
+FINAL_NODE_TYPES = {"api.endpoint"}
+
 class AIONCompiler:
     def __init__(self):
         pass
@@ -51,6 +56,10 @@ class AIONCompiler:
             node = node_map[node_id]
             # Find dependencies (parents)
             dependencies = list(validator.graph.predecessors(node_id))
+            # Liveness: the output is needed until every consumer has run;
+            # sinks and api.endpoint outputs are the results of the flow.
+            consumers = [f"step_{child}" for child in validator.graph.successors(node_id)]
+            retain_output = not consumers or node.type in FINAL_NODE_TYPES
 
             bindings = []
             for edge in incoming_edges.get(node_id, []):
@@ -72,6 +81,8 @@ class AIONCompiler:
                 config=node.config,
                 depends_on=dependencies,
                 input_bindings=bindings,
+                consumers=consumers,
+                retain_output=retain_output,
             )
             steps.append(step)
 
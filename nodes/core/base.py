@@ -1,12 +1,85 @@
+import os
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .table import Table
+
+# time.monotonic() by which the current execution must finish (set by the runtime)
+execution_deadline: ContextVar[Optional[float]] = ContextVar("aion_execution_deadline", default=None)
+
+# `await process_runner.get()(fn, *args)` runs a picklable fn in the runtime's process pool.
+# Set by the runtime on its own event loop; None inside the pool's workers and when
+# offloading is disabled (NODE_PROCESS_POOL_SIZE=0), where nodes do the work inline.
+process_runner: ContextVar[Optional[Callable[..., Awaitable[Any]]]] = ContextVar("aion_process_runner", default=None)
+
+
+def file_signature(path: Optional[str]) -> Optional[tuple]:
+    """(path, mtime, size) of a file, used to invalidate cached results when it changes."""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (str(path), None, None)
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+async def iter_batches(value: Any) -> AsyncIterator[Any]:
+    """Iterate a streamed input batch by batch; a materialized value is a single batch."""
+    if value is None:
+        return
+    if hasattr(value, "__aiter__"):
+        async for batch in value:
+            yield batch
+    else:
+        yield value
+
+
+def is_batched(value: Any) -> bool:
+    """Whether a stream() output value is a batch of rows (concatenated across batches)."""
+    return isinstance(value, (list, Table))
+
+
+def merge_batch(result: Dict[str, Any], batch: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold one stream() batch into the equivalent execute() result."""
+    for key, value in batch.items():
+        if isinstance(value, list):
+            result.setdefault(key, []).extend(value)
+        elif isinstance(value, Table):
+            existing = result.get(key)
+            if isinstance(existing, Table):
+                existing.append(value)
+            else:
+                # Own copy, so appending never touches a table the node handed out
+                result[key] = value.copy()
+        else:
+            result[key] = value
+    return result
+
 
 class BaseNode(ABC):
     """
     Abstract Base Class for all AION Nodes.
     Enforces a standard interface for execution.
     """
-    
+
+    # Deterministic nodes opt into step result memoization (see runtime/cache.py).
+    # Both can be overridden per node in the DSL with config "cache" / "cache_ttl".
+    cacheable: bool = False
+    cache_ttl: Optional[float] = None
+
+    # Nodes implementing stream() can be pipelined with their streaming neighbours
+    streaming: bool = False
+
+    # Nodes with a vectorized execute_batch() get all items of a batch execution in one call
+    batchable: bool = False
+
+    # CPU-heavy nodes run in the runtime's process pool instead of on the event loop;
+    # their config, inputs and outputs must be picklable.
+    cpu_bound: bool = False
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
 
@@ -14,12 +87,69 @@ class BaseNode(ABC):
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute the node's logic.
-        
+
         Args:
-            inputs: A dictionary where keys are input port names (or previous node IDs) 
+            inputs: A dictionary where keys are input port names (or previous node IDs)
                    and values are the data received.
-        
+
         Returns:
             A dictionary representing the outputs of this node.
         """
         pass
+
+    async def execute_batch(self, inputs_batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute the node once per item of a batch execution. Nodes that can
+        vectorize across items set batchable = True and override this; the
+        returned list must line up with inputs_batch.
+        """
+        return [await self.execute(inputs) for inputs in inputs_batch]
+
+    async def setup(self):
+        """
+        Called once when a new instance is created, before its first execute().
+        Instances are pooled and reused across steps with the same config, so
+        expensive state (clients, models, compiled patterns) belongs here.
+        """
+        pass
+
+    async def teardown(self):
+        """Release whatever setup() acquired; called when the pool evicts the instance."""
+        pass
+
+    async def stream(self, inputs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Optional batched counterpart of execute() for nodes with streaming = True.
+
+        Inputs fed by an upstream streaming step arrive as async iterators of
+        batches (read them with iter_batches). Each yielded dict is a batch of
+        outputs: list and Table values of successive batches concatenate into
+        the execute() result, other values are taken from the last batch.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+        yield
+
+    def remaining_time(self) -> Optional[float]:
+        """
+        Seconds left before the execution's deadline, or None without one.
+        Nodes waiting on external systems should use it to bound their own
+        timeouts, since the runtime abandons the step once it runs out.
+        """
+        deadline = execution_deadline.get()
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+    def is_cacheable(self) -> bool:
+        """Whether identical (config, inputs) are guaranteed to produce the same outputs."""
+        return bool(self.config.get("cache", self.cacheable))
+
+    def get_cache_ttl(self) -> Optional[float]:
+        return self.config.get("cache_ttl", self.cache_ttl)
+
+    def cache_key(self, inputs: Dict[str, Any]) -> Any:
+        """
+        Extra data folded into the cache key, for state that lives outside
+        config and inputs (e.g. the mtime of a file the node reads).
+        """
+        return None
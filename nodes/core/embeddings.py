@@ -0,0 +1,224 @@
+"""
+Embedding providers and the process-wide embedding cache.
+
+A provider turns a list of texts into an (n, dimension) float32 matrix of
+L2-normalized rows. The built-in local provider needs no network or model
+files: word unigrams and bigrams are hashed into signed buckets (feature
+hashing, i.e. a sparse random projection of the bag of words), so it is
+deterministic across processes and cheap enough for CPU-only deployments.
+Other backends register a factory under their model name.
+
+Vectors are cached by (provider name, sha256 of the text), in memory and
+optionally in a SQLite file shared by every process, so unchanged chunks
+are never embedded twice.
+"""
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingProvider(ABC):
+    # Identifies the vector space; cached vectors are only reused under the same name
+    name: str = ""
+    dimension: int = 0
+
+    @abstractmethod
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dimension) float32 matrix of L2-normalized embeddings."""
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, dimension: int = 384, ngrams: int = 2):
+        self.dimension = dimension
+        self.ngrams = ngrams
+        self.name = f"local/hashing-{dimension}-{ngrams}"
+        # feature -> signed 1-based bucket; Python's hash() is salted per process, blake2b is not
+        self._buckets: Dict[str, int] = {}
+
+    def _bucket(self, feature: str) -> int:
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            bucket = (value >> 1) % self.dimension + 1
+            if value & 1:
+                bucket = -bucket
+            if len(self._buckets) >= 1 << 20:
+                self._buckets.clear()
+            self._buckets[feature] = bucket
+        return bucket
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD.findall(text.lower())
+        features = list(words)
+        for n in range(2, self.ngrams + 1):
+            features.extend(map(" ".join, zip(*(words[i:] for i in range(n)))))
+        return features
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        rows: List[int] = []
+        buckets: List[int] = []
+        known = self._buckets.get
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            rows.extend([row] * len(features))
+            # Buckets are never 0, so `or` only hashes features not seen before
+            buckets.extend([known(feature) or self._bucket(feature) for feature in features])
+
+        size = len(texts) * self.dimension
+        signed = np.asarray(buckets, dtype=np.int64)
+        index = np.asarray(rows, dtype=np.int64) * self.dimension + np.abs(signed) - 1
+        counts = np.bincount(index, weights=np.sign(signed).astype(np.float64), minlength=size)
+        # Sublinear term frequency, then unit length so cosine similarity is a dot product
+        matrix = (np.sign(counts) * np.log1p(np.abs(counts))).reshape(len(texts), self.dimension)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix.astype(np.float32)
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return await asyncio.to_thread(self.encode, texts)
+
+
+LOCAL_MODEL = "local/hashing"
+
+_factories: Dict[str, Callable[[int], EmbeddingProvider]] = {
+    "local": lambda dimension: HashingEmbeddingProvider(dimension),
+    LOCAL_MODEL: lambda dimension: HashingEmbeddingProvider(dimension),
+}
+_providers: Dict[Tuple[str, int], EmbeddingProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def register_provider(model: str, factory: Callable[[int], EmbeddingProvider]):
+    """Serve `model` with providers built by factory(dimension)."""
+    with _providers_lock:
+        _factories[model] = factory
+        for key in [key for key in _providers if key[0] == model]:
+            del _providers[key]
+
+
+def get_provider(model: str, dimension: int = 384) -> EmbeddingProvider:
+    """
+    The provider for a model name. Unregistered models raise ValueError rather
+    than silently embedding with another backend; use LOCAL_MODEL for the
+    built-in one.
+    """
+    with _providers_lock:
+        provider = _providers.get((model, dimension))
+        if provider is None:
+            factory = _factories.get(model)
+            if factory is None:
+                raise ValueError(
+                    f"No embedding provider registered for model {model!r}; "
+                    f"use {LOCAL_MODEL!r} or register one with register_provider()."
+                )
+            provider = _providers[(model, dimension)] = factory(dimension)
+        return provider
+
+
+class EmbeddingCache:
+    def __init__(self, max_entries: int = 100_000, path: Optional[str] = None):
+        # In-memory LRU in front of an optional SQLite file (None = memory only)
+        self.max_entries = max_entries
+        self.path = path
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, max_entries: int, path: Optional[str]):
+        with self._lock:
+            self.max_entries = max_entries
+            if path != self.path and self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self.path = path
+            self._trim()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path and self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL lets workers read while another process writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, digest TEXT NOT NULL, vector BLOB NOT NULL, PRIMARY KEY (model, digest))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _trim(self):
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, digests: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors of the given text digests; digests not cached are left out."""
+        found: Dict[str, np.ndarray] = {}
+        wanted = list(dict.fromkeys(digests))
+        with self._lock:
+            missing = []
+            for digest in wanted:
+                vector = self._memory.get((model, digest))
+                if vector is None:
+                    missing.append(digest)
+                else:
+                    self._memory.move_to_end((model, digest))
+                    found[digest] = vector
+
+            conn = self._connection()
+            if conn is not None:
+                # Stay under SQLite's bound parameter limit
+                for start in range(0, len(missing), 500):
+                    part = missing[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT digest, vector FROM embeddings WHERE model = ? AND digest IN ({','.join('?' * len(part))})",
+                        [model, *part],
+                    ).fetchall()
+                    for digest, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[digest] = vector
+                        self._memory[(model, digest)] = vector
+                self._trim()
+
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, np.ndarray]]):
+        rows = []
+        with self._lock:
+            for digest, vector in items:
+                vector = np.array(vector, dtype=np.float32)
+                vector.flags.writeable = False
+                self._memory[(model, digest)] = vector
+                rows.append((model, digest, vector.tobytes()))
+            self._trim()
+            conn = self._connection()
+            if conn is not None and rows:
+                conn.executemany("INSERT OR REPLACE INTO embeddings (model, digest, vector) VALUES (?, ?, ?)", rows)
+                conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("DELETE FROM embeddings")
+                conn.commit()
+
+
+# Shared by every embedding node in this process
+embedding_cache = EmbeddingCache()
@@ -1,6 +1,9 @@
+import logging
 from typing import Dict, Any
 from .base import BaseNode
 
+logger = logging.getLogger(__name__)
+
 class LLMGenerateNode(BaseNode):
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         prompt_template = self.config.get("prompt", "")
@@ -11,7 +14,7 @@ class LLMGenerateNode(BaseNode):
         for key, val in inputs.items():
             context_str += f"{key}: {val}\n"
             
-        print(f"  [LLMGenerate] Generating with {model}. Prompt len: {len(prompt_template)}")
+        logger.info("Generating with %s. Prompt len: %s", model, len(prompt_template))
         
         # Mock LLM generation
         return {
@@ -30,7 +33,7 @@ class AgentRouterNode(BaseNode):
         elif "tech support" in user_input.lower():
             intent = "support_flow"
             
-        print(f"  [AgentRouter] Routing to: {intent}")
+        logger.info("Routing to: %s", intent)
         return {
             "route": intent,
             "confidence": 0.95
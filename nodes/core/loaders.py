@@ -1,22 +1,32 @@
+import logging
 from typing import Dict, Any
-from .base import BaseNode
+from .base import BaseNode, file_signature
+
+logger = logging.getLogger(__name__)
 
 class PdfLoaderNode(BaseNode):
+    cacheable = True
+
+    def cache_key(self, inputs: Dict[str, Any]) -> Any:
+        return file_signature(self.config.get("path"))
+
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         path = self.config.get("path")
         if not path:
-            print("Warning: No path provided for PDF Loader")
+            logger.warning("No path provided for PDF Loader")
             return {"content": ""}
             
         # In a real impl, we would use pypdf or similar.
         # For MVP/Sim, we return a mock string.
-        print(f"  [PdfLoader] Loading file: {path}")
+        logger.info("Loading file: %s", path)
         return {
             "content": f"Content loaded from PDF at {path}. (Simulated)",
             "metadata": {"source": path, "type": "pdf"}
         }
 
 class StaticTextNode(BaseNode):
+    cacheable = True
+
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         text = self.config.get("text", "")
         return {"content": text}
@@ -26,7 +36,7 @@ class SqlLoaderNode(BaseNode):
         query = self.config.get("query", "")
         if not query:
             return {"rows": [], "warning": "No SQL query provided."}
-        print(f"  [SqlLoader] Executing query: {query}")
+        logger.info("Executing query: %s", query)
         # Mocked rows for MVP
         return {"rows": [{"id": 1, "result": "sample"}], "query": query}
 
@@ -37,7 +47,7 @@ class ApiLoaderNode(BaseNode):
         payload = self.config.get("payload")
         if not url:
             return {"response": None, "warning": "No URL provided."}
-        print(f"  [ApiLoader] Fetching {method} {url}")
+        logger.info("Fetching %s %s", method, url)
         return {"response": {"status": "ok", "url": url, "method": method, "payload": payload}}
 
 class WebLoaderNode(BaseNode):
@@ -45,5 +55,5 @@ class WebLoaderNode(BaseNode):
         url = self.config.get("url")
         if not url:
             return {"content": "", "warning": "No URL provided."}
-        print(f"  [WebLoader] Scraping {url}")
+        logger.info("Scraping %s", url)
         return {"content": f"Content scraped from {url}. (Simulated)", "metadata": {"source": url}}
@@ -0,0 +1,124 @@
+"""
+Process-wide registry of unpickled models.
+
+Model nodes ask the registry for a path instead of unpickling it on every
+execution. A file is loaded once per process and served from memory until
+it changes on disk: every lookup stats the file, and when mtime/size moved
+the content hash decides whether it is really a new model (hot reload) or
+just a touched file. Loaded models are evicted least recently used first
+once their combined size passes the budget; a model's size is taken to be
+its pickle's size.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("signature", "digest", "model", "nbytes")
+
+    def __init__(self, signature: Tuple[int, int], digest: str, model: Any, nbytes: int):
+        self.signature = signature
+        self.digest = digest
+        self.model = model
+        self.nbytes = nbytes
+
+
+class ModelRegistry:
+    def __init__(self, max_bytes: int = 0):
+        # 0 = no size budget
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict = {}
+        self.hits = 0
+        self.loads = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and os.path.realpath(path) in self._entries
+
+    def get(self, path: str) -> Any:
+        """The model pickled at `path`, loading or reloading it if needed. Raises OSError if unreadable."""
+        key = os.path.realpath(path)
+        stat = os.stat(key)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # One thread loads a given file while others wait for it; different files load in parallel
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.signature == signature:
+                    self.hits += 1
+                    return entry.model
+            return self._load(key, signature, entry)
+
+    def _load(self, key: str, signature: Tuple[int, int], previous: Optional[_Entry]) -> Any:
+        with open(key, "rb") as handle:
+            data = handle.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        if previous is not None and previous.digest == digest:
+            # Touched or copied over with identical content: keep the loaded model
+            model = previous.model
+        else:
+            model = pickle.loads(data)
+            self.loads += 1
+            logger.info("Loaded model %s (%s bytes).", key, len(data))
+
+        with self._lock:
+            self._entries[key] = _Entry(signature, digest, model, len(data))
+            self._entries.move_to_end(key)
+            self._evict(keep=key)
+        return model
+
+    def _evict(self, keep: str):
+        if not self.max_bytes:
+            return
+        total = self.nbytes
+        for key in list(self._entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._entries.pop(key).nbytes
+            logger.info("Evicted model %s from the registry.", key)
+
+    def preload(self, paths: Iterable[str]) -> List[str]:
+        """Load the given models now; returns the paths that could not be loaded."""
+        failed = []
+        for path in paths:
+            try:
+                self.get(path)
+            except Exception as exc:
+                logger.warning("Could not preload model %s: %s", path, exc)
+                failed.append(path)
+        return failed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by every model node in this process
+model_registry = ModelRegistry()
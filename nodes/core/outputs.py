@@ -1,6 +1,9 @@
+import logging
 from typing import Dict, Any
 from .base import BaseNode
 
+logger = logging.getLogger(__name__)
+
 
 class ApiEndpointNode(BaseNode):
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
@@ -8,5 +11,5 @@ class ApiEndpointNode(BaseNode):
         if result is None and inputs:
             result = next(iter(inputs.values()))
         path = self.config.get("path", "/output")
-        print(f"  [ApiEndpoint] Emitting response on {path}")
+        logger.info("Emitting response on %s", path)
         return {"response": result, "path": path}
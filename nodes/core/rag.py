@@ -1,59 +1,409 @@
-from typing import Dict, Any, List
-from .base import BaseNode
+import asyncio
+import hashlib
+import logging
+import re
+import sqlite3
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .base import BaseNode, file_signature, iter_batches, merge_batch
+from .embeddings import LOCAL_MODEL, EmbeddingProvider, embedding_cache, get_provider, text_digest
+from .vector_index import vector_stores
+
+logger = logging.getLogger(__name__)
+
+# (start, end, text): character offsets of the chunk in the whole input
+Chunk = Tuple[int, int, str]
+
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s+")
+_PARAGRAPH_END = re.compile(r"\n[ \t]*\n\s*")
+_WHITESPACE = re.compile(r"\s+")
+_TOKEN = re.compile(r"\S+")
+# Boundaries tried in order for each boundary mode; whitespace keeps words whole
+_BOUNDARIES = {
+    "paragraph": (_PARAGRAPH_END, _SENTENCE_END, _WHITESPACE),
+    "sentence": (_SENTENCE_END, _WHITESPACE),
+    "none": (),
+}
+
+
+def iter_text_blocks(path: str, encoding: str = "utf-8", block_size: int = 1 << 20) -> Iterator[str]:
+    """Read a text file block_size characters at a time, so it never has to fit in memory."""
+    with open(path, "r", encoding=encoding, newline="") as handle:
+        while True:
+            block = handle.read(block_size)
+            if not block:
+                return
+            yield block
+
+
+def _last_boundary(text: str, low: int, high: int, patterns) -> Optional[int]:
+    """End of the last boundary match inside text[low:high], trying patterns in order."""
+    for pattern in patterns:
+        last = None
+        for match in pattern.finditer(text, low, high):
+            last = match.end()
+        if last is not None:
+            return last
+    return None
+
+
+def iter_char_chunks(blocks: Iterator[str], size: int, overlap: int, boundary: str = "none") -> Iterator[Chunk]:
+    """
+    Chunks of at most `size` characters, each starting `overlap` characters before
+    the previous one ended. With a boundary mode a chunk is cut at the last
+    paragraph/sentence/word break that still leaves it longer than the overlap.
+
+    Only the unconsumed tail plus the next block is buffered, and consumed text is
+    dropped only when a block is appended, so a single in-memory string is never
+    copied and memory stays bounded for file-backed input.
+    """
+    patterns = _BOUNDARIES[boundary]
+    buffer, buffer_start, position, exhausted = "", 0, 0, False
+    while True:
+        # One character past the window tells whether the text ends inside it
+        while not exhausted and buffer_start + len(buffer) <= position + size:
+            block = next(blocks, None)
+            if block is None:
+                exhausted = True
+            else:
+                buffer = buffer[position - buffer_start:] + block
+                buffer_start = position
+
+        low = position - buffer_start
+        high = min(low + size, len(buffer))
+        if low >= high:
+            return
+        at_end = exhausted and high == len(buffer)
+        if patterns and not at_end:
+            high = _last_boundary(buffer, low + overlap, high, patterns) or high
+        yield buffer_start + low, buffer_start + high, buffer[low:high]
+        if at_end:
+            return
+        position = buffer_start + high - overlap
+
+
+def _iter_token_spans(blocks: Iterator[str], state: Dict[str, Any]) -> Iterator[Tuple[int, int]]:
+    """Global (start, end) of whitespace-separated tokens; state["keep"] is the oldest offset still needed."""
+    buffer, buffer_start, scanned = "", 0, 0
+    for block in blocks:
+        keep = min(state["keep"], scanned) - buffer_start
+        buffer, buffer_start = buffer[keep:] + block, buffer_start + keep
+        state["buffer"], state["buffer_start"] = buffer, buffer_start
+        for match in _TOKEN.finditer(buffer, scanned - buffer_start):
+            if match.end() == len(buffer):
+                break  # may continue in the next block
+            scanned = buffer_start + match.end()
+            yield buffer_start + match.start(), scanned
+    for match in _TOKEN.finditer(buffer, scanned - buffer_start):
+        yield buffer_start + match.start(), buffer_start + match.end()
+
+
+def iter_token_chunks(blocks: Iterator[str], size: int, overlap: int, boundary: str = "none") -> Iterator[Chunk]:
+    """
+    Chunks of at most `size` whitespace-separated tokens overlapping by `overlap`
+    tokens. With a boundary mode a chunk ends at the last token that closes a
+    paragraph or sentence, as long as it keeps more tokens than the overlap.
+    """
+    state: Dict[str, Any] = {"keep": 0, "buffer": "", "buffer_start": 0}
+    window: List[Tuple[int, int]] = []
+    fresh = 0  # tokens in the window not emitted yet
+
+    def text(start: int, end: int) -> str:
+        return state["buffer"][start - state["buffer_start"]:end - state["buffer_start"]]
+
+    def breaks_after(index: int) -> bool:
+        gap = text(window[index][1] - 1, window[index + 1][0])
+        if boundary == "paragraph" and _PARAGRAPH_END.search(gap):
+            return True
+        return boundary in ("paragraph", "sentence") and _SENTENCE_END.match(gap) is not None
+
+    for span in _iter_token_spans(blocks, state):
+        window.append(span)
+        fresh += 1
+        # size + 1 tokens: the extra one shows what follows the last token of the chunk
+        if len(window) > size:
+            count = size
+            if boundary != "none":
+                count = next((index + 1 for index in range(size - 1, overlap - 1, -1) if breaks_after(index)), size)
+            yield window[0][0], window[count - 1][1], text(window[0][0], window[count - 1][1])
+            window = window[count - overlap:]
+            fresh = len(window) - overlap
+            state["keep"] = window[0][0]
+    if fresh > 0:
+        yield window[0][0], window[-1][1], text(window[0][0], window[-1][1])
+
 
 class ChunkTextNode(BaseNode):
-    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    cacheable = True
+    streaming = True
+
+    def cache_key(self, inputs: Dict[str, Any]) -> Any:
+        return file_signature(self.config.get("path") or inputs.get("path"))
+
+    @staticmethod
+    def _content(inputs: Dict[str, Any]) -> str:
         content = inputs.get("content", "")
-        # Handle cases where input is a dict from previous node
-        if isinstance(inputs, dict):
-             # Try to find 'content' from any input source
-             for k, v in inputs.items():
-                 if isinstance(v, dict) and "content" in v:
-                     content = v["content"]
-                     break
-        
-        chunk_size = self.config.get("size", 1000)
-        overlap = self.config.get("overlap", 100)
-        
-        print(f"  [ChunkText] Chunking content (len={len(content)}) into chunks of {chunk_size}")
-        
-        # Mock chunking
-        chunks = [content[i:i+chunk_size] for i in range(0, len(content), chunk_size - overlap)]
-        return {"chunks": chunks}
+        # Try to find 'content' from any input source (a previous node's whole output)
+        for value in inputs.values():
+            if isinstance(value, dict) and "content" in value:
+                return value["content"]
+        return content or ""
+
+    def _settings(self) -> Tuple[int, int, str, str, Optional[str]]:
+        size = int(self.config.get("size", 1000))
+        # The default overlap shrinks with small sizes; an explicit one must fit the size
+        overlap = int(self.config.get("overlap", min(100, size // 10)))
+        unit = self.config.get("unit", "chars")
+        boundary = self.config.get("boundary", "none")
+        error = None
+        if size <= 0 or overlap < 0:
+            error = "Chunk size must be positive and overlap non-negative."
+        elif overlap >= size:
+            error = f"Chunk overlap ({overlap}) must be smaller than the chunk size ({size})."
+        elif unit not in ("chars", "tokens"):
+            error = f"Unknown chunk unit: {unit}."
+        elif boundary not in _BOUNDARIES:
+            error = f"Unknown chunk boundary: {boundary}."
+        return size, overlap, unit, boundary, error
+
+    def _iter_chunk_batches(self, inputs: Dict[str, Any], batch_size: int) -> Iterator[Dict[str, List[Any]]]:
+        size, overlap, unit, boundary, _ = self._settings()
+        path = self.config.get("path") or inputs.get("path")
+        if path:
+            blocks = iter_text_blocks(path, self.config.get("encoding", "utf-8"))
+        else:
+            blocks = iter([self._content(inputs)])
+        chunker = iter_token_chunks if unit == "tokens" else iter_char_chunks
+
+        chunks: List[str] = []
+        offsets: List[List[int]] = []
+        for start, end, text in chunker(blocks, size, overlap, boundary):
+            chunks.append(text)
+            offsets.append([start, end])
+            if len(chunks) >= batch_size:
+                yield {"chunks": chunks, "offsets": offsets}
+                chunks, offsets = [], []
+        if chunks:
+            yield {"chunks": chunks, "offsets": offsets}
+
+    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"chunks": [], "offsets": []}
+        async for batch in self.stream(inputs):
+            merge_batch(result, batch)
+        return result
+
+    async def stream(self, inputs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        size, overlap, unit, boundary, error = self._settings()
+        if error:
+            yield {"chunks": [], "offsets": [], "error": error}
+            return
+        path = self.config.get("path") or inputs.get("path")
+        if path and not Path(path).exists():
+            yield {"chunks": [], "offsets": [], "error": f"Text file not found at {path}."}
+            return
+
+        logger.info("Chunking %s into chunks of %s %s", path or "content", size, unit)
+        batches = self._iter_chunk_batches(inputs, int(self.config.get("batch_size", 256)))
+        while True:
+            # Chunk off the event loop; large documents are split batch by batch
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                return
+            yield batch
+
 
 class EmbedNode(BaseNode):
+    cacheable = True
+    streaming = True
+
+    @staticmethod
+    def _chunks(inputs: Dict[str, Any]) -> Any:
+        if inputs.get("chunks") is not None:
+            return inputs["chunks"]
+        # A previous node's whole output wired without a target input
+        for value in inputs.values():
+            if isinstance(value, dict) and "chunks" in value:
+                return value["chunks"]
+        return []
+
+    async def _iter_micro_batches(self, chunks: Any, batch_size: int) -> AsyncIterator[List[str]]:
+        pending: List[str] = []
+        async for batch in iter_batches(chunks):
+            if isinstance(batch, str):
+                batch = [batch]
+            for chunk in batch:
+                if not isinstance(chunk, str):
+                    raise TypeError(f"Chunks must be strings, got {type(chunk).__name__}.")
+                pending.append(chunk)
+                if len(pending) >= batch_size:
+                    yield pending
+                    pending = []
+        if pending:
+            yield pending
+
+    async def _embed(self, provider: EmbeddingProvider, texts: List[str]) -> Tuple[List[str], np.ndarray]:
+        digests = [text_digest(text) for text in texts]
+        vectors = await asyncio.to_thread(embedding_cache.get_many, provider.name, digests)
+        # Each distinct uncached text is embedded once, even if it repeats in the batch
+        missing = {digest: text for digest, text in zip(digests, texts) if digest not in vectors}
+        if missing:
+            embedded = await provider.embed(list(missing.values()))
+            fresh = dict(zip(missing, embedded))
+            await asyncio.to_thread(embedding_cache.put_many, provider.name, fresh.items())
+            vectors.update(fresh)
+        return digests, np.stack([vectors[digest] for digest in digests])
+
+    def _output(self, provider: EmbeddingProvider, texts: List[str], digests: List[str], matrix: np.ndarray) -> Dict[str, Any]:
+        return {
+            "embeddings": list(matrix),
+            "chunks": texts,
+            "hashes": digests,
+            "model": provider.name,
+            "dimension": provider.dimension,
+        }
+
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        chunks = []
-        # Extract chunks from inputs
-        for v in inputs.values():
-            if isinstance(v, dict) and "chunks" in v:
-                chunks = v["chunks"]
-                break
-        
-        model = self.config.get("model", "openai/text-embedding-3-small")
-        print(f"  [Embed] Embedding {len(chunks)} chunks using {model}")
-        
-        # Mock embeddings
-        embeddings = [[0.1, 0.2, 0.3] for _ in chunks]
-        return {"embeddings": embeddings, "chunks": chunks}
+        result: Dict[str, Any] = {}
+        async for batch in self.stream(inputs):
+            merge_batch(result, batch)
+        return result
+
+    async def stream(self, inputs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        model = self.config.get("model", LOCAL_MODEL)
+        batch_size = int(self.config.get("batch_size", 64))
+        concurrency = int(self.config.get("concurrency", 1))
+        if batch_size <= 0 or concurrency <= 0:
+            yield {"embeddings": [], "chunks": [], "error": "Embedding batch_size and concurrency must be positive."}
+            return
+        try:
+            provider = get_provider(model, int(self.config.get("dimension", 384)))
+        except ValueError as exc:
+            yield {"embeddings": [], "chunks": [], "error": str(exc)}
+            return
+        logger.info("Embedding chunks with %s in batches of %s", provider.name, batch_size)
+
+        # Up to `concurrency` micro-batches in flight, yielded in input order
+        in_flight: Deque[Tuple[List[str], asyncio.Future]] = deque()
+        emitted = False
+        try:
+            async for texts in self._iter_micro_batches(self._chunks(inputs), batch_size):
+                in_flight.append((texts, asyncio.ensure_future(self._embed(provider, texts))))
+                if len(in_flight) >= concurrency:
+                    texts, task = in_flight.popleft()
+                    yield self._output(provider, texts, *await task)
+                    emitted = True
+            while in_flight:
+                texts, task = in_flight.popleft()
+                yield self._output(provider, texts, *await task)
+                emitted = True
+        except TypeError as exc:
+            yield {"embeddings": [], "chunks": [], "error": str(exc)}
+            return
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+        if not emitted:
+            yield self._output(provider, [], [], np.zeros((0, provider.dimension), dtype=np.float32))
+
+def _store_id(config: Dict[str, Any]) -> str:
+    index = config.get("index") or config.get("collection", "default")
+    return f"{index}-store"
+
+
+async def _collect(value: Any) -> List[Any]:
+    """A possibly streamed list input, as one list."""
+    items: List[Any] = []
+    async for batch in iter_batches(value):
+        items.extend(batch)
+    return items
+
 
 class VectorStoreNode(BaseNode):
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        # Would normally connect to Qdrant/Pinecone
-        print("  [VectorStore] Storing embeddings...")
-        index = self.config.get("index") or self.config.get("collection", "default")
-        return {"status": "indexed", "count": 10, "store_id": f"{index}-store"}
+        store_id = _store_id(self.config)
+        ports = {key: inputs.get(key) for key in ("embeddings", "chunks", "hashes", "model")}
+        # An EmbedNode's whole output wired without target inputs
+        for value in inputs.values():
+            if isinstance(value, dict) and "embeddings" in value:
+                ports = {key: ports[key] if ports[key] is not None else value.get(key) for key in ports}
+                break
 
-class RetrieveNode(BaseNode):
-    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        query = inputs.get("query", "test query")
-        store_id = inputs.get("store_id")
-        print(f"  [Retrieve] Searching for: {query} in store {store_id}")
-        
-        # Mock retrieval results
+        embeddings = await _collect(ports["embeddings"])
+        chunks = await _collect(ports["chunks"]) if ports["chunks"] is not None else None
+        hashes = await _collect(ports["hashes"]) if ports["hashes"] is not None else None
+        delete = inputs.get("delete") or self.config.get("delete") or []
+        if chunks is not None and len(chunks) != len(embeddings):
+            return {"error": f"Got {len(embeddings)} embeddings for {len(chunks)} chunks.", "store_id": store_id}
+        if hashes is None:
+            # Dedup by content; vectors without their text are keyed by their own bytes
+            if chunks is not None:
+                hashes = [text_digest(chunk) for chunk in chunks]
+            else:
+                hashes = [hashlib.sha256(np.asarray(vector, dtype=np.float32).tobytes()).hexdigest() for vector in embeddings]
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        try:
+            index = await asyncio.to_thread(
+                vector_stores.open, store_id, vectors.shape[1] if vectors.ndim == 2 and len(vectors) else None,
+            )
+            inserted, updated = await asyncio.to_thread(
+                index.upsert, hashes, vectors, chunks, ports["model"], int(self.config.get("ivf_min_rows", 50_000)),
+            )
+            deleted = await asyncio.to_thread(index.delete, delete) if delete else 0
+        except FileNotFoundError:
+            # Nothing to insert into a store that was never created
+            inserted = updated = deleted = size = 0
+        except (ValueError, sqlite3.Error) as exc:
+            return {"error": str(exc), "store_id": store_id}
+        else:
+            size = len(index)
+
+        logger.info("Indexed %s vectors into %s (%s new, %s updated, %s deleted)", len(vectors), store_id, inserted, updated, deleted)
         return {
-            "documents": [
-                {"content": "Retrieved doc 1", "score": 0.9},
-                {"content": "Retrieved doc 2", "score": 0.8}
-            ]
+            "status": "indexed",
+            "count": len(vectors),
+            "inserted": inserted,
+            "updated": updated,
+            "deleted": deleted,
+            "size": size,
+            "store_id": store_id,
         }
+
+
+class RetrieveNode(BaseNode):
+    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        store_id = inputs.get("store_id") or self.config.get("store_id") or _store_id(self.config)
+        query = inputs.get("query", self.config.get("query"))
+        if isinstance(query, dict):
+            query = query.get("content") or query.get("query")
+        k = int(self.config.get("top_k", self.config.get("k", 5)))
+        logger.info("Searching for: %s in store %s", query, store_id)
+
+        try:
+            index = await asyncio.to_thread(vector_stores.open, store_id)
+        except (FileNotFoundError, ValueError) as exc:
+            return {"documents": [], "error": str(exc)}
+
+        vector = inputs.get("query_embedding")
+        if vector is None:
+            if not isinstance(query, str) or not query:
+                return {"documents": [], "error": "RetrieveNode needs a query or a query_embedding."}
+            try:
+                provider = get_provider(self.config.get("model", LOCAL_MODEL), index.dimension)
+            except ValueError as exc:
+                return {"documents": [], "error": str(exc)}
+            if index.model and provider.name != index.model:
+                return {"documents": [], "error": f"Store {store_id} holds {index.model} embeddings, the query would use {provider.name}."}
+            vector = (await provider.embed([query]))[0]
+
+        try:
+            documents = await asyncio.to_thread(
+                index.search, vector, k, int(self.config.get("nprobe", 8)), bool(self.config.get("exact", False)),
+            )
+        except ValueError as exc:
+            return {"documents": [], "error": str(exc)}
+        return {"documents": documents, "store_id": store_id}
@@ -0,0 +1,92 @@
+"""
+Mergeable streaming summary of scores in [0, 1].
+
+A ScoreSketch keeps a fixed-bin histogram plus count/sum/min/max, so it
+is updated batch by batch in O(batch) time with constant memory, and two
+sketches (other batches, other workers) combine by adding their arrays.
+Quantiles are read off the histogram and are exact to within one bin
+width (1 / bins).
+
+Scores outside [0, 1] (raw model outputs, labels) are only clipped into
+the edge bins: count, mean, min/max and above_threshold use the raw
+values, and out_of_range counts how many were clipped, so quantiles of
+such data are flagged instead of silently wrong.
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+class ScoreSketch:
+    __slots__ = ("bins", "counts", "count", "total", "above", "out_of_range", "threshold", "minimum", "maximum")
+
+    def __init__(self, bins: int = 1000, threshold: float = 0.5):
+        self.bins = bins
+        self.threshold = threshold
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.above = 0
+        self.out_of_range = 0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+
+    def update(self, scores: Any):
+        scores = np.asarray(scores, dtype=np.float64).reshape(-1)
+        scores = scores[~np.isnan(scores)]
+        if not len(scores):
+            return
+        low, high = float(scores.min()), float(scores.max())
+        if low < 0.0 or high > 1.0:
+            self.out_of_range += int(np.count_nonzero((scores < 0.0) | (scores > 1.0)))
+        index = np.minimum((np.clip(scores, 0.0, 1.0) * self.bins).astype(np.int64), self.bins - 1)
+        self.counts += np.bincount(index, minlength=self.bins)
+        self.count += len(scores)
+        self.total += float(scores.sum())
+        self.above += int(np.count_nonzero(scores >= self.threshold))
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+
+    def merge(self, other: "ScoreSketch") -> "ScoreSketch":
+        if other.bins != self.bins or other.threshold != self.threshold:
+            raise ValueError("Only sketches with the same bins and threshold can be merged.")
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.above += other.above
+        self.out_of_range += other.out_of_range
+        for bound, pick in (("minimum", min), ("maximum", max)):
+            theirs = getattr(other, bound)
+            if theirs is not None:
+                mine = getattr(self, bound)
+                setattr(self, bound, theirs if mine is None else pick(mine, theirs))
+        return self
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        # Interpolate linearly inside the bin holding the q-th score
+        rank = q * self.count
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, max(rank, 1e-12)))
+        index = min(index, self.bins - 1)
+        before = cumulative[index - 1] if index else 0
+        within = (rank - before) / self.counts[index] if self.counts[index] else 0.0
+        value = (index + min(max(within, 0.0), 1.0)) / self.bins
+        return float(min(max(value, self.minimum), self.maximum))
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99)) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.minimum,
+            "max": self.maximum,
+            "quantiles": {f"p{round(q * 100):g}": self.quantile(q) for q in quantiles},
+            "above_threshold": self.above,
+            "above_threshold_share": self.above / self.count if self.count else None,
+            "out_of_range": self.out_of_range,
+        }
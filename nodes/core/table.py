@@ -0,0 +1,326 @@
+"""
+Columnar table shared by the tabular nodes.
+
+A Table is an ordered set of named columns, each a 1-D NumPy array of the
+same length: numeric columns use native dtypes, everything else is an
+object array. Nodes pass Tables between each other instead of lists of
+row dicts, so column names are stored once, numeric cells cost 8 bytes
+and column operations vectorize. Row dicts are only built at the API
+boundary (to_rows / json_default).
+
+Tables are treated as immutable: operations return new Tables that share
+the untouched column arrays.
+"""
+import hashlib
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _native_dtype(values: Sequence[Any]) -> Optional[Any]:
+    """
+    The NumPy dtype that holds every value exactly, or None. Only columns of a
+    single scalar type qualify: mixing 2 and 2.5 would read 2 back as 2.0.
+    """
+    types = set(map(type, values))
+    if len(types) != 1:
+        return None
+    kind = types.pop()
+    if issubclass(kind, (bool, np.bool_)):
+        return np.bool_
+    if issubclass(kind, (float, np.floating)):
+        return np.float64 if kind is float else kind
+    if issubclass(kind, (int, np.integer)):
+        return np.int64 if kind is int else kind
+    return None
+
+
+def as_column(values: Any) -> np.ndarray:
+    """
+    1-D array for a column: numeric/bool data of one type keeps a native dtype
+    when that is lossless, anything else (mixed int/float, ints beyond int64,
+    text) is stored as objects.
+    """
+    if isinstance(values, np.ndarray) and values.ndim == 1:
+        return values.astype(object) if values.dtype.kind in "US" else values
+    values = values if isinstance(values, (list, tuple)) else list(values)
+    if values and not isinstance(values[0], str):
+        dtype = _native_dtype(values)
+        if dtype is not None:
+            try:
+                return np.asarray(values, dtype=dtype)
+            except OverflowError:
+                # Python ints beyond int64 stay exact as objects
+                pass
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+# Inferred column kinds; a column locked to a numeric kind never widens to another number
+COLUMN_KINDS = ("int", "float", "str")
+
+
+def infer_column(values: Sequence[Optional[str]], kind: Optional[str] = None) -> Tuple[np.ndarray, Optional[str]]:
+    """
+    Parse a column of CSV strings into int64 or float64 when that loses nothing.
+
+    A batch is only converted if every cell is exactly the text the number
+    prints back as, so identifiers such as "007", "+5", "1e3", "0.10" or a
+    17-digit id stay strings, and so does any batch with an empty cell (the
+    original blank cannot be told apart from a parsed NaN). `kind` is the kind
+    earlier batches of the column settled on: a batch that does not fit it
+    falls back to strings instead of widening (int64 -> float64 rounds ids
+    above 2**53). A batch with no values keeps the incoming kind so the next
+    batch can still decide it.
+    """
+    if kind == "str" or not values:
+        return as_column(list(values)), kind
+    if not any(values):
+        return as_column(list(values)), kind
+    if None not in values:
+        strings = np.asarray(values, dtype=str)
+        if kind in (None, "int"):
+            try:
+                parsed = strings.astype(np.int64)
+            except (ValueError, OverflowError):
+                parsed = None
+            if parsed is not None and (parsed.astype(str) == strings).all():
+                return parsed, "int"
+        if kind in (None, "float"):
+            try:
+                parsed = strings.astype(np.float64)
+            except ValueError:
+                parsed = None
+            if (
+                parsed is not None and np.isfinite(parsed).all()
+                and list(map(str, parsed.tolist())) == list(values)
+            ):
+                return parsed, "float"
+    return as_column(list(values)), "str"
+
+
+def _null_column(length: int) -> np.ndarray:
+    return np.full(length, None, dtype=object)
+
+
+class Table:
+    __slots__ = ("_names", "_chunks", "_length")
+
+    def __init__(self, columns: Optional[Mapping[str, Any]] = None):
+        arrays = {str(name): as_column(values) for name, values in (columns or {}).items()}
+        lengths = {len(array) for array in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+        self._names: List[str] = list(arrays)
+        # Appended batches are kept as chunks and concatenated on first column access
+        self._chunks: List[Dict[str, np.ndarray]] = [arrays] if arrays else []
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]], columns: Optional[Sequence[str]] = None) -> "Table":
+        rows = rows if isinstance(rows, list) else list(rows)
+        if columns is None:
+            seen: Dict[str, None] = {}
+            for row in rows:
+                for key in row:
+                    seen.setdefault(key, None)
+            columns = list(seen)
+        return cls({name: [row.get(name) for row in rows] for name in columns})
+
+    @classmethod
+    def concat(cls, tables: Iterable["Table"]) -> "Table":
+        result = cls()
+        for table in tables:
+            result.append(table)
+        return result
+
+    # --- Shape and schema ---
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._names)
+
+    @property
+    def schema(self) -> Dict[str, str]:
+        """Column name -> dtype name ("float64", "int64", "bool", "object", ...)."""
+        return {name: str(array.dtype) for name, array in self.columns.items()}
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the column arrays (object cells count as pointers)."""
+        return sum(array.nbytes for chunk in self._chunks for array in chunk.values())
+
+    def __repr__(self) -> str:
+        return f"Table(rows={self._length}, schema={self.schema})"
+
+    # --- Column access ---
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        if len(self._chunks) > 1:
+            self._chunks = [{
+                name: np.concatenate([chunk[name] for chunk in self._chunks])
+                for name in self._names
+            }]
+        return dict(self._chunks[0]) if self._chunks else {}
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._names:
+            raise KeyError(name)
+        return self.columns[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.column(name) if name in self._names else default
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, names: Sequence[str]) -> "Table":
+        """Table whose columns are views of a 2-D matrix (use order="F" so each column is contiguous)."""
+        return cls({name: matrix[:, index] for index, name in enumerate(names)})
+
+    def to_matrix(self, names: Optional[Sequence[str]] = None, dtype: Any = np.float64) -> np.ndarray:
+        """
+        Columns as a 2-D (rows x names) matrix; missing names are zero columns.
+
+        A table built with from_matrix hands back its backing matrix when asked for
+        the same columns in the same order and dtype, without copying.
+        """
+        names = list(self._names if names is None else names)
+        columns = self.columns
+        base = columns[names[0]].base if names and names[0] in columns else None
+        if (
+            isinstance(base, np.ndarray) and base.ndim == 2 and base.dtype == dtype
+            and base.shape == (self._length, len(names))
+            and all(
+                name in columns and columns[name].base is base
+                and columns[name].__array_interface__["data"] == base[:, index].__array_interface__["data"]
+                for index, name in enumerate(names)
+            )
+        ):
+            return base
+        matrix = np.zeros((self._length, len(names)), dtype=dtype, order="F")
+        for index, name in enumerate(names):
+            if name in columns:
+                matrix[:, index] = columns[name]
+        return matrix
+
+    # --- Derived tables ---
+
+    def select(self, names: Sequence[str]) -> "Table":
+        """Columns in the given order; names the table lacks become null columns."""
+        columns = self.columns
+        return Table({name: columns[name] if name in columns else _null_column(self._length) for name in names})
+
+    def drop(self, names: Iterable[str]) -> "Table":
+        dropped = set(names)
+        return Table({name: array for name, array in self.columns.items() if name not in dropped})
+
+    def with_columns(self, columns: Mapping[str, Any]) -> "Table":
+        """Add or replace columns."""
+        merged = self.columns
+        merged.update(columns)
+        return Table(merged)
+
+    def slice(self, start: int, stop: Optional[int] = None) -> "Table":
+        return Table({name: array[start:stop] for name, array in self.columns.items()})
+
+    def append(self, other: "Table"):
+        """Append another table's rows in place (columns missing on either side are null-filled)."""
+        if not len(other) and not other._names:
+            return
+        for name in other._names:
+            if name not in self._names:
+                self._names.append(name)
+                for chunk in self._chunks:
+                    chunk[name] = _null_column(len(next(iter(chunk.values()))) if chunk else 0)
+        for chunk in other._chunks:
+            chunk_length = len(next(iter(chunk.values()))) if chunk else 0
+            self._chunks.append({
+                name: chunk[name] if name in chunk else _null_column(chunk_length)
+                for name in self._names
+            })
+        self._length += len(other)
+
+    def copy(self) -> "Table":
+        """Shallow copy: new chunk bookkeeping, shared column arrays."""
+        table = Table()
+        table._names = list(self._names)
+        table._chunks = [dict(chunk) for chunk in self._chunks]
+        table._length = self._length
+        return table
+
+    # --- Row views (API boundary) ---
+
+    @staticmethod
+    def _cells(array: np.ndarray) -> List[Any]:
+        # Float gaps (NaN) go back out as nulls, like the empty cells they came from
+        if array.dtype.kind == "f":
+            missing = np.isnan(array)
+            if missing.any():
+                cells = array.astype(object)
+                cells[missing] = None
+                return cells.tolist()
+        return array.tolist()
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {name: self._cells(array[index:index + 1])[0] for name, array in self.columns.items()}
+
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        names = self._names
+        for values in zip(*(self._cells(array) for array in self.columns.values())):
+            yield dict(zip(names, values))
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        if not self._names:
+            return []
+        return list(self.iter_rows())
+
+    def __getstate__(self):
+        return {"columns": self.columns, "names": self._names}
+
+    def __setstate__(self, state):
+        self._names = list(state["names"])
+        self._chunks = [state["columns"]] if state["names"] else []
+        self._length = len(next(iter(state["columns"].values()))) if state["names"] else 0
+
+
+def as_table(value: Any) -> Table:
+    """Accept a Table, a list of row dicts (the pre-columnar format) or nothing."""
+    if isinstance(value, Table):
+        return value
+    if not value:
+        return Table()
+    if isinstance(value, Mapping):
+        return Table(value)
+    return Table.from_rows(value)
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps default= hook that turns Tables and NumPy values into plain JSON data."""
+    if isinstance(value, Table):
+        return value.to_rows()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def content_digest(value: Any) -> Any:
+    """Stable content description of a Table or array, for cache fingerprints."""
+    if isinstance(value, Table):
+        return {"__table__": {name: content_digest(array) for name, array in value.columns.items()}}
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return value.tolist()
+        data = np.ascontiguousarray(value).tobytes()
+        return [str(value.dtype), list(value.shape), hashlib.sha256(data).hexdigest()]
+    if isinstance(value, np.generic):
+        return value.item()
+    return None
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Dict, Any
 from urllib import request
 from urllib.error import URLError, HTTPError
@@ -6,6 +7,14 @@ from .base import BaseNode
 
 
 class HttpToolNode(BaseNode):
+    cacheable = True
+    cache_ttl = 60
+
+    def is_cacheable(self) -> bool:
+        # Only safe, idempotent reads may be served from cache
+        method = self.config.get("method", "GET").upper()
+        return method in ("GET", "HEAD") and super().is_cacheable()
+
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         method = self.config.get("method", "GET").upper()
         url = self.config.get("url")
@@ -19,18 +28,30 @@ class HttpToolNode(BaseNode):
         if payload is not None:
             data = json.dumps(payload).encode("utf-8")
 
+        # Never wait on the remote side past the execution's deadline
+        timeout = float(self.config.get("timeout", 10))
+        remaining = self.remaining_time()
+        if remaining is not None:
+            if remaining <= 0:
+                return {"response": None, "error": "Execution deadline exceeded."}
+            timeout = min(timeout, remaining)
+
         req = request.Request(url, data=data, method=method, headers=headers)
         try:
-            with request.urlopen(req, timeout=10) as response:
-                body = response.read().decode("utf-8")
-                return {
-                    "response": {
-                        "status": response.status,
-                        "body": body,
-                        "headers": dict(response.headers),
-                    }
-                }
+            # Blocking I/O runs in a thread so a cancelled execution stops waiting right away
+            return {"response": await asyncio.to_thread(self._send, req, timeout)}
         except HTTPError as exc:
             return {"response": None, "error": f"HTTP error {exc.code}: {exc.reason}"}
         except URLError as exc:
             return {"response": None, "error": f"Request error: {exc.reason}"}
+        except TimeoutError:
+            return {"response": None, "error": f"Request timed out after {timeout:.1f}s"}
+
+    @staticmethod
+    def _send(req: request.Request, timeout: float) -> Dict[str, Any]:
+        with request.urlopen(req, timeout=timeout) as response:
+            return {
+                "status": response.status,
+                "body": response.read().decode("utf-8"),
+                "headers": dict(response.headers),
+            }
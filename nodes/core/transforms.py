@@ -1,7 +1,13 @@
+import logging
 from typing import Dict, Any
 from .base import BaseNode
+from .table import Table
+
+logger = logging.getLogger(__name__)
 
 class CleanTextNode(BaseNode):
+    cacheable = True
+
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         # Expecting input named 'content' or just taking the first available input
         content = ""
@@ -15,7 +21,7 @@ class CleanTextNode(BaseNode):
         
         remove_stopwords = self.config.get("remove_stopwords", False)
         
-        print(f"  [CleanText] Cleaning content (size: {len(content)})")
+        logger.info("Cleaning content (size: %s)", len(content))
         cleaned = content.strip().upper() # Simple mock transformation
         
         if remove_stopwords:
@@ -24,9 +30,14 @@ class CleanTextNode(BaseNode):
         return {"content": cleaned}
 
 class NormalizeNode(BaseNode):
+    cacheable = True
+
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         records = []
         for value in inputs.values():
+            if isinstance(value, Table):
+                records = value
+                break
             if isinstance(value, dict) and "rows" in value:
                 records = value["rows"]
                 break
@@ -35,7 +46,9 @@ class NormalizeNode(BaseNode):
                 break
 
         schema = self.config.get("schema", {})
-        print(f"  [Normalize] Normalizing {len(records)} records to schema: {list(schema.keys())}")
+        logger.info("Normalizing %s records to schema: %s", len(records), list(schema.keys()))
+        if isinstance(records, Table):
+            return {"normalized": records.select(list(schema.keys())) if schema else records}
         normalized = []
         for record in records:
             if isinstance(record, dict):
@@ -0,0 +1,399 @@
+"""
+In-process vector index persisted to memory-mapped files.
+
+Each store lives in its own directory under the registry's root, named by
+its store_id:
+
+    meta.json       dimension, rows used, capacity, embedding model, IVF state
+    vectors.f32     (capacity, dimension) float32 rows, memory-mapped
+    live.u8         1 for rows holding a document, 0 for unused/deleted ones
+    lists.i32       IVF list of each row (-1 = not assigned)
+    centroids.npy   IVF centroids, once trained
+    documents.db    SQLite: row, content hash (unique) and text of each document
+
+Vectors and queries are L2-normalized, so the inner product used for
+ranking is their cosine similarity. Search is exact (one matrix-vector
+product over the mapped rows) until the store holds ivf_min_rows
+documents; then spherical k-means centroids are trained and a query only
+scans the rows of its nprobe closest inverted lists. Rows written after
+that are assigned to their nearest centroid as they come, and the
+centroids are retrained once the store has grown 4x since training.
+
+Upserts dedupe by content hash: a known hash overwrites its row in place.
+Deleted rows are masked out rather than compacted.
+
+Processes on the same host (API, queue workers) can share a directory:
+writes hold an exclusive flock on the store's .lock file from reloading
+the latest state to replacing meta.json, searches hold a shared one, and
+every write bumps the generation in meta.json, which tells the other
+processes to reload. Without fcntl (Windows) and on network filesystems
+whose flock is not shared between hosts, only one process may write.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: locking stays within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_STORE_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$")
+_INITIAL_CAPACITY = 1024
+# Rows scored per matrix product in exact search, bounding the memory of one scan
+_SCAN_BLOCK = 1 << 18
+
+
+def _map(path: Path, dtype: Any, shape: Tuple[int, ...], fill: Any = 0) -> np.memmap:
+    """Memory-map an array file, creating it or growing it to `shape` (new space is filled with `fill`)."""
+    itemsize = np.dtype(dtype).itemsize
+    nbytes = int(np.prod(shape)) * itemsize
+    with open(path, "r+b" if path.exists() else "w+b") as handle:
+        previous = handle.seek(0, os.SEEK_END)
+        if previous < nbytes:
+            handle.truncate(nbytes)
+    array = np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+    if fill and previous < nbytes:
+        array.reshape(-1)[previous // itemsize:] = fill
+    return array
+
+
+def _top_k(rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k - 1)[:k]
+        rows, scores = rows[keep], scores[keep]
+    order = np.argsort(-scores, kind="stable")
+    return rows[order], scores[order]
+
+
+class VectorIndex:
+    def __init__(self, directory: Path, dimension: Optional[int] = None):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        self._lock_file: Optional[Any] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._generation: Optional[int] = None
+        if not (self.directory / "meta.json").exists() and dimension is None:
+            raise FileNotFoundError(f"Vector store {self.directory.name} does not exist.")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._locked(exclusive=True):
+            # Another process may have created the store since the check above
+            if (self.directory / "meta.json").exists():
+                self._reload()
+                return
+            self.meta: Dict[str, Any] = {
+                "dimension": int(dimension), "count": 0, "live": 0, "capacity": _INITIAL_CAPACITY,
+                "model": None, "trained_rows": 0, "generation": 0,
+            }
+            self._open_arrays()
+            self.centroids: Optional[np.ndarray] = None
+            self._write_meta()
+
+    @property
+    def dimension(self) -> int:
+        return self.meta["dimension"]
+
+    @property
+    def model(self) -> Optional[str]:
+        return self.meta["model"]
+
+    def __len__(self) -> int:
+        with self._locked(exclusive=False):
+            self._refresh()
+            return self.meta["live"]
+
+    # -- files ---------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """Hold the thread lock and the store's file lock (shared for reads, exclusive for writes)."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            if self._lock_file is None:
+                self._lock_file = open(self.directory / ".lock", "a+b")
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _open_arrays(self):
+        capacity, dimension = self.meta["capacity"], self.meta["dimension"]
+        self.vectors = _map(self.directory / "vectors.f32", np.float32, (capacity, dimension))
+        self.live = _map(self.directory / "live.u8", np.uint8, (capacity,))
+        self.lists = _map(self.directory / "lists.i32", np.int32, (capacity,), fill=-1)
+        # Rows grouped by IVF list (rebuilt lazily) and rows assigned since that grouping
+        self._order: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._pending: List[int] = []
+
+    def _reload(self, meta: Optional[Dict[str, Any]] = None):
+        self.meta = meta or json.loads((self.directory / "meta.json").read_text())
+        self._generation = self.meta.get("generation", 0)
+        self._open_arrays()
+        centroids = self.directory / "centroids.npy"
+        self.centroids = np.load(centroids) if self.meta["trained_rows"] and centroids.exists() else None
+
+    def _refresh(self):
+        """Pick up writes made by other processes; call with the file lock held."""
+        try:
+            meta = json.loads((self.directory / "meta.json").read_text())
+        except FileNotFoundError:
+            return
+        if meta.get("generation", 0) != self._generation:
+            self._reload(meta)
+
+    def _write_meta(self):
+        for array in (self.vectors, self.live, self.lists):
+            array.flush()
+        self.meta["generation"] = self._generation = self.meta.get("generation", 0) + 1
+        path = self.directory / "meta.json"
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.meta))
+        os.replace(tmp, path)
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.directory / "documents.db"), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents (row INTEGER PRIMARY KEY, hash TEXT NOT NULL UNIQUE, content TEXT)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _rows_of(self, hashes: Sequence[str]) -> Dict[str, int]:
+        rows: Dict[str, int] = {}
+        for start in range(0, len(hashes), 500):
+            part = list(hashes[start:start + 500])
+            query = f"SELECT hash, row FROM documents WHERE hash IN ({','.join('?' * len(part))})"
+            rows.update(self._db().execute(query, part).fetchall())
+        return rows
+
+    def _grow(self, needed: int):
+        capacity = self.meta["capacity"]
+        while capacity < needed:
+            capacity *= 2
+        if capacity != self.meta["capacity"]:
+            self.meta["capacity"] = capacity
+            order, offsets, pending = self._order, self._offsets, self._pending
+            self._open_arrays()
+            self._order, self._offsets, self._pending = order, offsets, pending
+
+    # -- IVF -----------------------------------------------------------------
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        lists = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), 65536):
+            block = np.asarray(vectors[start:start + 65536])
+            lists[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return lists
+
+    def _train(self, iterations: int = 10):
+        count = self.meta["count"]
+        rows = np.flatnonzero(self.live[:count])
+        nlist = max(1, int(np.sqrt(len(rows))))
+        rng = np.random.default_rng(0)
+        sample = np.asarray(self.vectors[np.sort(rng.choice(rows, min(len(rows), 64 * nlist), replace=False))])
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assigned = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assigned, kind="stable")
+            sizes = np.bincount(assigned, minlength=nlist)
+            starts = np.minimum(np.cumsum(sizes) - sizes, len(sample) - 1)
+            sums = np.add.reduceat(sample[order], starts, axis=0)
+            sums[sizes == 0] = 0
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Lists that lost every point keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids).astype(np.float32)
+
+        self.centroids = centroids
+        np.save(self.directory / "centroids.npy", centroids)
+        # Assigned straight from the mapped blocks; deleted rows are masked at search time anyway
+        self.lists[:count] = self._assign(self.vectors[:count])
+        self.meta["trained_rows"] = len(rows)
+        self._order = None
+        logger.info("Trained %s IVF lists over %s vectors in %s.", nlist, len(rows), self.directory.name)
+
+    def _group_lists(self):
+        count = self.meta["count"]
+        lists = np.asarray(self.lists[:count])
+        rows = np.flatnonzero((lists >= 0) & (np.asarray(self.live[:count]) == 1))
+        self._order = rows[np.argsort(lists[rows], kind="stable")].astype(np.int64)
+        self._offsets = np.searchsorted(lists[self._order], np.arange(len(self.centroids) + 1))
+        self._pending = []
+
+    # -- writes --------------------------------------------------------------
+
+    def upsert(
+        self, hashes: Sequence[str], vectors: np.ndarray, contents: Optional[Sequence[Optional[str]]] = None,
+        model: Optional[str] = None, ivf_min_rows: int = 50_000,
+    ) -> Tuple[int, int]:
+        """Insert or overwrite documents by content hash; returns (inserted, updated)."""
+        if not len(hashes):
+            return 0, 0
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(hashes):
+            raise ValueError(f"Expected {len(hashes)} vectors, one per hash.")
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Vectors have dimension {vectors.shape[1]}, the store expects {self.dimension}.")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+        with self._locked(exclusive=True):
+            self._refresh()
+            if model and self.meta["model"] and model != self.meta["model"]:
+                raise ValueError(f"Store was built with embeddings from {self.meta['model']}, got {model}.")
+            # The last occurrence of a hash repeated in the batch wins
+            latest = {digest: position for position, digest in enumerate(hashes)}
+            positions = np.fromiter(latest.values(), dtype=np.int64, count=len(latest))
+            existing = self._rows_of(list(latest))
+            new = [digest for digest in latest if digest not in existing]
+            start = self.meta["count"]
+            self._grow(start + len(new))
+            row_of = {**existing, **{digest: start + offset for offset, digest in enumerate(new)}}
+            rows = np.fromiter((row_of[digest] for digest in latest), dtype=np.int64, count=len(latest))
+
+            order = np.argsort(rows)
+            rows, positions = rows[order], positions[order]
+            self.vectors[rows] = vectors[positions]
+            self.live[rows] = 1
+            if self.centroids is not None:
+                self.lists[rows] = self._assign(vectors[positions])
+                self._pending.extend(rows.tolist())
+
+            self._db().executemany(
+                "INSERT INTO documents (row, hash, content) VALUES (?, ?, ?) "
+                "ON CONFLICT(hash) DO UPDATE SET content = COALESCE(excluded.content, documents.content)",
+                [(row_of[digest], digest, contents[position] if contents is not None else None)
+                 for digest, position in latest.items()],
+            )
+            self._db().commit()
+            self.meta["count"] = start + len(new)
+            self.meta["live"] += len(new)
+            self.meta["model"] = self.meta["model"] or model
+
+            trained = self.meta["trained_rows"]
+            if self.meta["live"] >= ivf_min_rows and (not trained or self.meta["live"] >= 4 * trained):
+                self._train()
+            self._write_meta()
+            return len(new), len(latest) - len(new)
+
+    def delete(self, hashes: Sequence[str]) -> int:
+        with self._locked(exclusive=True):
+            self._refresh()
+            rows = self._rows_of(list(dict.fromkeys(hashes)))
+            if not rows:
+                return 0
+            self.live[np.fromiter(rows.values(), dtype=np.int64, count=len(rows))] = 0
+            self._db().executemany("DELETE FROM documents WHERE hash = ?", [(digest,) for digest in rows])
+            self._db().commit()
+            self.meta["live"] -= len(rows)
+            self._write_meta()
+            return len(rows)
+
+    # -- search --------------------------------------------------------------
+
+    def _search_exact(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        best_rows, best_scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        count = self.meta["count"]
+        for start in range(0, count, _SCAN_BLOCK):
+            stop = min(start + _SCAN_BLOCK, count)
+            live = np.flatnonzero(self.live[start:stop])
+            scores = (self.vectors[start:stop] @ query)[live]
+            rows = start + live
+            best_rows, best_scores = _top_k(
+                np.concatenate([best_rows, rows]), np.concatenate([best_scores, scores]), k,
+            )
+        return best_rows, best_scores
+
+    def _search_ivf(self, query: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self._order is None or len(self._pending) > max(1024, self.meta["count"] // 20):
+            self._group_lists()
+        probe = np.argsort(-(self.centroids @ query))[:nprobe]
+        parts = [self._order[self._offsets[c]:self._offsets[c + 1]] for c in probe]
+        if self._pending:
+            pending = np.asarray(self._pending, dtype=np.int64)
+            parts.append(pending[np.isin(self.lists[pending], probe)])
+        rows = np.concatenate(parts)
+        if self._pending:
+            # Rows overwritten since grouping can sit in two lists
+            rows = np.unique(rows)
+        rows = rows[self.live[rows] == 1]
+        rows.sort()
+        return _top_k(rows, self.vectors[rows] @ query, k)
+
+    def search(self, query: Any, k: int = 5, nprobe: int = 8, exact: bool = False) -> List[Dict[str, Any]]:
+        """The k documents closest to `query`, best first, with their scores."""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if len(query) != self.dimension:
+            raise ValueError(f"Query has dimension {len(query)}, the store expects {self.dimension}.")
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        with self._locked(exclusive=False):
+            self._refresh()
+            if k <= 0 or not self.meta["live"]:
+                return []
+            if exact or self.centroids is None:
+                rows, scores = self._search_exact(query, k)
+            else:
+                rows, scores = self._search_ivf(query, k, nprobe)
+            found = {}
+            for start in range(0, len(rows), 500):
+                part = rows[start:start + 500].tolist()
+                query_sql = f"SELECT row, hash, content FROM documents WHERE row IN ({','.join('?' * len(part))})"
+                found.update((row, (digest, content)) for row, digest, content in self._db().execute(query_sql, part))
+        return [
+            {"content": found[row][1], "score": float(score), "hash": found[row][0]}
+            for row, score in zip(rows.tolist(), scores.tolist()) if row in found
+        ]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+
+class VectorStoreRegistry:
+    def __init__(self, root: str = "vector_stores"):
+        self.root = root
+        self._stores: Dict[str, VectorIndex] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, root: str):
+        with self._lock:
+            if root != self.root:
+                for store in self._stores.values():
+                    store.close()
+                self._stores.clear()
+            self.root = root
+
+    def open(self, store_id: str, dimension: Optional[int] = None) -> VectorIndex:
+        """The store named store_id; created with `dimension` if missing, else FileNotFoundError."""
+        if not isinstance(store_id, str) or not _STORE_ID.match(store_id):
+            raise ValueError(f"Invalid store_id: {store_id!r}.")
+        with self._lock:
+            store = self._stores.get(store_id)
+            if store is None:
+                store = self._stores[store_id] = VectorIndex(Path(self.root) / store_id, dimension)
+            return store
+
+
+# Shared by every vector store node in this process
+vector_stores = VectorStoreRegistry()
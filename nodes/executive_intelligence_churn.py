@@ -1,82 +1,339 @@
+import asyncio
+import codecs
 import csv
 import hashlib
-import pickle
+import logging
+import mmap
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from .core.base import BaseNode
+import numpy as np
+
+from .core.base import BaseNode, file_signature, iter_batches, merge_batch, process_runner
+from .core.models import model_registry
+from .core.sketch import ScoreSketch
+from .core.table import Table, as_table, infer_column
+
+logger = logging.getLogger(__name__)
 
 
 class CsvDataSourceNode(BaseNode):
-    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    cacheable = True
+    streaming = True
+
+    def _resolve_path(self, inputs: Dict[str, Any]) -> Optional[str]:
         path = self.config.get("path") or inputs.get("path")
         uploaded_file_id = self.config.get("uploaded_file_id") or inputs.get("uploaded_file_id")
+        if not path and uploaded_file_id:
+            path = str(Path("uploads") / str(uploaded_file_id))
+        return path
+
+    def cache_key(self, inputs: Dict[str, Any]) -> Any:
+        return file_signature(self._resolve_path(inputs))
+
+    @staticmethod
+    def _iter_lines(csv_path: Path, encoding: str) -> Iterator[str]:
+        # Lines are sliced out of a read-only mapping of the file, so the OS pages
+        # the export in and out instead of it being buffered in the process
+        with csv_path.open("rb") as handle:
+            if csv_path.stat().st_size == 0:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield from codecs.iterdecode(iter(mapped.readline, b""), encoding)
+
+    def _to_table(self, header: List[str], rows: List[List[Any]], kinds: Dict[str, Optional[str]]) -> Table:
+        if not rows:
+            return Table({name: [] for name in header})
+        if not self.config.get("infer_types", False):
+            return Table(dict(zip(header, zip(*rows))))
+        columns = {}
+        for name, values in zip(header, zip(*rows)):
+            columns[name], kinds[name] = infer_column(values, kinds.get(name))
+        return Table(columns)
+
+    def _iter_table_batches(self, csv_path: Path, batch_size: int) -> Iterator[Table]:
         delimiter = self.config.get("delimiter", ",")
         encoding = self.config.get("encoding", "utf-8")
+        selected = self.config.get("columns") or None
+        limit = int(self.config.get("limit") or 0)
+        # Kinds are fixed by the first batch that has values; a later batch that does not
+        # fit stays text rather than widening the column to a lossy dtype
+        kinds: Dict[str, Optional[str]] = dict(self.config.get("dtypes") or {})
+
+        reader = csv.reader(self._iter_lines(csv_path, encoding), delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        width = len(header)
+        if selected:
+            missing = [name for name in selected if name not in header]
+            if missing:
+                raise KeyError(f"Columns not found in CSV: {missing}")
+            positions = [header.index(name) for name in selected]
+            header = list(selected)
+
+        batch: List[List[Any]] = []
+        emitted = False
+        total = 0
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != width:
+                # Short rows are padded with nulls and extra fields dropped, like csv.DictReader
+                row = (row + [None] * width)[:width]
+            if selected:
+                row = [row[position] for position in positions]
+            batch.append(row)
+            total += 1
+            if len(batch) >= batch_size or total == limit:
+                yield self._to_table(header, batch, kinds)
+                emitted = True
+                batch = []
+                if total == limit:
+                    return
+        if batch or not emitted:
+            yield self._to_table(header, batch, kinds)
 
-        if not path and uploaded_file_id:
-            path = str(Path("uploads") / str(uploaded_file_id))
+    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        async for batch in self.stream(inputs):
+            merge_batch(result, batch)
+        result["table"] = result.get("rows", [])
+        return result
+
+    async def stream(self, inputs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        path = self._resolve_path(inputs)
+        batch_size = int(self.config.get("batch_size", 10000))
 
         if not path:
-            return {"rows": [], "table": [], "warning": "No CSV path or uploaded_file_id provided."}
+            yield {"rows": [], "table": [], "warning": "No CSV path or uploaded_file_id provided."}
+            return
 
         csv_path = Path(path)
         if not csv_path.exists():
-            return {"rows": [], "table": [], "error": f"CSV not found at {csv_path}."}
+            yield {"rows": [], "table": [], "error": f"CSV not found at {csv_path}."}
+            return
 
-        rows: List[Dict[str, Any]] = []
-        with csv_path.open("r", encoding=encoding, newline="") as handle:
-            reader = csv.DictReader(handle, delimiter=delimiter)
-            for row in reader:
-                rows.append(dict(row))
+        batches = self._iter_table_batches(csv_path, batch_size)
+        total = 0
+        try:
+            while True:
+                # Parse off the event loop so a large export does not stall other executions
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    break
+                total += len(batch)
+                yield {"rows": batch, "table": batch}
+        except KeyError as exc:
+            yield {"rows": [], "table": [], "error": exc.args[0]}
+            return
 
-        print(f"  [CsvDataSource] Loaded {len(rows)} rows from {csv_path}.")
-        return {"rows": rows, "table": rows}
+        logger.info("Loaded %s rows from %s.", total, csv_path)
 
 
-class PIIRedactionNode(BaseNode):
-    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        dataset = inputs.get("rows") or inputs.get("table") or inputs.get("dataset") or []
-        columns_to_drop = self.config.get("columns_to_drop", [])
-        columns_to_hash = self.config.get("columns_to_hash", [])
-        policy = self.config.get("policy", "LGPD")
+def _sha256_hex_packed(blob: bytes, offsets: np.ndarray) -> str:
+    """Hex digests of blob[offsets[i]:offsets[i + 1]], concatenated (64 characters each)."""
+    bounds = offsets.tolist()
+    return "".join(
+        hashlib.sha256(blob[start:stop]).hexdigest() for start, stop in zip(bounds, bounds[1:])
+    )
 
-        redacted_rows: List[Dict[str, Any]] = []
-        dropped_count = 0
-        hashed_count = 0
 
-        for row in dataset:
-            updated = dict(row)
-            for column in columns_to_drop:
-                if column in updated:
-                    dropped_count += 1
-                    updated.pop(column, None)
+def _sha256_hex(texts: List[str]) -> List[str]:
+    return [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+
+
+class _DigestCache:
+    """Bounded LRU of value -> sha256 digest, shared by the redaction steps of a process."""
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def lookup(self, texts: List[str]) -> List[Optional[str]]:
+        entries = self._entries
+        digests = [entries.get(text) for text in texts]
+        for text, digest in zip(texts, digests):
+            if digest is not None:
+                entries.move_to_end(text)
+        return digests
+
+    def store(self, texts: List[str], digests: List[str]):
+        entries = self._entries
+        for text, digest in zip(texts, digests):
+            entries[text] = digest
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
 
-            for column in columns_to_hash:
-                if column in updated and updated[column] is not None:
-                    hashed_count += 1
-                    value = str(updated[column])
-                    updated[column] = hashlib.sha256(value.encode("utf-8")).hexdigest()
 
-            redacted_rows.append(updated)
+_digest_cache = _DigestCache()
 
-        report = {
+
+class PIIRedactionNode(BaseNode):
+    cacheable = True
+    streaming = True
+    # Not offloaded as a whole: columns run through a thread, and large ones are hashed in
+    # shards on the runtime's process pool, which a node already inside a worker cannot use
+    cpu_bound = False
+
+    def _distinct_texts(
+        self, name: str, values: np.ndarray, high_cardinality: set,
+    ) -> Tuple[np.ndarray, List[str], Optional[np.ndarray]]:
+        """
+        (null mask, texts to hash, index of each non-null cell into them).
+
+        Each distinct value is hashed once however often it repeats. Mostly-unique
+        columns skip the index, which would cost more than it saves; their index is
+        None and the texts line up with the non-null cells. `high_cardinality` holds
+        the columns found mostly unique by earlier batches of the same dataset.
+        """
+        if values.dtype.kind in "biuf":
+            nulls = np.isnan(values) if values.dtype.kind == "f" else np.zeros(len(values), dtype=bool)
+            distinct, inverse = np.unique(values[~nulls], return_inverse=True)
+            # Same text as str(cell); CSV inference only keeps numbers that print back as the
+            # original text, so digests match hashing the raw file values
+            return nulls, list(map(str, distinct.tolist())), inverse
+        nulls = values == None  # noqa: E711 - elementwise null check
+        cells = list(map(str, values[~nulls].tolist()))
+        if name in high_cardinality:
+            return nulls, cells, None
+        texts = list(dict.fromkeys(cells))
+        if len(texts) > len(cells) // 2:
+            high_cardinality.add(name)
+            return nulls, cells, None
+        codes = {text: code for code, text in enumerate(texts)}
+        inverse = np.fromiter(map(codes.__getitem__, cells), dtype=np.intp, count=len(cells))
+        return nulls, texts, inverse
+
+    async def _digests(self, texts: List[str]) -> List[str]:
+        # Columns with more distinct values than the cache holds (ids) would only churn it
+        cached = len(texts) <= _digest_cache.max_entries
+        digests = _digest_cache.lookup(texts) if cached else [None] * len(texts)
+        misses = [text for text, digest in zip(texts, digests) if digest is None] if cached else texts
+        if not misses:
+            return digests
+
+        parallel_min = int(self.config.get("parallel_min_values", 200_000))
+        run = process_runner.get()
+        if run is not None and len(misses) >= parallel_min:
+            computed = await self._digests_in_pool(misses, parallel_min, run)
+        else:
+            computed = await asyncio.to_thread(_sha256_hex, misses)
+        if not cached:
+            return computed
+        _digest_cache.store(misses, computed)
+
+        fresh = iter(computed)
+        return [digest if digest is not None else next(fresh) for digest in digests]
+
+    @staticmethod
+    async def _digests_in_pool(
+        texts: List[str], parallel_min: int, run: Callable[..., Awaitable[Any]],
+    ) -> List[str]:
+        # Shards cross the process boundary as one byte blob plus offsets rather than as
+        # lists of str objects, which would cost more to pickle than to hash
+        encoded = [text.encode("utf-8") for text in texts]
+        blob = b"".join(encoded)
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+
+        shards = max(1, min(os.cpu_count() or 1, len(texts) // max(1, parallel_min // 4)))
+        size = -(-len(texts) // shards)
+        parts = await asyncio.gather(*(
+            run(
+                _sha256_hex_packed,
+                blob[offsets[start]:offsets[min(start + size, len(texts))]],
+                offsets[start:start + size + 1] - offsets[start],
+            )
+            for start in range(0, len(texts), size)
+        ))
+        packed = "".join(parts)
+        return [packed[index:index + 64] for index in range(0, len(packed), 64)]
+
+    async def _hash_column(self, name: str, values: np.ndarray, high_cardinality: set) -> Tuple[np.ndarray, int]:
+        # Off the event loop, now that the node is not sent to a worker process
+        nulls, texts, inverse = await asyncio.to_thread(self._distinct_texts, name, values, high_cardinality)
+        digests = np.empty(len(texts), dtype=object)
+        digests[:] = await self._digests(texts)
+        hashed = np.full(len(values), None, dtype=object)
+        hashed[~nulls] = digests if inverse is None else digests[inverse]
+        return hashed, int((~nulls).sum())
+
+    async def _redact(self, dataset: Any, high_cardinality: set) -> Tuple[Table, int, int]:
+        table = as_table(dataset)
+        columns_to_drop = [column for column in self.config.get("columns_to_drop", []) if column in table]
+        columns_to_hash = [column for column in self.config.get("columns_to_hash", []) if column in table]
+
+        dropped_count = len(table) * len(columns_to_drop)
+        hashed_count = 0
+        hashed: Dict[str, np.ndarray] = {}
+        for column in columns_to_hash:
+            if column in columns_to_drop:
+                continue
+            hashed[column], count = await self._hash_column(column, table.column(column), high_cardinality)
+            hashed_count += count
+
+        redacted = table.drop(columns_to_drop)
+        if hashed:
+            redacted = redacted.with_columns(hashed)
+        return redacted, dropped_count, hashed_count
+
+    def _report(self, dropped_count: int, hashed_count: int, total_rows: int) -> Dict[str, Any]:
+        policy = self.config.get("policy", "LGPD")
+        return {
             "policy": policy,
             "tags": [policy, "PII_REDACTED"],
-            "dropped_columns": columns_to_drop,
-            "hashed_columns": columns_to_hash,
+            "dropped_columns": self.config.get("columns_to_drop", []),
+            "hashed_columns": self.config.get("columns_to_hash", []),
             "dropped_count": dropped_count,
             "hashed_count": hashed_count,
-            "total_rows": len(dataset),
+            "total_rows": total_rows,
         }
-        print(f"  [PIIRedaction] Redacted dataset with policy {policy}.")
-        return {"rows": redacted_rows, "table": redacted_rows, "governance_report": report}
+
+    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        dataset = inputs.get("rows") or inputs.get("table") or inputs.get("dataset") or []
+        redacted, dropped_count, hashed_count = await self._redact(dataset, set())
+        report = self._report(dropped_count, hashed_count, len(redacted))
+        logger.info("Redacted dataset with policy %s.", report['policy'])
+        return {"rows": redacted, "table": redacted, "governance_report": report}
+
+    async def stream(self, inputs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        dataset = inputs.get("rows") or inputs.get("table") or inputs.get("dataset") or []
+        dropped_total = hashed_total = total_rows = 0
+        # Pooled instances are reused across executions, so this only lives for one stream
+        high_cardinality: set = set()
+
+        async for batch in iter_batches(dataset):
+            redacted, dropped_count, hashed_count = await self._redact(batch, high_cardinality)
+            dropped_total += dropped_count
+            hashed_total += hashed_count
+            total_rows += len(redacted)
+            yield {"rows": redacted, "table": redacted}
+
+        report = self._report(dropped_total, hashed_total, total_rows)
+        logger.info("Redacted dataset with policy %s.", report['policy'])
+        yield {"governance_report": report}
 
 
 class FeatureEngineeringChurnNode(BaseNode):
+    cacheable = True
+    streaming = True
+    cpu_bound = True
+    _NUMERIC = (
+        "CreditScore", "Age", "Tenure", "Balance",
+        "NumOfProducts", "HasCrCard", "IsActiveMember", "EstimatedSalary",
+    )
     _GEOGRAPHIES = ("France", "Germany", "Spain")
     _GENDERS = ("Male", "Female")
 
+    FEATURE_ORDER = (
+        *_NUMERIC,
+        *(f"Geography_{geo}" for geo in _GEOGRAPHIES),
+        *(f"Gender_{gen}" for gen in _GENDERS),
+    )
+
     @staticmethod
     def _to_float(value: Any, default: float = 0.0) -> float:
         if value is None:
@@ -91,159 +348,432 @@ class FeatureEngineeringChurnNode(BaseNode):
         except ValueError:
             return default
 
-    def _build_feature_row(self, row: Dict[str, Any]) -> Tuple[Dict[str, float], Dict[str, Any]]:
-        features: Dict[str, float] = {
-            "CreditScore": self._to_float(row.get("CreditScore")),
-            "Age": self._to_float(row.get("Age")),
-            "Tenure": self._to_float(row.get("Tenure")),
-            "Balance": self._to_float(row.get("Balance")),
-            "NumOfProducts": self._to_float(row.get("NumOfProducts")),
-            "HasCrCard": self._to_float(row.get("HasCrCard")),
-            "IsActiveMember": self._to_float(row.get("IsActiveMember")),
-            "EstimatedSalary": self._to_float(row.get("EstimatedSalary")),
-        }
+    def _fill_numeric(self, out: np.ndarray, values: Optional[np.ndarray]):
+        if values is None:
+            out[:] = 0.0
+            return
+        if values.dtype.kind not in "biuf":
+            values = self._parse_text(values)
+        out[:] = values
+        # Gaps in float columns arrive as NaN; treat them like empty cells
+        np.nan_to_num(out, copy=False, nan=0.0)
+
+    def _parse_text(self, values: np.ndarray) -> np.ndarray:
+        # Text cells (uninferred CSV, row dicts) are parsed in bulk, straight from the object
+        # array, then with the gaps masked (float() already accepts surrounding spaces). Columns with
+        # blank-but-not-empty cells go through stripped strings, and only a column holding
+        # something unparsable is parsed cell by cell.
+        if values.dtype == object:
+            try:
+                return values.astype(np.float64)
+            except (ValueError, TypeError):
+                pass
+            cells = values.copy()
+            cells[(values == None) | (values == "")] = np.nan  # noqa: E711 - elementwise null check
+            try:
+                return cells.astype(np.float64)
+            except (ValueError, TypeError):
+                pass
+        text = self._text_column(values, len(values))
+        try:
+            return np.where(text == "", "nan", text).astype(np.float64)
+        except ValueError:
+            return np.fromiter((self._to_float(value) for value in values.tolist()), dtype=np.float64, count=len(values))
 
-        geography = str(row.get("Geography", "")).strip()
-        gender = str(row.get("Gender", "")).strip()
+    @staticmethod
+    def _text_column(values: Optional[np.ndarray], length: int) -> np.ndarray:
+        if values is None:
+            return np.full(length, "", dtype=str)
+        if values.dtype == object:
+            values = np.where(values == None, "", values)  # noqa: E711 - elementwise null check
+        return np.char.strip(values.astype(str))
 
-        for geo in self._GEOGRAPHIES:
-            features[f"Geography_{geo}"] = 1.0 if geography == geo else 0.0
-        for gen in self._GENDERS:
-            features[f"Gender_{gen}"] = 1.0 if gender == gen else 0.0
+    @staticmethod
+    def _categorical(values: Optional[np.ndarray], categories: Tuple[str, ...], length: int) -> np.ndarray:
+        """Normalized text column (stripped, "" for nulls), touching only cells that match no category."""
+        if values is None:
+            return np.full(length, "", dtype=object)
+        text = values.astype(object, copy=False)
+        known = np.zeros(length, dtype=bool)
+        for category in categories:
+            known |= text == category
+        if not known.all():
+            text = text.copy() if text is values else text
+            for index in np.flatnonzero(~known).tolist():
+                value = text[index]
+                text[index] = "" if value is None else str(value).strip()
+        return text
+
+    def _build_features(self, dataset: Any) -> Tuple[Table, Table]:
+        table = as_table(dataset)
+        length = len(table)
+
+        # One column-major float32 matrix; the features Table exposes its columns as views
+        matrix = np.empty((length, len(self.FEATURE_ORDER)), dtype=np.float32, order="F")
+        for index, name in enumerate(self._NUMERIC):
+            self._fill_numeric(matrix[:, index], table.get(name))
+
+        geography = self._categorical(table.get("Geography"), self._GEOGRAPHIES, length)
+        gender = self._categorical(table.get("Gender"), self._GENDERS, length)
+        offset = len(self._NUMERIC)
+        for index, geo in enumerate(self._GEOGRAPHIES):
+            np.equal(geography, geo, out=matrix[:, offset + index], casting="unsafe")
+        offset += len(self._GEOGRAPHIES)
+        for index, gen in enumerate(self._GENDERS):
+            np.equal(gender, gen, out=matrix[:, offset + index], casting="unsafe")
+
+        return Table.from_matrix(matrix, self.FEATURE_ORDER), Table({"geography": geography, "gender": gender})
 
-        metadata = {"geography": geography, "gender": gender}
-        return features, metadata
+    @staticmethod
+    def _feature_map(feature_names: Iterable[str]) -> List[Dict[str, str]]:
+        return [
+            {"name": key, "type": "numeric" if not key.startswith(("Geography_", "Gender_")) else "categorical"}
+            for key in feature_names
+        ]
 
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         dataset = inputs.get("rows") or inputs.get("table") or inputs.get("dataset") or []
-        features: List[Dict[str, float]] = []
-        metadata_rows: List[Dict[str, Any]] = []
+        features, metadata = self._build_features(dataset)
+
+        feature_map = self._feature_map(features.column_names if len(features) else [])
+        logger.info("Generated feature matrix with %s rows.", len(features))
+        return {
+            "features": features,
+            "feature_order": list(self.FEATURE_ORDER),
+            "feature_map": feature_map,
+            "metadata": metadata,
+        }
+
+    async def stream(self, inputs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        dataset = inputs.get("rows") or inputs.get("table") or inputs.get("dataset") or []
+        feature_names: List[str] = []
+        total = 0
 
-        for row in dataset:
-            feature_row, metadata = self._build_feature_row(row)
-            features.append(feature_row)
-            metadata_rows.append(metadata)
+        async for batch in iter_batches(dataset):
+            features, metadata = self._build_features(batch)
+            if len(features) and not feature_names:
+                feature_names = features.column_names
+            total += len(features)
+            yield {"features": features, "metadata": metadata}
 
-        feature_map = [
-            {"name": key, "type": "numeric" if not key.startswith(("Geography_", "Gender_")) else "categorical"}
-            for key in (features[0].keys() if features else [])
-        ]
-        print(f"  [FeatureEngineering] Generated feature matrix with {len(features)} rows.")
-        return {"features": features, "feature_map": feature_map, "metadata": metadata_rows}
+        logger.info("Generated feature matrix with %s rows.", total)
+        yield {"feature_order": list(self.FEATURE_ORDER), "feature_map": self._feature_map(feature_names)}
 
 
 class ChurnModelPredictNode(BaseNode):
+    cacheable = True
+    streaming = True
+    batchable = True
+    # Not offloaded: scoring already runs in threads that release the GIL, and every
+    # offload worker would hold its own copy of each model (MODEL_REGISTRY_MAX_MB apiece)
+    cpu_bound = False
+
+    def cache_key(self, inputs: Dict[str, Any]) -> Any:
+        return file_signature(self.config.get("model_path"))
+
     @staticmethod
-    def _resolve_feature_order(model: Any, features: List[Dict[str, Any]]) -> List[str]:
+    def _resolve_feature_order(model: Any, features: Table) -> List[str]:
         if hasattr(model, "feature_names_in_"):
             return list(model.feature_names_in_)
-        if features:
-            return sorted(features[0].keys())
-        return []
+        return sorted(features.column_names)
 
-    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    async def _load_model(self) -> Tuple[Any, Optional[str]]:
         model_path = self.config.get("model_path")
-        threshold = float(self.config.get("threshold", 0.5))
-        features = inputs.get("features") or []
-
         if not model_path:
-            return {"error": "No model_path provided.", "proba": [], "label": []}
+            return None, "No model_path provided."
 
         model_file = Path(model_path)
         if not model_file.exists():
-            return {"error": f"Model not found at {model_file}.", "proba": [], "label": []}
+            return None, f"Model not found at {model_file}."
 
-        if not features:
-            return {"error": "No features provided for prediction.", "proba": [], "label": []}
+        # Served from the process-wide registry; only the first use (or a changed file) unpickles
+        return await asyncio.to_thread(model_registry.get, str(model_file)), None
 
-        with model_file.open("rb") as handle:
-            model = pickle.load(handle)
+    @staticmethod
+    def _predict_chunk(model: Any, matrix: np.ndarray) -> np.ndarray:
+        if hasattr(model, "predict_proba"):
+            raw = np.asarray(model.predict_proba(matrix), dtype=np.float64)
+            # Probability of the positive class; single-column outputs are taken as is
+            return raw[:, 1] if raw.ndim == 2 and raw.shape[1] > 1 else raw.reshape(len(raw), -1)[:, 0]
+        return np.asarray(model.predict(matrix), dtype=np.float64).reshape(-1)
 
+    async def _score(self, model: Any, features: Table) -> Tuple[np.ndarray, Optional[str]]:
         feature_order = self._resolve_feature_order(model, features)
         if not feature_order:
-            return {"error": "Unable to resolve feature order.", "proba": [], "label": []}
+            return np.empty(0), "Unable to resolve feature order."
+        if not hasattr(model, "predict_proba") and not hasattr(model, "predict"):
+            return np.empty(0), "Model does not support prediction."
+
+        # Zero-copy when the features come straight from FeatureEngineeringChurnNode in model order
+        matrix = features.to_matrix(feature_order, dtype=np.float32)
+        batch_size = max(1, int(self.config.get("batch_size", 50000)))
+        workers = asyncio.Semaphore(max(1, int(self.config.get("workers", 1))))
+        probabilities = np.empty(len(matrix), dtype=np.float64)
+
+        # Rows are scored batch_size at a time in threads, so the model's intermediate
+        # buffers stay bounded and models that release the GIL score batches in parallel
+        async def score_rows(start: int):
+            async with workers:
+                stop = start + batch_size
+                probabilities[start:stop] = await asyncio.to_thread(self._predict_chunk, model, matrix[start:stop])
+
+        await asyncio.gather(*(score_rows(start) for start in range(0, len(matrix), batch_size)))
+        return probabilities, None
 
-        matrix = [[row.get(feature, 0.0) for feature in feature_order] for row in features]
+    @staticmethod
+    def _labels(probabilities: np.ndarray, threshold: float) -> List[int]:
+        return (probabilities >= threshold).astype(int).tolist()
 
-        probabilities: List[float] = []
-        if hasattr(model, "predict_proba"):
-            raw = model.predict_proba(matrix)
-            for entry in raw:
-                if isinstance(entry, (list, tuple)) and len(entry) > 1:
-                    probabilities.append(float(entry[1]))
-                else:
-                    probabilities.append(float(entry[0]))
-        elif hasattr(model, "predict"):
-            raw = model.predict(matrix)
-            probabilities = [float(value) for value in raw]
-        else:
-            return {"error": "Model does not support prediction.", "proba": [], "label": []}
+    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        threshold = float(self.config.get("threshold", 0.5))
+        features = as_table(inputs.get("features") or [])
+
+        model, error = await self._load_model()
+        if error:
+            return {"error": error, "proba": [], "label": []}
+
+        if not len(features):
+            return {"error": "No features provided for prediction.", "proba": [], "label": []}
 
-        labels = [1 if proba >= threshold else 0 for proba in probabilities]
-        print(f"  [ChurnModelPredict] Scored {len(probabilities)} rows.")
-        return {"proba": probabilities, "label": labels, "threshold": threshold}
+        probabilities, error = await self._score(model, features)
+        if error:
+            return {"error": error, "proba": [], "label": []}
+
+        logger.info("Scored %s rows.", len(probabilities))
+        return {"proba": probabilities.tolist(), "label": self._labels(probabilities, threshold), "threshold": threshold}
+
+    async def execute_batch(self, inputs_batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Load the model once and score the rows of every item in a single call
+        threshold = float(self.config.get("threshold", 0.5))
+        model, error = await self._load_model()
+        if error:
+            return [{"error": error, "proba": [], "label": []} for _ in inputs_batch]
+
+        per_item = [as_table(inputs.get("features") or []) for inputs in inputs_batch]
+        rows = Table.concat(per_item)
+        probabilities = np.empty(0)
+        if len(rows):
+            probabilities, error = await self._score(model, rows)
+            if error:
+                return [{"error": error, "proba": [], "label": []} for _ in inputs_batch]
+
+        results = []
+        offset = 0
+        for features in per_item:
+            if not len(features):
+                results.append({"error": "No features provided for prediction.", "proba": [], "label": []})
+                continue
+            proba = probabilities[offset:offset + len(features)]
+            offset += len(features)
+            results.append({"proba": proba.tolist(), "label": self._labels(proba, threshold), "threshold": threshold})
+        logger.info("Scored %s rows across %s batch items.", len(probabilities), len(inputs_batch))
+        return results
+
+    async def stream(self, inputs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        threshold = float(self.config.get("threshold", 0.5))
+        features = inputs.get("features") or []
+
+        model, error = await self._load_model()
+        if error:
+            yield {"error": error, "proba": [], "label": []}
+            return
+
+        total = 0
+        async for batch in iter_batches(features):
+            batch = as_table(batch)
+            if not len(batch):
+                continue
+            probabilities, error = await self._score(model, batch)
+            if error:
+                yield {"error": error}
+                return
+            total += len(probabilities)
+            yield {"proba": probabilities.tolist(), "label": self._labels(probabilities, threshold)}
+
+        if not total:
+            yield {"error": "No features provided for prediction.", "proba": [], "label": []}
+            return
+        logger.info("Scored %s rows.", total)
+        yield {"threshold": threshold}
 
 
 class ExplainabilityNode(BaseNode):
+    cacheable = True
+
+    @staticmethod
+    def _top_k(contributions: np.ndarray, k: int) -> np.ndarray:
+        """Column indices of each row's k largest |contributions|, largest first."""
+        magnitude = np.abs(contributions)
+        if k < magnitude.shape[1]:
+            candidates = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(magnitude.shape[1]), magnitude.shape)
+        order = np.argsort(-np.take_along_axis(magnitude, candidates, axis=1), axis=1, kind="stable")
+        return np.take_along_axis(candidates, order, axis=1)
+
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        features = inputs.get("features") or []
+        features = as_table(inputs.get("features") or [])
         feature_importance = self.config.get("feature_importance", {})
         top_k = int(self.config.get("top_k", 5))
+        risk_threshold = self.config.get("risk_threshold")
+        batch_size = max(1, int(self.config.get("batch_size", 100000)))
 
-        if not features:
+        if not len(features):
             return {"top_factors": [], "method": "none", "warning": "No features provided."}
 
-        row = features[0]
-        importance_map = {}
+        # Without configured coefficients each value weighs by its own magnitude
         if isinstance(feature_importance, dict) and feature_importance:
-            importance_map = feature_importance
+            names = list(feature_importance)
+            weights = np.array([float(feature_importance[name]) for name in names], dtype=np.float64)
         else:
-            importance_map = {key: abs(value) for key, value in row.items()}
-
-        scored = []
-        for feature, importance in importance_map.items():
-            value = float(row.get(feature, 0.0))
-            contribution = float(importance) * value
-            scored.append({
-                "feature": feature,
-                "importance": float(importance),
-                "value": value,
-                "contribution": contribution,
-            })
+            names = features.column_names
+            weights = None
+        matrix = features.to_matrix(names, dtype=np.float32)
+
+        rows = np.arange(len(features))
+        if risk_threshold is not None:
+            proba = inputs.get("proba")
+            if proba is None or len(proba) != len(features):
+                return {"top_factors": [], "method": "none", "error": "risk_threshold needs one proba per feature row."}
+            rows = np.flatnonzero(np.asarray(proba, dtype=np.float64) >= float(risk_threshold))
+
+        k = max(0, min(top_k, len(names)))
+        value_sum = np.zeros(len(names))
+        magnitude_value_sum = np.zeros(len(names))
+        contribution_sum = np.zeros(len(names))
+        magnitude_sum = np.zeros(len(names))
+        factor_rows, factor_columns = [], []
+        # Row blocks bound the float64 contribution matrix held at once
+        for start in range(0, len(rows), batch_size):
+            block = rows[start:start + batch_size]
+            values = matrix[block].astype(np.float64)
+            contributions = values * (weights if weights is not None else np.abs(values))
+            value_sum += values.sum(axis=0)
+            magnitude_value_sum += np.abs(values).sum(axis=0)
+            contribution_sum += contributions.sum(axis=0)
+            magnitude_sum += np.abs(contributions).sum(axis=0)
+            if k:
+                top = self._top_k(contributions, k)
+                factor_rows.append(np.repeat(block, k))
+                factor_columns.append(top.reshape(-1))
+
+        explained = len(rows)
+        mean_magnitude = magnitude_sum / max(explained, 1)
+        global_importance = [
+            {
+                "feature": names[index],
+                "importance": float(weights[index] if weights is not None else magnitude_value_sum[index] / max(explained, 1)),
+                "value": float(value_sum[index] / max(explained, 1)),
+                "contribution": float(contribution_sum[index] / max(explained, 1)),
+                "mean_abs_contribution": float(mean_magnitude[index]),
+            }
+            for index in np.argsort(-mean_magnitude, kind="stable").tolist()
+        ]
 
-        scored.sort(key=lambda item: abs(item["contribution"]), reverse=True)
-        top_factors = scored[:top_k]
-        print(f"  [Explainability] Generated top {len(top_factors)} factors.")
-        return {"top_factors": top_factors, "method": "coefficients"}
+        columns = np.concatenate(factor_columns) if factor_columns else np.empty(0, dtype=np.intp)
+        row_index = np.concatenate(factor_rows) if factor_rows else np.empty(0, dtype=np.intp)
+        values = matrix[row_index, columns].astype(np.float64)
+        row_factors = Table({
+            "row": row_index,
+            "rank": np.tile(np.arange(1, k + 1), explained),
+            "feature": np.asarray(names, dtype=object)[columns] if len(columns) else np.empty(0, dtype=object),
+            "value": values,
+            "contribution": values * (weights[columns] if weights is not None else np.abs(values)),
+        })
+
+        logger.info("Explained %s rows with top %s factors.", explained, k)
+        return {
+            "top_factors": global_importance[:top_k],
+            "global_importance": global_importance,
+            "row_factors": row_factors,
+            "explained_rows": explained,
+            "method": "coefficients",
+        }
 
 
 class ExecutiveBriefNode(BaseNode):
-    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    cacheable = True
+    # Pipelined with the predict step when proba is its only input; otherwise the
+    # proba list is materialized and folded the same way
+    streaming = True
+    _GROUPS = ("geography", "gender")
+
+    def _threshold(self, inputs: Dict[str, Any]) -> float:
+        threshold = self.config.get("risk_threshold", inputs.get("threshold"))
+        return float(threshold) if threshold is not None else 0.5
+
+    async def _aggregate(self, inputs: Dict[str, Any]) -> Tuple[ScoreSketch, Dict[str, Dict[str, ScoreSketch]]]:
+        """One pass over the predictions: portfolio sketch plus one sketch per geography/gender value."""
+        bins = int(self.config.get("sketch_bins", 1000))
+        threshold = self._threshold(inputs)
+        overall = ScoreSketch(bins, threshold)
+        groups: Dict[str, Dict[str, ScoreSketch]] = {group: {} for group in self._GROUPS}
+
+        proba = inputs.get("proba")
+        if isinstance(proba, (int, float)):
+            proba = [proba]
+        metadata = as_table(inputs.get("metadata") or [])
+
+        offset = 0
+        async for batch in iter_batches(proba):
+            scores = np.asarray(batch, dtype=np.float64).reshape(-1)
+            overall.update(scores)
+            # Metadata rows line up with predictions by position
+            part = metadata.slice(offset, offset + len(scores)) if len(metadata) else metadata
+            for group in self._GROUPS:
+                if group not in part:
+                    continue
+                labels = part.column(group)
+                for label in dict.fromkeys(labels.tolist()):
+                    name = str(label) if label not in (None, "") else "unknown"
+                    sketch = groups[group].get(name)
+                    if sketch is None:
+                        sketch = groups[group][name] = ScoreSketch(bins, threshold)
+                    sketch.update(scores[:len(labels)][labels == label])
+            offset += len(scores)
+        return overall, groups
+
+    def _brief(self, inputs: Dict[str, Any], overall: ScoreSketch, groups: Dict[str, Dict[str, ScoreSketch]]) -> Dict[str, Any]:
         context = inputs.get("context") or self.config.get("context") or {}
-        proba = inputs.get("proba") or []
         top_factors = inputs.get("top_factors") or []
-
-        if isinstance(proba, list) and proba:
-            churn_risk = float(proba[0])
-        elif isinstance(proba, (int, float)):
-            churn_risk = float(proba)
-        else:
-            churn_risk = 0.0
-
         segment = context.get("segment", "cliente")
         objective = context.get("objective", "reduzir churn")
 
-        bullets = [
-            f"Risco de churn estimado: {churn_risk:.2%} para o segmento {segment}.",
-            f"Objetivo principal: {objective}.",
-        ]
+        bullets = [f"Risco de churn estimado: {overall.mean or 0.0:.2%} para o segmento {segment}."]
+        if overall.count > 1:
+            bullets.append(
+                f"{overall.above} de {overall.count} clientes ({overall.above / overall.count:.1%}) com risco "
+                f"a partir de {overall.threshold:.0%}; mediana {overall.quantile(0.5):.2%}, p90 {overall.quantile(0.9):.2%}."
+            )
+        if groups["geography"]:
+            name, sketch = max(groups["geography"].items(), key=lambda item: item[1].mean or 0.0)
+            bullets.append(f"Geografia de maior risco: {name} ({sketch.mean or 0.0:.2%} em média).")
+        bullets.append(f"Objetivo principal: {objective}.")
 
         if top_factors:
             factors_text = ", ".join(factor["feature"] for factor in top_factors)
             bullets.append(f"Principais fatores observados: {factors_text}.")
 
         recommendation = "Reforçar iniciativas de retenção para clientes de maior risco."
+        risk_summary = {
+            "threshold": overall.threshold,
+            "overall": overall.summary(),
+            **{f"by_{group}": {name: sketch.summary() for name, sketch in sketches.items()}
+               for group, sketches in groups.items()},
+        }
 
+        if overall.out_of_range:
+            logger.warning(
+                "%s of %s scores are outside [0, 1]; is proba wired to raw scores or labels? "
+                "Quantiles are clipped to that range.", overall.out_of_range, overall.count,
+            )
         brief = "\n".join(f"- {bullet}" for bullet in bullets)
-        print("  [ExecutiveBrief] Generated executive summary.")
-        return {"executive_brief": brief, "recommendation": recommendation}
+        logger.info("Generated executive summary over %s predictions.", overall.count)
+        return {"executive_brief": brief, "recommendation": recommendation, "risk_summary": risk_summary}
+
+    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        overall, groups = await self._aggregate(inputs)
+        return self._brief(inputs, overall, groups)
+
+    async def stream(self, inputs: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        yield await self.execute(inputs)
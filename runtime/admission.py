@@ -0,0 +1,177 @@
+"""
+Admission control for executions.
+
+Executions wait here before they start running. A global cap bounds how
+many run at once and a per-user cap keeps one tenant from taking every
+slot. Waiting executions are admitted by weighted fair queuing: every
+(user, priority class) pair is a flow whose requests get virtual finish
+tags spaced by 1/weight, and the lowest tag among flows that are under
+their user's cap goes next. Interactive work therefore overtakes batch
+work without starving it, and users share capacity evenly no matter how
+many executions each of them submits.
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Tuple
+
+from . import metrics
+
+DEFAULT_PRIORITY = "interactive"
+
+FlowKey = Tuple[str, str]  # (user_id, priority)
+
+
+class AdmissionTicket:
+    """One execution's place in the admission queue."""
+
+    def __init__(self, user_id: str, priority: str, queue_depth: int, start: float, tag: float, seq: int):
+        self.user_id = user_id
+        self.priority = priority
+        # Executions already waiting when this one arrived
+        self.queue_depth = queue_depth
+        self.wait_seconds = 0.0
+        self.start = start
+        self.tag = tag
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class _Flow:
+    __slots__ = ("waiters", "finish")
+
+    def __init__(self):
+        self.waiters: Deque[AdmissionTicket] = deque()
+        self.finish = 0.0
+
+
+class AdmissionController:
+    def __init__(self, max_running: int = 16, per_user_limit: int = 4, weights: Optional[Dict[str, float]] = None):
+        # 0 disables the corresponding cap
+        self.max_running = max_running
+        self.per_user_limit = per_user_limit
+        self.weights = weights or {"interactive": 4.0, "batch": 1.0}
+        self._flows: Dict[FlowKey, _Flow] = {}
+        self._running = 0
+        self._running_by_user: Dict[str, int] = {}
+        self._waiting = 0
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_config(cls) -> "AdmissionController":
+        from .config import config
+        return cls(
+            max_running=config.ADMISSION_MAX_RUNNING,
+            per_user_limit=config.ADMISSION_PER_USER_LIMIT,
+            weights={
+                "interactive": config.ADMISSION_INTERACTIVE_WEIGHT,
+                "batch": config.ADMISSION_BATCH_WEIGHT,
+            },
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        user_id: Optional[str],
+        priority: str = DEFAULT_PRIORITY,
+        on_queued: Optional[Callable[[AdmissionTicket], None]] = None,
+    ) -> AsyncIterator[AdmissionTicket]:
+        """Wait for a slot, hold it for the body of the block, then hand it to the next flow."""
+        ticket = await self.acquire(user_id, priority, on_queued)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    async def acquire(
+        self,
+        user_id: Optional[str],
+        priority: str = DEFAULT_PRIORITY,
+        on_queued: Optional[Callable[[AdmissionTicket], None]] = None,
+    ) -> AdmissionTicket:
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        user = user_id or "anonymous"
+        flow = self._flows.setdefault((user, priority), _Flow())
+        start = max(self._virtual_time, flow.finish)
+        flow.finish = start + 1.0 / self.weights[priority]
+        ticket = AdmissionTicket(user, priority, self._waiting, start, flow.finish, next(self._seq))
+        flow.waiters.append(ticket)
+        self._waiting += 1
+        self._dispatch()
+
+        if not ticket.future.done():
+            metrics.ADMISSION_QUEUE_DEPTH.set(self._waiting)
+            if on_queued is not None:
+                on_queued(ticket)
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                # Admitted just as the caller gave up: pass the slot on
+                self.release(ticket)
+            else:
+                flow.waiters.remove(ticket)
+                self._waiting -= 1
+                self._forget_idle((user, priority))
+                metrics.ADMISSION_QUEUE_DEPTH.set(self._waiting)
+            raise
+
+        ticket.wait_seconds = time.monotonic() - ticket.enqueued_at
+        metrics.ADMISSION_WAIT_SECONDS.observe(ticket.wait_seconds, priority=priority)
+        return ticket
+
+    def release(self, ticket: AdmissionTicket):
+        self._running -= 1
+        remaining = self._running_by_user[ticket.user_id] - 1
+        if remaining:
+            self._running_by_user[ticket.user_id] = remaining
+        else:
+            del self._running_by_user[ticket.user_id]
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._waiting and (not self.max_running or self._running < self.max_running):
+            best: Optional[AdmissionTicket] = None
+            best_key: Optional[FlowKey] = None
+            for key, flow in list(self._flows.items()):
+                if not flow.waiters:
+                    self._forget_idle(key)
+                    continue
+                if self.per_user_limit and self._running_by_user.get(key[0], 0) >= self.per_user_limit:
+                    continue
+                head = flow.waiters[0]
+                if best is None or (head.tag, head.seq) < (best.tag, best.seq):
+                    best, best_key = head, key
+            if best is None:
+                break
+
+            self._flows[best_key].waiters.popleft()
+            self._waiting -= 1
+            self._running += 1
+            self._running_by_user[best.user_id] = self._running_by_user.get(best.user_id, 0) + 1
+            self._virtual_time = max(self._virtual_time, best.start)
+            best.future.set_result(None)
+        if not self._waiting and not self._running:
+            # Fully idle: past usage no longer needs to be balanced
+            self._flows.clear()
+        metrics.ADMISSION_QUEUE_DEPTH.set(self._waiting)
+
+    def _forget_idle(self, key: FlowKey):
+        # A drained flow whose finish tag is behind virtual time carries no fairness credit
+        flow = self._flows.get(key)
+        if flow is not None and not flow.waiters and flow.finish <= self._virtual_time:
+            del self._flows[key]
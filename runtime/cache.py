@@ -0,0 +1,260 @@
+"""
+Content-addressed memoization of step results.
+
+Entries are keyed by a stable hash of the node type, its config and the
+resolved inputs, kept in an in-memory LRU and optionally mirrored to disk
+so that results survive process restarts. Both tiers are bounded by size:
+the memory tier by the estimated bytes of its results, the disk tier by
+the bytes of its files (least recently used files are deleted first).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from nodes.core.table import Table, content_digest
+
+
+class _FingerprintEncoder(json.JSONEncoder):
+    def default(self, value: Any) -> Any:
+        if isinstance(value, (bytes, bytearray)):
+            return hashlib.sha256(value).hexdigest()
+        if isinstance(value, (set, frozenset)):
+            return sorted(repr(item) for item in value)
+        # Tables and NumPy arrays are hashed by content, never by repr
+        digest = content_digest(value)
+        if digest is not None:
+            return digest
+        return repr(value)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable sha256 of arbitrarily nested JSON-like data (dict key order does not matter)."""
+    digest = hashlib.sha256()
+    encoder = _FingerprintEncoder(sort_keys=True, separators=(",", ":"))
+    for chunk in encoder.iterencode(list(parts)):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def estimate_nbytes(value: Any, _sample: int = 100) -> int:
+    """
+    Rough in-memory size of a step output. Arrays and Tables report their
+    buffers; long lists and object arrays are extrapolated from a sample,
+    so this stays cheap on outputs with millions of cells.
+    """
+    if isinstance(value, Table):
+        return sum(estimate_nbytes(array) for array in value.columns.values())
+    if isinstance(value, np.ndarray):
+        if value.dtype != object or not value.size:
+            return value.nbytes
+        items = value.reshape(-1)
+        sample = items[:_sample].tolist()
+        return value.nbytes + sum(estimate_nbytes(item) for item in sample) * len(items) // len(sample)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(key) + estimate_nbytes(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return sys.getsizeof(value)
+        sample = value[:_sample]
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in sample) * len(value) // len(sample)
+    return sys.getsizeof(value)
+
+
+class StepCache:
+    """LRU memory tier in front of an optional pickle-per-entry disk tier, both bounded by bytes."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        default_ttl: Optional[float] = None,
+        disk_path: Optional[str] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        disk_max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        # 0 disables the corresponding bound
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.default_ttl = default_ttl
+        self.disk_path = Path(disk_path) if disk_path else None
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.nbytes = 0
+        # Bytes on disk as seen by this process; None until the directory is first scanned
+        self._disk_bytes: Optional[int] = None
+        self._disk_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls) -> "StepCache":
+        from .config import config
+        return cls(
+            max_entries=config.STEP_CACHE_MAX_ENTRIES,
+            default_ttl=config.STEP_CACHE_TTL_SECONDS or None,
+            disk_path=config.STEP_CACHE_DIR or None,
+            max_bytes=config.STEP_CACHE_MAX_MB * 1024 * 1024,
+            disk_max_bytes=config.STEP_CACHE_DISK_MAX_MB * 1024 * 1024,
+        )
+
+    def _expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+    def _disk_file(self, key: str) -> Path:
+        return self.disk_path / key[:2] / f"{key}.pkl"
+
+    def _drop_memory(self, key: str):
+        self._entries.pop(key, None)
+        self.nbytes -= self._sizes.pop(key, 0)
+
+    def _get_memory(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.time():
+            self._drop_memory(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _set_memory(self, key: str, value: Any, expires_at: Optional[float]):
+        self._drop_memory(key)
+        size = estimate_nbytes(value)
+        if self.max_bytes and size > self.max_bytes:
+            # Would evict everything else; such results are only kept on disk
+            return
+        self._entries[key] = (expires_at, value)
+        self._sizes[key] = size
+        self.nbytes += size
+        while self._entries and (
+            (self.max_entries and len(self._entries) > self.max_entries)
+            or (self.max_bytes and self.nbytes > self.max_bytes)
+        ):
+            self._drop_memory(next(iter(self._entries)))
+
+    def _get_disk(self, key: str) -> Tuple[bool, Any, Optional[float]]:
+        path = self._disk_file(key)
+        try:
+            with path.open("rb") as handle:
+                expires_at, value = pickle.load(handle)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return False, None, None
+        if expires_at is not None and expires_at < time.time():
+            path.unlink(missing_ok=True)
+            return False, None, None
+        try:
+            # The mtime doubles as the last-use time for disk eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return True, value, expires_at
+
+    def _set_disk(self, key: str, value: Any, expires_at: Optional[float]):
+        path = self._disk_file(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per writer: concurrent stores of the same key never share a temp file
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{key}.", suffix=".tmp", delete=False) as handle:
+            tmp_path = Path(handle.name)
+            try:
+                pickle.dump((expires_at, value), handle, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                # Unpicklable results simply stay memory-only
+                handle.close()
+                tmp_path.unlink(missing_ok=True)
+                return
+        try:
+            size = tmp_path.stat().st_size
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._account_disk(size)
+
+    def _disk_usage(self) -> Dict[Path, os.stat_result]:
+        usage = {}
+        for path in self.disk_path.glob("*/*.pkl"):
+            try:
+                usage[path] = path.stat()
+            except FileNotFoundError:
+                pass
+        return usage
+
+    def _account_disk(self, written: int):
+        if not self.disk_max_bytes:
+            return
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(stat.st_size for stat in self._disk_usage().values())
+            else:
+                self._disk_bytes += written
+            if self._disk_bytes <= self.disk_max_bytes:
+                return
+            # Over budget (possibly because of other processes' writes too): rescan and
+            # delete least recently used files down to 90% of the budget
+            usage = self._disk_usage()
+            total = sum(stat.st_size for stat in usage.values())
+            for path, stat in sorted(usage.items(), key=lambda item: item[1].st_mtime):
+                if total <= self.disk_max_bytes * 0.9:
+                    break
+                path.unlink(missing_ok=True)
+                total -= stat.st_size
+            self._disk_bytes = total
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        hit, value = self._get_memory(key)
+        if not hit and self.disk_path:
+            hit, value, expires_at = self._get_disk(key)
+            if hit:
+                self._set_memory(key, value, expires_at)
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return hit, value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = self._expires_at(ttl)
+        self._set_memory(key, value, expires_at)
+        if self.disk_path:
+            self._set_disk(key, value, expires_at)
+
+    async def aget(self, key: str) -> Tuple[bool, Any]:
+        """Like get(), but disk lookups run off the event loop."""
+        hit, value = self._get_memory(key)
+        if hit:
+            self.hits += 1
+            return hit, value
+        if not self.disk_path:
+            self.misses += 1
+            return False, None
+        hit, value, expires_at = await asyncio.to_thread(self._get_disk, key)
+        if hit:
+            self.hits += 1
+            self._set_memory(key, value, expires_at)
+        else:
+            self.misses += 1
+        return hit, value
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None):
+        expires_at = self._expires_at(ttl)
+        self._set_memory(key, value, expires_at)
+        if self.disk_path:
+            await asyncio.to_thread(self._set_disk, key, value, expires_at)
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self.nbytes = 0
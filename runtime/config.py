@@ -38,6 +38,76 @@ class Config:
     RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
     
+    # Execution Engine
+    EXECUTION_MAX_CONCURRENCY: int = int(os.getenv("EXECUTION_MAX_CONCURRENCY", "8"))
+    RUNTIME_MAX_CONCURRENCY: int = int(os.getenv("RUNTIME_MAX_CONCURRENCY", "32"))
+    # Default deadline of a whole execution in seconds (0 = none); overridable per request
+    EXECUTION_TIMEOUT_SECONDS: float = float(os.getenv("EXECUTION_TIMEOUT_SECONDS", "0"))
+    # Batches buffered between two pipelined streaming steps (backpressure bound)
+    STREAM_QUEUE_SIZE: int = int(os.getenv("STREAM_QUEUE_SIZE", "4"))
+    # Drop intermediate step outputs once their last consumer ran (only final outputs are returned);
+    # also lets streaming steps whose output is dropped be pipelined into their consumer
+    RUNTIME_FREE_INTERMEDIATES: bool = os.getenv("RUNTIME_FREE_INTERMEDIATES", "false").lower() == "true"
+    
+    # Worker processes for cpu_bound nodes and sharded PII hashing (empty = one per CPU, 0 = run everything in-process)
+    NODE_PROCESS_POOL_SIZE: Optional[int] = int(os.getenv("NODE_PROCESS_POOL_SIZE")) if os.getenv("NODE_PROCESS_POOL_SIZE") else None
+    
+    # Warm node instances kept per (node_type, config) and how long they may sit idle
+    NODE_POOL_MAX_IDLE: int = int(os.getenv("NODE_POOL_MAX_IDLE", "4"))
+    NODE_POOL_IDLE_TTL_SECONDS: float = float(os.getenv("NODE_POOL_IDLE_TTL_SECONDS", "300"))
+    
+    # Loaded models kept per process (LRU by pickle size, 0 = no budget) and models loaded at startup
+    MODEL_REGISTRY_MAX_MB: int = int(os.getenv("MODEL_REGISTRY_MAX_MB", "2048"))
+    MODEL_PRELOAD_PATHS: list = [path.strip() for path in os.getenv("MODEL_PRELOAD_PATHS", "").split(",") if path.strip()]
+    
+    # Embeddings kept in memory per process, and the SQLite file persisting them (empty = memory only)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "")
+    # Directory holding one memory-mapped vector index per store_id
+    VECTOR_STORE_DIR: str = os.getenv("VECTOR_STORE_DIR", "vector_stores")
+    
+    # Incremental re-execution: memory for the last step outputs of saved flows that set
+    # "incremental": true in their metadata (MB, 0 disables)
+    INCREMENTAL_MAX_MB: int = int(os.getenv("INCREMENTAL_MAX_MB", "0"))
+    
+    # Step Result Cache (opt-in memoization of deterministic nodes)
+    STEP_CACHE_ENABLED: bool = os.getenv("STEP_CACHE_ENABLED", "false").lower() == "true"
+    STEP_CACHE_MAX_ENTRIES: int = int(os.getenv("STEP_CACHE_MAX_ENTRIES", "256"))
+    # Byte budgets of the in-memory tier (estimated result size) and of STEP_CACHE_DIR; 0 = unbounded
+    STEP_CACHE_MAX_MB: int = int(os.getenv("STEP_CACHE_MAX_MB", "256"))
+    STEP_CACHE_DISK_MAX_MB: int = int(os.getenv("STEP_CACHE_DISK_MAX_MB", "1024"))
+    STEP_CACHE_TTL_SECONDS: float = float(os.getenv("STEP_CACHE_TTL_SECONDS", "0"))
+    STEP_CACHE_DIR: str = os.getenv("STEP_CACHE_DIR", "")
+    
+    # Admission control: executions running at once (process-wide and per user, 0 = no cap)
+    # and fair-queuing weights of the priority classes
+    ADMISSION_MAX_RUNNING: int = int(os.getenv("ADMISSION_MAX_RUNNING", "16"))
+    ADMISSION_PER_USER_LIMIT: int = int(os.getenv("ADMISSION_PER_USER_LIMIT", "4"))
+    ADMISSION_INTERACTIVE_WEIGHT: float = float(os.getenv("ADMISSION_INTERACTIVE_WEIGHT", "4"))
+    ADMISSION_BATCH_WEIGHT: float = float(os.getenv("ADMISSION_BATCH_WEIGHT", "1"))
+    
+    # Execution progress events (SSE): per-subscriber buffer, replay kept per running
+    # execution, and how often executions running in other processes are polled
+    EVENT_QUEUE_SIZE: int = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+    EVENT_HISTORY_SIZE: int = int(os.getenv("EVENT_HISTORY_SIZE", "256"))
+    EVENT_POLL_INTERVAL_SECONDS: float = float(os.getenv("EVENT_POLL_INTERVAL_SECONDS", "1.0"))
+    EVENT_KEEPALIVE_SECONDS: float = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+    
+    # Where executions run: "inline" (API process background tasks) or "queue"
+    # (durable jobs table drained by `python -m runtime.worker` processes)
+    EXECUTION_BACKEND: str = os.getenv("EXECUTION_BACKEND", "inline").lower()
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    WORKER_POLL_INTERVAL_SECONDS: float = float(os.getenv("WORKER_POLL_INTERVAL_SECONDS", "1.0"))
+    WORKER_HEARTBEAT_SECONDS: float = float(os.getenv("WORKER_HEARTBEAT_SECONDS", "5"))
+    # A running job whose heartbeat is older than this is considered orphaned and requeued
+    WORKER_STALE_AFTER_SECONDS: float = float(os.getenv("WORKER_STALE_AFTER_SECONDS", "30"))
+    WORKER_MAX_ATTEMPTS: int = int(os.getenv("WORKER_MAX_ATTEMPTS", "3"))
+    
+    # Logging (sample rate applies to sub-WARNING records, per execution)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     
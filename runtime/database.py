@@ -1,12 +1,18 @@
 import sqlite3
 import json
+import time
 import uuid
+import functools
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
+from .metrics import DB_CALL_SECONDS
+from nodes.core.table import json_default
 
 DB_PATH = "aion.db"
 
+FINAL_EXECUTION_STATUSES = ("completed", "failed", "cancelled", "deadline_exceeded")
+
 class UserRecord(BaseModel):
     id: str
     username: str
@@ -28,6 +34,15 @@ class ExecutionRecord(BaseModel):
     completed_at: Optional[str] = None
     user_id: Optional[str] = None
 
+def timed(func):
+    """Record the call latency of a database operation in aion_db_call_seconds."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with DB_CALL_SECONDS.time(operation=func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+@timed
 def init_db():
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
@@ -55,7 +70,31 @@ def init_db():
          c.execute("ALTER TABLE executions ADD COLUMN user_id TEXT")
     except sqlite3.OperationalError:
         pass
-    
+
+    # Admission reporting columns
+    for column in ("priority TEXT", "queue_depth INTEGER", "queue_wait_seconds REAL", "cancel_requested INTEGER DEFAULT 0"):
+        try:
+            c.execute(f"ALTER TABLE executions ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass
+    
+    # Job Queue (executions waiting for / claimed by a worker process)
+    c.execute('''CREATE TABLE IF NOT EXISTS jobs
+                 (id TEXT PRIMARY KEY, execution_id TEXT, kind TEXT, payload TEXT,
+                  status TEXT, attempts INTEGER DEFAULT 0, worker_id TEXT,
+                  enqueued_at REAL, heartbeat_at REAL, user_id TEXT)''')
+    # Claim order: higher priority weight first, then oldest
+    for column in ("priority TEXT", "priority_weight REAL DEFAULT 1"):
+        try:
+            c.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, enqueued_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, priority_weight DESC, enqueued_at)")
+
+    # Readers (API) and writers (workers) in different processes must not block each other
+    c.execute("PRAGMA journal_mode=WAL")
+
     # Secrets Table (encrypted API keys)
     c.execute('''CREATE TABLE IF NOT EXISTS secrets
                  (id TEXT PRIMARY KEY, user_id TEXT, key TEXT, 
@@ -66,6 +105,7 @@ def init_db():
 
 # --- User Operations ---
 
+@timed
 def create_user(username: str, hashed_password: str) -> str:
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
@@ -80,6 +120,7 @@ def create_user(username: str, hashed_password: str) -> str:
     finally:
         conn.close()
 
+@timed
 def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
@@ -91,6 +132,7 @@ def get_user_by_username(username: str) -> Optional[Dict[str, Any]]:
 
 # --- Flow Operations (Updated with user_id) ---
 
+@timed
 def create_flow(dsl: Dict[str, Any], user_id: str = None) -> str:
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
@@ -106,6 +148,7 @@ def create_flow(dsl: Dict[str, Any], user_id: str = None) -> str:
     conn.close()
     return flow_id
 
+@timed
 def list_flows(user_id: str = None) -> List[Dict[str, Any]]:
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
@@ -127,6 +170,7 @@ def list_flows(user_id: str = None) -> List[Dict[str, Any]]:
     conn.close()
     return flows
 
+@timed
 def get_flow(flow_id: str, user_id: str = None) -> Optional[Dict[str, Any]]:
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
@@ -151,6 +195,7 @@ def get_flow(flow_id: str, user_id: str = None) -> Optional[Dict[str, Any]]:
         return data
     return None
 
+@timed
 def update_flow(flow_id: str, dsl: Dict[str, Any], user_id: str = None) -> bool:
     """Update a flow's DSL (with ownership check)"""
     conn = sqlite3.connect(DB_PATH)
@@ -172,6 +217,7 @@ def update_flow(flow_id: str, dsl: Dict[str, Any], user_id: str = None) -> bool:
     conn.close()
     return updated
 
+@timed
 def delete_flow(flow_id: str, user_id: str = None) -> bool:
     """Delete a flow (with ownership check)"""
     conn = sqlite3.connect(DB_PATH)
@@ -193,6 +239,7 @@ def delete_flow(flow_id: str, user_id: str = None) -> bool:
 
 # --- Execution Operations (Updated with user_id) ---
 
+@timed
 def create_execution(flow_id: str, user_id: str = None) -> str:
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
@@ -208,12 +255,14 @@ def create_execution(flow_id: str, user_id: str = None) -> str:
     conn.close()
     return exec_id
 
+@timed
 def update_execution(exec_id: str, status: str, result: Optional[Dict[str, Any]] = None):
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     
-    completed_at = datetime.utcnow().isoformat() if status in ["completed", "failed"] else None
-    result_json = json.dumps(result) if result else None
+    completed_at = datetime.utcnow().isoformat() if status in FINAL_EXECUTION_STATUSES else None
+    # Columnar node outputs become row dicts only here, at the API boundary
+    result_json = json.dumps(result, default=json_default) if result else None
     
     query = "UPDATE executions SET status = ?"
     params = [status]
@@ -233,6 +282,63 @@ def update_execution(exec_id: str, status: str, result: Optional[Dict[str, Any]]
     conn.commit()
     conn.close()
 
+@timed
+def request_cancel(exec_id: str) -> bool:
+    """
+    Flag an execution for cancellation (workers check the flag while
+    heartbeating). An execution still waiting in the job queue is
+    cancelled right away; returns True in that case.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("UPDATE executions SET cancel_requested = 1 WHERE id = ?", (exec_id,))
+    c.execute("UPDATE jobs SET status = 'cancelled' WHERE execution_id = ? AND status = 'queued'", (exec_id,))
+    dequeued = c.rowcount > 0
+    if dequeued:
+        c.execute("UPDATE executions SET status = 'cancelled', completed_at = ? WHERE id = ?",
+                  (datetime.utcnow().isoformat(), exec_id))
+    conn.commit()
+    conn.close()
+    return dequeued
+
+@timed
+def is_cancel_requested(exec_id: str) -> bool:
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT cancel_requested FROM executions WHERE id = ?", (exec_id,))
+    row = c.fetchone()
+    conn.close()
+    return bool(row and row[0])
+
+@timed
+def record_admission(exec_id: str, priority: str, queue_depth: int, queue_wait_seconds: Optional[float] = None):
+    """Store where an execution entered the admission queue and, once admitted, how long it waited."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("UPDATE executions SET priority = ?, queue_depth = ?, queue_wait_seconds = ? WHERE id = ?",
+              (priority, queue_depth, queue_wait_seconds, exec_id))
+    conn.commit()
+    conn.close()
+
+@timed
+def get_execution_state(exec_id: str, user_id: str = None) -> Optional[str]:
+    """Just the status of an execution, without loading and decoding its result."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+
+    query = "SELECT status FROM executions WHERE id = ?"
+    params = [exec_id]
+
+    if user_id:
+        query += " AND user_id = ?"
+        params.append(user_id)
+
+    c.execute(query, tuple(params))
+    row = c.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+@timed
 def get_execution(exec_id: str, user_id: str = None) -> Optional[Dict[str, Any]]:
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
@@ -255,3 +361,130 @@ def get_execution(exec_id: str, user_id: str = None) -> Optional[Dict[str, Any]]
             data["result"] = json.loads(data["result"])
         return data
     return None
+
+# --- Job Queue Operations ---
+# Jobs are claimed with BEGIN IMMEDIATE, which takes the database write lock
+# before reading, so two workers can never claim the same job.
+
+@timed
+def enqueue_job(execution_id: str, kind: str, payload: Dict[str, Any], user_id: str = None,
+                priority: str = "batch", priority_weight: float = 1.0) -> str:
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+
+    job_id = str(uuid.uuid4())
+    c.execute("INSERT INTO jobs (id, execution_id, kind, payload, status, attempts, enqueued_at, user_id, "
+              "priority, priority_weight) VALUES (?, ?, ?, ?, 'queued', 0, ?, ?, ?, ?)",
+              (job_id, execution_id, kind, json.dumps(payload, default=json_default), time.time(), user_id,
+               priority, priority_weight))
+
+    conn.commit()
+    conn.close()
+    return job_id
+
+@timed
+def claim_job(worker_id: str, per_user_limit: int = 0, max_running: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Atomically take the next queued job, or return None if nothing may start.
+
+    Applies the admission policy across every worker: at most max_running jobs
+    run at once and at most per_user_limit per user (0 disables either cap).
+    Among users under their cap, jobs are taken in weighted fair order, i.e.
+    by (the user's running jobs + 1) / priority weight, oldest first among
+    equals, so one tenant's burst cannot fill every worker and interactive
+    work overtakes batch work.
+    """
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    try:
+        c.execute("BEGIN IMMEDIATE")
+        if max_running:
+            running = c.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()[0]
+            if running >= max_running:
+                c.execute("COMMIT")
+                return None
+        c.execute(
+            "SELECT j.* FROM jobs j LEFT JOIN "
+            "(SELECT user_id, COUNT(*) AS running FROM jobs WHERE status = 'running' GROUP BY user_id) r "
+            "ON r.user_id IS j.user_id "
+            "WHERE j.status = 'queued' AND (? = 0 OR COALESCE(r.running, 0) < ?) "
+            "ORDER BY (COALESCE(r.running, 0) + 1) / j.priority_weight, j.enqueued_at LIMIT 1",
+            (per_user_limit, per_user_limit),
+        )
+        row = c.fetchone()
+        if row is None:
+            c.execute("COMMIT")
+            return None
+
+        now = time.time()
+        c.execute("UPDATE jobs SET status = 'running', worker_id = ?, attempts = attempts + 1, heartbeat_at = ? "
+                  "WHERE id = ?", (worker_id, now, row["id"]))
+        c.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job.update(status="running", worker_id=worker_id, attempts=job["attempts"] + 1, heartbeat_at=now)
+    return job
+
+@timed
+def heartbeat_job(job_id: str, worker_id: str) -> bool:
+    """Refresh a running job's lease. False means the job is no longer owned by this worker."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+              (time.time(), job_id, worker_id))
+    owned = c.rowcount > 0
+    conn.commit()
+    conn.close()
+    return owned
+
+@timed
+def complete_job(job_id: str, worker_id: str, status: str = "done") -> bool:
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("UPDATE jobs SET status = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+              (status, job_id, worker_id))
+    completed = c.rowcount > 0
+    conn.commit()
+    conn.close()
+    return completed
+
+@timed
+def requeue_stale_jobs(stale_after_seconds: float, max_attempts: int) -> int:
+    """
+    Put running jobs whose worker stopped heartbeating back in the queue.
+    Jobs that already used max_attempts are failed instead, along with
+    their execution record. Returns the number of jobs recovered.
+    """
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
+    c = conn.cursor()
+    cutoff = time.time() - stale_after_seconds
+    try:
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("SELECT id, execution_id, attempts FROM jobs WHERE status = 'running' AND heartbeat_at < ?",
+                  (cutoff,))
+        stale = c.fetchall()
+        for job_id, execution_id, attempts in stale:
+            if attempts < max_attempts:
+                c.execute("UPDATE jobs SET status = 'queued', worker_id = NULL WHERE id = ?", (job_id,))
+                c.execute("UPDATE executions SET status = 'pending' WHERE id = ?", (execution_id,))
+            else:
+                c.execute("UPDATE jobs SET status = 'failed' WHERE id = ?", (job_id,))
+                c.execute("UPDATE executions SET status = 'failed', result = ?, completed_at = ? WHERE id = ?",
+                          (json.dumps({"error": f"Worker lost after {attempts} attempts"}),
+                           datetime.utcnow().isoformat(), execution_id))
+        c.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return len(stale)
@@ -0,0 +1,83 @@
+"""
+In-process event bus for execution progress.
+
+The runtime publishes step-started / step-finished events and the API
+publishes completed once the execution record is final. Subscribers
+(the SSE endpoint) get their own bounded queue; a subscriber that falls
+behind loses its oldest events rather than slowing the runtime down.
+Recent events of running executions are kept so a subscriber that
+connects mid-run first receives what it missed.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Set
+
+# Published by the API once the execution record is final; ends SSE streams
+TERMINAL_EVENT = "completed"
+# The runtime is done with the execution; its replay history can go
+_HISTORY_END = {"execution-finished", TERMINAL_EVENT}
+
+
+class Subscription:
+    def __init__(self, maxsize: int):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def deliver(self, event: Dict[str, Any]):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None if none arrived within `timeout` seconds."""
+        if not self._queue.empty():
+            return self._queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    def __init__(self, queue_size: int = 256, history_size: int = 256):
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._history: Dict[str, Deque[Dict[str, Any]]] = {}
+
+    @classmethod
+    def from_config(cls) -> "EventBus":
+        from .config import config
+        return cls(queue_size=config.EVENT_QUEUE_SIZE, history_size=config.EVENT_HISTORY_SIZE)
+
+    def publish(self, execution_id: Optional[str], event_type: str, **fields: Any):
+        if not execution_id:
+            return
+        event = {"type": event_type, "execution_id": execution_id, "ts": time.time(), **fields}
+        if event_type in _HISTORY_END:
+            self._history.pop(execution_id, None)
+        else:
+            history = self._history.get(execution_id)
+            if history is None:
+                history = self._history[execution_id] = deque(maxlen=self.history_size)
+            history.append(event)
+        for subscription in self._subscribers.get(execution_id, ()):
+            subscription.deliver(event)
+
+    @contextmanager
+    def subscribe(self, execution_id: str) -> Iterator[Subscription]:
+        subscription = Subscription(self.queue_size)
+        for event in self._history.get(execution_id, ()):
+            subscription.deliver(event)
+        self._subscribers.setdefault(execution_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(execution_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[execution_id]
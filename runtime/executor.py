@@ -1,6 +1,20 @@
 import asyncio
-from typing import Dict, Any, List
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
+from .config import config
+from .cache import StepCache, fingerprint
+from .streaming import StreamChannel, materialize, pump, stream_edges
+from .offload import ProcessOffloader
+from .node_pool import NodeInstancePool
+from .incremental import ExecutionSnapshotStore, step_fingerprints
+from .events import EventBus
+from . import metrics
+from .structured_logging import execution_id_var, execution_sampled_var, is_sampled, step_id_var, summarize
+from nodes.core.base import execution_deadline, process_runner
+from nodes.registry import NodeRegistry
 
 # Duplicate definition for now to avoid package import issues across folders in this env
 class InputBinding(BaseModel):
@@ -15,46 +29,485 @@ class ExecutionStep(BaseModel):
     config: Dict[str, Any]
     depends_on: List[str]
     input_bindings: List[InputBinding] = []
+    consumers: List[str] = []
+    retain_output: bool = True
 
 class ExecutionPlan(BaseModel):
     flow_id: str
     steps: List[ExecutionStep]
     metadata: Dict[str, Any]
 
+logger = logging.getLogger(__name__)
+
+class ExecutionControl:
+    """Cancellation flag and deadline of one running execution."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.cancelled = asyncio.Event()
+        self.deadline = None
+        self.start(timeout)
+
+    def start(self, timeout: Optional[float]):
+        if timeout:
+            self.deadline = time.monotonic() + timeout
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def status(self) -> str:
+        if self.cancelled.is_set():
+            return "cancelled"
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline_exceeded"
+        return "success"
+
+    async def wait(self, tasks) -> set:
+        """Wait for the first of `tasks` to finish, a cancel request or the deadline."""
+        stop = asyncio.create_task(self.cancelled.wait())
+        try:
+            done, _ = await asyncio.wait({*tasks, stop}, timeout=self.remaining(), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stop.cancel()
+        done.discard(stop)
+        return done
+
 class Executioncontext:
     def __init__(self):
         self.results = {} # step_id -> result
         self.state = {}
+        self.inputs = {} # flow-level inputs handed to root steps
+        self.execution_id = None
+        # Incremental re-execution (see runtime/incremental.py)
+        self.fingerprints = {} # step_id -> fingerprint of this run
+        self.reused = {} # step_id -> output carried over from the previous run
+        self.skipped = set() # step_ids whose output no step of this run needs
+        self.snapshot = {} # step_id -> (fingerprint, result) recorded for the next run
+        self.control = ExecutionControl()
+        self.status = "success" # or "cancelled" / "deadline_exceeded" when the run was stopped
+        self.interrupted = [] # step_ids cancelled mid-run
+        self.not_started = [] # step_ids never launched because the run was stopped
 
 class AIONRuntime:
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[StepCache] = None,
+        offloader: Optional[ProcessOffloader] = None,
+        node_pool: Optional[NodeInstancePool] = None,
+        snapshots: Optional[ExecutionSnapshotStore] = None,
+        events: Optional[EventBus] = None,
+    ):
+        # Process-wide cap shared by every execution running on this runtime
+        self._process_slots = asyncio.Semaphore(max_concurrency or config.RUNTIME_MAX_CONCURRENCY)
+        # Step result memoization is opt-in (STEP_CACHE_ENABLED or an explicit cache)
+        if cache is None and config.STEP_CACHE_ENABLED:
+            cache = StepCache.from_config()
+        self.cache = cache
+        self.offloader = offloader or ProcessOffloader.from_config()
+        self.node_pool = node_pool or NodeInstancePool.from_config()
+        self.snapshots = snapshots or ExecutionSnapshotStore.from_config()
+        self.events = events or EventBus.from_config()
+        self._controls: Dict[str, ExecutionControl] = {}
+
+    async def shutdown(self):
+        self.offloader.shutdown()
+        await self.node_pool.close()
+
+    def cancel(self, execution_id: str) -> bool:
+        """Stop a running execution; False if it is not running on this runtime."""
+        control = self._controls.get(execution_id)
+        if control is None:
+            return False
+        control.cancelled.set()
+        return True
+
+    def _prepare_control(
+        self,
+        plan: ExecutionPlan,
+        control: Optional[ExecutionControl],
+        timeout: Optional[float],
+    ) -> ExecutionControl:
+        # A caller-supplied control may already carry a deadline (e.g. one that covers queueing)
+        control = control or ExecutionControl()
+        if control.deadline is None:
+            original_metadata = plan.metadata.get("original_metadata") or {}
+            control.start(timeout or float(original_metadata.get("timeout_seconds") or config.EXECUTION_TIMEOUT_SECONDS))
+        return control
 
-    async def execute_plan(self, plan_data: Dict[str, Any]):
+    def _resolve_max_concurrency(self, plan: ExecutionPlan, max_concurrency: Optional[int]) -> int:
+        if max_concurrency:
+            return max_concurrency
+        original_metadata = plan.metadata.get("original_metadata") or {}
+        return int(original_metadata.get("max_concurrency") or config.EXECUTION_MAX_CONCURRENCY)
+
+    async def execute_plan(
+        self,
+        plan_data: Dict[str, Any],
+        max_concurrency: Optional[int] = None,
+        free_intermediates: Optional[bool] = None,
+        execution_id: Optional[str] = None,
+        snapshot_key: Optional[str] = None,
+        inputs: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        control: Optional[ExecutionControl] = None,
+    ):
         plan = ExecutionPlan(**plan_data)
         context = Executioncontext()
+        context.inputs = inputs or {}
+        context.execution_id = execution_id
+        context.control = self._prepare_control(plan, control, timeout)
+        execution_slots = asyncio.Semaphore(self._resolve_max_concurrency(plan, max_concurrency))
+        if free_intermediates is None:
+            free_intermediates = config.RUNTIME_FREE_INTERMEDIATES
+
+        node_classes = self._node_classes(plan)
+        original_metadata = plan.metadata.get("original_metadata") or {}
+        # Opt-in per flow: snapshots keep every step output in memory until the next run
+        incremental = bool(snapshot_key) and self.snapshots.enabled and bool(original_metadata.get("incremental"))
+        if incremental:
+            self._plan_incremental_run(plan, context, node_classes, snapshot_key)
+
+        self.events.publish(execution_id, "execution-started", flow_id=plan.flow_id, steps=len(plan.steps))
+        try:
+            with self._track_execution(execution_id), self._controlled(execution_id, context.control):
+                results = await self._schedule(plan, context, execution_slots, free_intermediates, node_classes)
+        except BaseException as exc:
+            # Task cancelled from outside or the scheduler crashed: never report "success"
+            if context.status == "success":
+                context.status = "cancelled" if isinstance(exc, asyncio.CancelledError) else "failed"
+            raise
+        finally:
+            self.events.publish(execution_id, "execution-finished", status=context.status)
+
+        if context.status != "success":
+            # Partial results only; the snapshot of the previous run stays intact
+            return {
+                "status": context.status,
+                "results": results,
+                "interrupted_steps": context.interrupted,
+                "not_started_steps": context.not_started,
+            }
+        if not incremental:
+            return {"status": "success", "results": results}
+        self.snapshots.save(snapshot_key, context.snapshot)
+        return {
+            "status": "success",
+            "results": results,
+            "reused_steps": [step.step_id for step in plan.steps if step.step_id in context.reused],
+            "skipped_steps": [step.step_id for step in plan.steps if step.step_id in context.skipped],
+        }
+
+    async def execute_plan_batch(
+        self,
+        plan_data: Dict[str, Any],
+        items: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        execution_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        control: Optional[ExecutionControl] = None,
+    ):
+        """
+        Run one compiled plan over many input payloads (each handed to the
+        root steps). Steps are processed in plan order across all items:
+        batchable nodes receive every item in a single execute_batch() call,
+        other nodes run once per item with bounded concurrency.
+        """
+        plan = ExecutionPlan(**plan_data)
+        item_slots = asyncio.Semaphore(self._resolve_max_concurrency(plan, max_concurrency))
+        node_classes = self._node_classes(plan)
+        item_results: List[Dict[str, Any]] = [{} for _ in items]
+        control = self._prepare_control(plan, control, timeout)
+        status = "success"
+
+        self.events.publish(execution_id, "execution-started", flow_id=plan.flow_id, steps=len(plan.steps), batch_size=len(items))
+        try:
+            with self._track_execution(execution_id), self._controlled(execution_id, control):
+                logger.info("Starting batch execution of flow %s over %d items", plan.flow_id, len(items))
+                for step in plan.steps:
+                    self.events.publish(execution_id, "step-started", step_id=step.step_id, node_type=step.node_type)
+                    step_id_var.set(step.step_id)
+                    step_inputs = [
+                        self._resolve_inputs(step, results, item)
+                        for results, item in zip(item_results, items)
+                    ]
+                    node_class = node_classes.get(step.node_type)
+                    started = time.perf_counter()
+                    if node_class is not None and node_class.batchable:
+                        task = asyncio.create_task(self._execute_batched(step, step_inputs))
+                    else:
+                        task = asyncio.ensure_future(asyncio.gather(*(
+                            self._execute_item(step, inputs, item_slots) for inputs in step_inputs
+                        )))
+                    done = set()
+                    try:
+                        while not done and control.status == "success":
+                            done = await control.wait([task])
+                    except asyncio.CancelledError:
+                        task.cancel()
+                        raise
+                    if not done:
+                        status = control.status
+                        task.cancel()
+                        await asyncio.gather(task, return_exceptions=True)
+                        logger.warning("Batch execution of flow %s stopped at step %s: %s", plan.flow_id, step.step_id, status)
+                        break
+                    outputs = task.result()
+                    elapsed = time.perf_counter() - started
+                    metrics.STEP_SECONDS.observe(elapsed, node_type=step.node_type)
+                    failed = sum(1 for output in outputs if isinstance(output, dict) and "error" in output)
+                    self.events.publish(
+                        execution_id, "step-finished", step_id=step.step_id, node_type=step.node_type,
+                        status="failed" if failed else "success", failed_items=failed, duration_seconds=round(elapsed, 6),
+                    )
+                    for results, output in zip(item_results, outputs):
+                        results[step.step_id] = output
+                else:
+                    logger.info("Batch execution of flow %s completed", plan.flow_id)
+        except BaseException as exc:
+            # Crashed or cancelled from outside: subscribers still get a final event
+            if status == "success":
+                status = "cancelled" if isinstance(exc, asyncio.CancelledError) else "failed"
+            raise
+        finally:
+            self.events.publish(execution_id, "execution-finished", status=status)
+
+        return {
+            "status": status,
+            "batch_size": len(items),
+            "items": [
+                {
+                    "status": "failed" if any(isinstance(r, dict) and "error" in r for r in results.values()) else "success",
+                    "results": results,
+                }
+                for results in item_results
+            ],
+        }
+
+    async def _execute_item(self, step: ExecutionStep, inputs: Dict[str, Any], item_slots: asyncio.Semaphore):
+        async with item_slots, self._process_slots:
+            return await self._simulate_node_execution(step.node_type, step.config, inputs)
+
+    async def _execute_batched(self, step: ExecutionStep, inputs_batch: List[Dict[str, Any]]) -> List[Any]:
+        try:
+            async with self._process_slots, self.node_pool.lease(step.node_type, step.config) as node_instance:
+                if node_instance.cpu_bound and self.offloader.enabled:
+                    return await self.offloader.run(
+                        node_instance, step.node_type, step.config, inputs_batch, method="execute_batch"
+                    )
+                return await node_instance.execute_batch(inputs_batch)
+        except Exception as e:
+            logger.warning("Failed to execute batched node %s: %s", step.node_type, e, exc_info=True)
+            return [{"error": str(e)} for _ in inputs_batch]
+
+    @contextmanager
+    def _controlled(self, execution_id: Optional[str], control: ExecutionControl):
+        """Make the execution cancellable by id and expose its deadline and process pool to nodes."""
+        if execution_id:
+            self._controls[execution_id] = control
+        token = execution_deadline.set(control.deadline)
+        runner_token = process_runner.set(self.offloader.call if self.offloader.enabled else None)
+        try:
+            yield
+        finally:
+            process_runner.reset(runner_token)
+            execution_deadline.reset(token)
+            if execution_id:
+                self._controls.pop(execution_id, None)
+
+    @contextmanager
+    def _track_execution(self, execution_id: Optional[str]):
+        """Tag logs with the execution and record in-flight/duration metrics."""
+        log_tokens = []
+        if execution_id:
+            log_tokens = [
+                (execution_id_var, execution_id_var.set(execution_id)),
+                (execution_sampled_var, execution_sampled_var.set(is_sampled(execution_id, config.LOG_SAMPLE_RATE))),
+            ]
+
+        metrics.EXECUTIONS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        status = "failed"
+        try:
+            yield
+            status = "success"
+        finally:
+            metrics.EXECUTIONS_IN_FLIGHT.dec()
+            metrics.EXECUTION_SECONDS.observe(time.perf_counter() - started, status=status)
+            for var, token in reversed(log_tokens):
+                var.reset(token)
+
+    def _plan_incremental_run(
+        self,
+        plan: ExecutionPlan,
+        context: Executioncontext,
+        node_classes: Dict[str, Optional[type]],
+        snapshot_key: str,
+    ):
+        context.fingerprints = step_fingerprints(plan.steps, node_classes, context.inputs)
+        context.reused = self.snapshots.reusable(snapshot_key, context.fingerprints)
+
+        # Walking backwards, a step that is not reused only has to run when it
+        # is a final output or feeds a step that runs; everything else is skipped.
+        must_run = set()
+        for step in reversed(plan.steps):
+            if step.step_id in context.reused:
+                continue
+            if step.retain_output or not step.consumers or any(c in must_run for c in step.consumers):
+                must_run.add(step.step_id)
+            else:
+                context.skipped.add(step.step_id)
+
+    async def _schedule(
+        self,
+        plan: ExecutionPlan,
+        context: Executioncontext,
+        execution_slots: asyncio.Semaphore,
+        free_intermediates: bool,
+        node_classes: Dict[str, Optional[type]],
+    ) -> Dict[str, Any]:
+        logger.info("Starting execution of flow %s (%d steps)", plan.flow_id, len(plan.steps))
         
-        print(f"--- Starting Execution of Flow: {plan.flow_id} ---")
-        
-        # Simple sequential execution for MVP (since plan is already topologically sorted)
-        # In a real scenario, this would use asyncio.gather for independent branches
+        # Ready-set scheduling: a step is launched as soon as all of its dependencies finished,
+        # so independent branches overlap and the flow takes the length of its critical path.
+        steps = {step.node_id: step for step in plan.steps}
+        pending = {
+            node_id: {dep for dep in step.depends_on if dep in steps}
+            for node_id, step in steps.items()
+        }
+        dependents: Dict[str, List[str]] = {node_id: [] for node_id in steps}
+        for node_id, deps in pending.items():
+            for dep in deps:
+                dependents[dep].append(node_id)
+
+        # Outstanding readers per output; dead intermediate outputs are dropped at zero
+        unread = {step.step_id: len(step.consumers) for step in plan.steps}
+        producers = {step.step_id: step for step in plan.steps}
+
+        # Streaming-capable neighbours run as one pipeline linked by bounded channels. A pipelined
+        # producer only keeps a summary of its output, so this is limited to runs that free
+        # intermediates and to producers whose output is dead; everything the caller can read
+        # stays materialized.
+        pipelined = {
+            producer: consumer
+            for producer, consumer in stream_edges(plan.steps, node_classes).items()
+            if free_intermediates and not steps[producer].retain_output
+            and not {f"step_{producer}", f"step_{consumer}"} & (context.reused.keys() | context.skipped)
+        }
+        launched = set()
+
+        ready = [node_id for node_id, deps in pending.items() if not deps]
+        running: Dict[asyncio.Task, str] = {}
+
+        def launch(node_id: str, upstream: Optional[StreamChannel] = None):
+            launched.add(node_id)
+            downstream = StreamChannel(config.STREAM_QUEUE_SIZE) if node_id in pipelined else None
+            task = asyncio.create_task(
+                self._run_step(steps[node_id], context, execution_slots, upstream=upstream, downstream=downstream)
+            )
+            running[task] = node_id
+            if downstream is not None:
+                # The consumer starts with its producer instead of after it
+                consumer_id = pipelined[node_id]
+                pending[consumer_id].discard(node_id)
+                launch(consumer_id, upstream=downstream)
+
+        control = context.control
+        try:
+            while ready or running:
+                for node_id in ready:
+                    launch(node_id)
+                ready = []
+
+                done = await control.wait(running.keys())
+                for task in done:
+                    node_id = running.pop(task)
+                    task.result()
+                    if free_intermediates:
+                        self._release_dead_outputs(steps[node_id], context, unread, producers)
+                    for child in dependents[node_id]:
+                        pending[child].discard(node_id)
+                        if not pending[child] and child not in launched:
+                            ready.append(child)
+                if (ready or running) and control.status != "success":
+                    context.status = control.status
+                    break
+        finally:
+            # Abandoned steps are cancelled and awaited so their slots and node instances are freed now
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        if context.status != "success":
+            context.interrupted = [steps[node_id].step_id for node_id in running.values()]
+            context.not_started = [step.step_id for step in plan.steps if step.node_id not in launched]
+            logger.warning(
+                "Execution of flow %s stopped (%s): %d steps interrupted, %d not started",
+                plan.flow_id, context.status, len(context.interrupted), len(context.not_started),
+            )
+        else:
+            logger.info("Execution of flow %s completed", plan.flow_id)
+        return {step.step_id: context.results[step.step_id] for step in plan.steps if step.step_id in context.results}
+
+    def _release_dead_outputs(
+        self,
+        finished: ExecutionStep,
+        context: Executioncontext,
+        unread: Dict[str, int],
+        producers: Dict[str, ExecutionStep],
+    ):
+        for dep in finished.depends_on:
+            dep_step_id = f"step_{dep}"
+            if unread.get(dep_step_id, 0) <= 0:
+                continue
+            unread[dep_step_id] -= 1
+            if unread[dep_step_id] == 0 and not producers[dep_step_id].retain_output:
+                context.results.pop(dep_step_id, None)
+                # A freed output is not kept alive by the incremental snapshot either
+                context.snapshot.pop(dep_step_id, None)
+
+    def _node_classes(self, plan: ExecutionPlan) -> Dict[str, Optional[type]]:
+        classes = {}
         for step in plan.steps:
-            await self._execute_step(step, context)
-            
-        print(f"--- Execution Completed ---")
-        return {"status": "success", "results": context.results}
+            try:
+                classes[step.node_type] = NodeRegistry.get_node_class(step.node_type)
+            except ValueError:
+                classes[step.node_type] = None
+        return classes
 
-    async def _execute_step(self, step: ExecutionStep, context: Executioncontext):
-        print(f"Running Step: {step.step_id} (Type: {step.node_type})")
-        
-        # Resolve Inputs from dependencies
-        inputs = {}
+    async def _run_step(
+        self,
+        step: ExecutionStep,
+        context: Executioncontext,
+        execution_slots: asyncio.Semaphore,
+        upstream: Optional[StreamChannel] = None,
+        downstream: Optional[StreamChannel] = None,
+    ):
+        if upstream is not None:
+            # Pipeline stages ride on the slot held by the head of the pipeline;
+            # acquiring their own could deadlock against a producer blocked on a full channel.
+            await self._execute_step(step, context, upstream, downstream)
+            return
+        async with execution_slots, self._process_slots:
+            await self._execute_step(step, context, upstream, downstream)
+
+    def _resolve_inputs(
+        self,
+        step: ExecutionStep,
+        results: Dict[str, Any],
+        flow_inputs: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        # Flow-level inputs (e.g. one payload of a batch) feed the root steps
+        inputs = dict(flow_inputs) if flow_inputs and not step.depends_on else {}
         if step.input_bindings:
             for binding in step.input_bindings:
                 dep_step_id = f"step_{binding.source_node}"
-                if dep_step_id not in context.results:
+                if dep_step_id not in results:
                     continue
-                source_result = context.results[dep_step_id]
+                source_result = results[dep_step_id]
                 if isinstance(source_result, dict) and binding.source_output in source_result:
                     value = source_result[binding.source_output]
                 else:
@@ -63,7 +516,8 @@ class AIONRuntime:
                 if binding.target_input in inputs:
                     existing = inputs[binding.target_input]
                     if isinstance(existing, list):
-                        existing.append(value)
+                        # Never mutate the upstream result in place (it may be shared or cached)
+                        inputs[binding.target_input] = [*existing, value]
                     else:
                         inputs[binding.target_input] = [existing, value]
                 else:
@@ -71,21 +525,106 @@ class AIONRuntime:
         else:
             for dep_id in step.depends_on:
                 dep_step_id = f"step_{dep_id}" # fallback mapping
-                if dep_step_id in context.results:
-                    inputs[dep_id] = context.results[dep_step_id]
+                if dep_step_id in results:
+                    inputs[dep_id] = results[dep_step_id]
+        return inputs
+
+    async def _execute_step(
+        self,
+        step: ExecutionStep,
+        context: Executioncontext,
+        upstream: Optional[StreamChannel] = None,
+        downstream: Optional[StreamChannel] = None,
+    ):
+        step_id_var.set(step.step_id)
+        if step.step_id in context.skipped:
+            logger.debug("Skipping step %s (output not needed)", step.step_id)
+            self.events.publish(context.execution_id, "step-finished", step_id=step.step_id, node_type=step.node_type, status="skipped")
+            return
+        if step.step_id in context.reused:
+            logger.debug("Reusing output of step %s from the previous run", step.step_id)
+            result = context.reused[step.step_id]
+            context.results[step.step_id] = result
+            context.snapshot[step.step_id] = (context.fingerprints[step.step_id], result)
+            self.events.publish(context.execution_id, "step-finished", step_id=step.step_id, node_type=step.node_type, status="reused")
+            return
+        logger.debug("Running step %s (type: %s)", step.step_id, step.node_type)
+        self.events.publish(context.execution_id, "step-started", step_id=step.step_id, node_type=step.node_type)
+        
+        if upstream is not None:
+            binding = step.input_bindings[0]
+            inputs = {binding.target_input: upstream.batches(binding.source_output)}
+        else:
+            inputs = self._resolve_inputs(step, context.results, context.inputs)
 
         # Simulate Node Logic
-        result = await self._simulate_node_execution(step.node_type, step.config, inputs)
+        started = time.perf_counter()
+        try:
+            result = await self._simulate_node_execution(step.node_type, step.config, inputs, upstream, downstream)
+        finally:
+            if upstream is not None:
+                upstream.close()
+        elapsed = time.perf_counter() - started
+        metrics.STEP_SECONDS.observe(elapsed, node_type=step.node_type)
+        metrics.STEP_OUTPUT_SIZE.observe(metrics.approximate_size(result), node_type=step.node_type)
+        failed = isinstance(result, dict) and "error" in result
+        if failed:
+            metrics.STEP_ERRORS.inc(node_type=step.node_type)
+        self.events.publish(
+            context.execution_id, "step-finished", step_id=step.step_id, node_type=step.node_type,
+            status="failed" if failed else "success", duration_seconds=round(elapsed, 6),
+            **({"error": str(result["error"])} if failed else {}),
+        )
         context.results[step.step_id] = result
-        print(f"  -> Result: {result}")
+        # Pipelined producers only hold a summary of their output, so they cannot be reused
+        if context.fingerprints and not failed and downstream is None:
+            context.snapshot[step.step_id] = (context.fingerprints[step.step_id], result)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Step %s finished",
+                step.step_id,
+                extra={"fields": {"node_type": step.node_type, "result": summarize(result)}},
+            )
 
-    async def _simulate_node_execution(self, node_type: str, config: Dict[str, Any], inputs: Dict[str, Any]):
-        from nodes.registry import NodeRegistry
-        
+    async def _simulate_node_execution(
+        self,
+        node_type: str,
+        config: Dict[str, Any],
+        inputs: Dict[str, Any],
+        upstream: Optional[StreamChannel] = None,
+        downstream: Optional[StreamChannel] = None,
+    ):
         try:
-            node_class = NodeRegistry.get_node_class(node_type)
-            node_instance = node_class(config)
-            return await node_instance.execute(inputs)
+            async with self.node_pool.lease(node_type, config) as node_instance:
+                if downstream is not None:
+                    return await pump(node_instance.stream(inputs), downstream)
+                if upstream is not None:
+                    return await materialize(node_instance.stream(inputs))
+                if self.cache is not None and node_instance.is_cacheable():
+                    return await self._execute_cached(node_instance, node_type, config, inputs)
+                return await self._invoke(node_instance, node_type, config, inputs)
         except Exception as e:
-            print(f"  [Error] Failed to execute node {node_type}: {e}")
+            if downstream is not None:
+                # Failed before streaming started; make sure the consumer does not wait forever
+                downstream.fail(e)
+            logger.warning("Failed to execute node %s: %s", node_type, e, exc_info=True)
             return {"error": str(e)}
+
+    async def _execute_cached(self, node_instance, node_type: str, config: Dict[str, Any], inputs: Dict[str, Any]):
+        key = fingerprint(node_type, config, inputs, node_instance.cache_key(inputs))
+        hit, result = await self.cache.aget(key)
+        if hit:
+            logger.debug("Cache hit for %s (%s)", node_type, key[:12])
+            return result
+
+        result = await self._invoke(node_instance, node_type, config, inputs)
+        # Node-level failures are reported as {"error": ...} and must not be memoized
+        if not (isinstance(result, dict) and "error" in result):
+            await self.cache.aset(key, result, ttl=node_instance.get_cache_ttl())
+        return result
+
+    async def _invoke(self, node_instance, node_type: str, config: Dict[str, Any], inputs: Dict[str, Any]):
+        # CPU-bound nodes go to the process pool; I/O nodes stay on the event loop
+        if node_instance.cpu_bound and self.offloader.enabled:
+            return await self.offloader.run(node_instance, node_type, config, inputs)
+        return await node_instance.execute(inputs)
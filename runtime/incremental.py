@@ -0,0 +1,107 @@
+"""
+Incremental re-execution of saved flows.
+
+Each step gets a Merkle-style fingerprint over its node type, config,
+external state (BaseNode.cache_key) and the fingerprints of the steps it
+reads from. The runtime remembers the fingerprint and output of every
+step of a flow's last execution; on the next run, steps whose
+fingerprint is unchanged reuse the stored output, so editing one node
+only recomputes that node and its descendants.
+
+Snapshots hold whole step outputs in memory, so they are opt-in twice:
+the store needs a byte budget (INCREMENTAL_MAX_MB) and each flow sets
+"incremental": true in its metadata.
+"""
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import estimate_nbytes, fingerprint
+
+Snapshot = Dict[str, Tuple[str, Any]]  # step_id -> (fingerprint, result)
+
+
+def step_fingerprints(
+    steps: List[Any],
+    node_classes: Dict[str, Optional[type]],
+    flow_inputs: Optional[Dict[str, Any]] = None,
+) -> Dict[str, str]:
+    """
+    Fingerprint every step of a topologically ordered plan. Steps whose
+    node is not deterministic (not cacheable) or whose results expire
+    (cache_ttl, e.g. HTTP GETs) get a fresh random fingerprint, which
+    forces them and all their descendants to rerun.
+    """
+    fingerprints: Dict[str, str] = {}
+    for step in steps:
+        node_class = node_classes.get(step.node_type)
+        node_instance = node_class(step.config) if node_class else None
+        if node_instance is None or not node_instance.is_cacheable() or node_instance.get_cache_ttl() is not None:
+            fingerprints[step.step_id] = uuid.uuid4().hex
+            continue
+
+        upstream = [
+            (fingerprints.get(f"step_{binding.source_node}"), binding.source_output, binding.target_input)
+            for binding in step.input_bindings
+        ]
+        if not step.input_bindings:
+            upstream = [(fingerprints.get(f"step_{dep}"), dep) for dep in step.depends_on]
+        if not step.depends_on and flow_inputs:
+            upstream.append(flow_inputs)
+        fingerprints[step.step_id] = fingerprint(
+            step.node_type, step.config, upstream, node_instance.cache_key({})
+        )
+    return fingerprints
+
+
+class ExecutionSnapshotStore:
+    """Last-execution step outputs of recently run flows, LRU by flow within a byte budget."""
+
+    def __init__(self, max_bytes: int = 0):
+        # 0 = disabled
+        self.max_bytes = max_bytes
+        self._snapshots: "OrderedDict[str, Snapshot]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls) -> "ExecutionSnapshotStore":
+        from .config import config
+        return cls(max_bytes=config.INCREMENTAL_MAX_MB * 1024 * 1024)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def reusable(self, flow_key: str, fingerprints: Dict[str, str]) -> Dict[str, Any]:
+        """Outputs of the previous run whose step fingerprint did not change."""
+        snapshot = self._snapshots.get(flow_key)
+        if not snapshot:
+            return {}
+        self._snapshots.move_to_end(flow_key)
+        return {
+            step_id: result
+            for step_id, (previous, result) in snapshot.items()
+            if fingerprints.get(step_id) == previous
+        }
+
+    def save(self, flow_key: str, snapshot: Snapshot):
+        if not self.enabled:
+            return
+        self.discard(flow_key)
+        size = sum(estimate_nbytes(result) for _, result in snapshot.values())
+        if size > self.max_bytes:
+            # Would evict every other flow and still not fit
+            return
+        self._snapshots[flow_key] = snapshot
+        self._sizes[flow_key] = size
+        while self.nbytes > self.max_bytes:
+            evicted, _ = self._snapshots.popitem(last=False)
+            self._sizes.pop(evicted, None)
+
+    def discard(self, flow_key: str):
+        self._snapshots.pop(flow_key, None)
+        self._sizes.pop(flow_key, None)
@@ -1,14 +1,23 @@
+import asyncio
+import json
+import time
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, status, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from .executor import AIONRuntime
+from .executor import AIONRuntime, ExecutionControl
+from .admission import AdmissionController
+from .events import TERMINAL_EVENT
+from .startup import configure_process, start_node_pool_reaper
 from . import database as db
 from . import auth
+from . import metrics
+from .structured_logging import configure_logging, shutdown_logging
 from .config import config
 
 # Initialize rate limiter
@@ -30,17 +39,34 @@ app.add_middleware(
 )
 
 runtime = AIONRuntime()
+admission = AdmissionController.from_config()
+# Executions accepted by this process that have not finished yet (queued or running)
+active_executions: Dict[str, ExecutionControl] = {}
 
 class FlowCreateRequest(BaseModel):
     dsl: Dict[str, Any]
 
+class BatchExecuteRequest(BaseModel):
+    inputs: List[Dict[str, Any]]
+    max_concurrency: Optional[int] = None
+    priority: str = "batch"
+    timeout_seconds: Optional[float] = None
+
 class UserCreate(BaseModel):
     username: str
     password: str
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
+    configure_logging()
     db.init_db()
+    configure_process()
+    start_node_pool_reaper(runtime.node_pool)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await runtime.shutdown()
+    shutdown_logging()
 
 @app.get("/")
 def health_check():
@@ -51,6 +77,11 @@ def health_check_alias():
     """Compatibility healthcheck endpoint used by proxies and the Studio API client."""
     return {"status": "ok", "service": "AION Runtime"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus text exposition of runtime metrics (scraped, so unauthenticated)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # --- Auth APIs ---
 
 @app.post("/auth/register")
@@ -117,12 +148,19 @@ def delete_flow(flow_id: str, current_user: auth.User = Depends(auth.get_current
     deleted = db.delete_flow(flow_id, user_id=current_user.id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Flow not found or access denied")
+    runtime.snapshots.discard(flow_id)
     return {"message": "Flow deleted successfully"}
 
 # --- Execution APIs (Protected) ---
 
+def _check_priority(priority: str):
+    if priority not in admission.weights:
+        raise HTTPException(status_code=400, detail=f"Unknown priority class: {priority}")
+
 @app.post("/flows/{flow_id}/execute")
-async def execute_saved_flow(flow_id: str, background_tasks: BackgroundTasks, current_user: auth.User = Depends(auth.get_current_user)):
+async def execute_saved_flow(flow_id: str, background_tasks: BackgroundTasks, priority: str = "interactive", timeout_seconds: Optional[float] = None, current_user: auth.User = Depends(auth.get_current_user)):
+    _check_priority(priority)
+
     # 1. Get Flow (enforcing ownership)
     flow_data = db.get_flow(flow_id, user_id=current_user.id)
     if not flow_data:
@@ -131,18 +169,70 @@ async def execute_saved_flow(flow_id: str, background_tasks: BackgroundTasks, cu
     from compiler.compiler import AIONCompiler
     compiler = AIONCompiler()
     try:
-        plan = compiler.compile(flow_data["dsl"])
+        with metrics.COMPILE_SECONDS.time():
+            plan = compiler.compile(flow_data["dsl"])
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Compilation Failed: {str(e)}")
 
     # 3. Create Execution Record
     exec_id = db.create_execution(flow_id, user_id=current_user.id)
     
-    # 4. Trigger Execution (Background)
-    background_tasks.add_task(run_and_track_execution, exec_id, plan)
+    # 4. Trigger Execution (worker queue or Background)
+    if config.EXECUTION_BACKEND == "queue":
+        payload = {"plan": plan, "flow_id": flow_id, "timeout_seconds": timeout_seconds}
+        db.enqueue_job(
+            exec_id, "execute", payload, user_id=current_user.id,
+            priority=priority, priority_weight=admission.weights[priority],
+        )
+    else:
+        active_executions[exec_id] = ExecutionControl(timeout_seconds)
+        background_tasks.add_task(
+            run_and_track_execution, exec_id, plan, time.monotonic(), flow_id, current_user.id, priority, timeout_seconds
+        )
     
     return {"execution_id": exec_id, "status": "pending"}
 
+@app.post("/flows/{flow_id}/execute_batch")
+async def execute_saved_flow_batch(flow_id: str, request: BatchExecuteRequest, background_tasks: BackgroundTasks, current_user: auth.User = Depends(auth.get_current_user)):
+    """Run a saved flow over many input payloads as a single batch execution."""
+    if not request.inputs:
+        raise HTTPException(status_code=400, detail="Batch inputs must not be empty")
+    _check_priority(request.priority)
+
+    flow_data = db.get_flow(flow_id, user_id=current_user.id)
+    if not flow_data:
+        raise HTTPException(status_code=404, detail="Flow not found or access denied")
+
+    # Compile once for the whole batch
+    from compiler.compiler import AIONCompiler
+    compiler = AIONCompiler()
+    try:
+        with metrics.COMPILE_SECONDS.time():
+            plan = compiler.compile(flow_data["dsl"])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Compilation Failed: {str(e)}")
+
+    exec_id = db.create_execution(flow_id, user_id=current_user.id)
+    if config.EXECUTION_BACKEND == "queue":
+        payload = {
+            "plan": plan,
+            "items": request.inputs,
+            "max_concurrency": request.max_concurrency,
+            "timeout_seconds": request.timeout_seconds,
+        }
+        db.enqueue_job(
+            exec_id, "execute_batch", payload, user_id=current_user.id,
+            priority=request.priority, priority_weight=admission.weights[request.priority],
+        )
+    else:
+        active_executions[exec_id] = ExecutionControl(request.timeout_seconds)
+        background_tasks.add_task(
+            run_and_track_batch_execution, exec_id, plan, request.inputs, request.max_concurrency,
+            time.monotonic(), current_user.id, request.priority, request.timeout_seconds
+        )
+
+    return {"execution_id": exec_id, "status": "pending", "batch_size": len(request.inputs)}
+
 @app.get("/executions/{exec_id}")
 def get_execution_status(exec_id: str, current_user: auth.User = Depends(auth.get_current_user)):
     execution = db.get_execution(exec_id, user_id=current_user.id)
@@ -150,17 +240,158 @@ def get_execution_status(exec_id: str, current_user: auth.User = Depends(auth.ge
         raise HTTPException(status_code=404, detail="Execution not found")
     return execution
 
-async def run_and_track_execution(exec_id: str, plan: Dict[str, Any]):
-    # Update status to running
-    db.update_execution(exec_id, "running")
-    
+@app.post("/executions/{exec_id}/cancel")
+def cancel_execution(exec_id: str, current_user: auth.User = Depends(auth.get_current_user)):
+    """Stop a queued or running execution; steps already finished keep their results."""
+    execution = db.get_execution(exec_id, user_id=current_user.id)
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    if execution["status"] in db.FINAL_EXECUTION_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Execution already {execution['status']}")
+
+    control = active_executions.get(exec_id)
+    if control is not None:
+        control.cancelled.set()
+    elif db.request_cancel(exec_id):
+        # Was still waiting in the job queue
+        return {"execution_id": exec_id, "status": "cancelled"}
+    return {"execution_id": exec_id, "status": "cancelling"}
+
+async def run_and_track_execution(
+    exec_id: str,
+    plan: Dict[str, Any],
+    queued_at: Optional[float] = None,
+    flow_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    priority: str = "interactive",
+    timeout_seconds: Optional[float] = None,
+):
+    # Steps unchanged since the flow's previous run reuse their outputs
+    await _admit_and_track(
+        exec_id, user_id, priority, queued_at, timeout_seconds,
+        lambda control: runtime.execute_plan(plan, execution_id=exec_id, snapshot_key=flow_id, control=control),
+    )
+
+async def run_and_track_batch_execution(
+    exec_id: str,
+    plan: Dict[str, Any],
+    items: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+    queued_at: Optional[float] = None,
+    user_id: Optional[str] = None,
+    priority: str = "batch",
+    timeout_seconds: Optional[float] = None,
+):
+    await _admit_and_track(
+        exec_id, user_id, priority, queued_at, timeout_seconds,
+        lambda control: runtime.execute_plan_batch(
+            plan, items, max_concurrency=max_concurrency, execution_id=exec_id, control=control
+        ),
+    )
+
+async def _admit_and_track(
+    exec_id: str,
+    user_id: Optional[str],
+    priority: str,
+    queued_at: Optional[float],
+    timeout_seconds: Optional[float],
+    run,
+):
+    # The deadline starts when the execution is accepted, so time spent queued counts against it
+    control = active_executions.setdefault(exec_id, ExecutionControl(timeout_seconds))
     try:
-        result = await runtime.execute_plan(plan)
-        # Update status to completed
-        db.update_execution(exec_id, "completed", result)
-    except Exception as e:
-        # Update status to failed
-        db.update_execution(exec_id, "failed", {"error": str(e)})
+        # Wait for a fair share of the runtime before starting (or until cancelled / out of time)
+        waiter = asyncio.ensure_future(admission.acquire(
+            user_id, priority, on_queued=lambda ticket: db.record_admission(exec_id, priority, ticket.queue_depth)
+        ))
+        done = set()
+        try:
+            while not done and control.status == "success":
+                done = await control.wait([waiter])
+        except asyncio.CancelledError:
+            waiter.cancel()
+            raise
+        if not done:
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            if not waiter.cancelled() and waiter.exception() is None:
+                # Admitted at the last moment: hand the slot straight back
+                admission.release(waiter.result())
+            _finish_execution(exec_id, control.status, {"status": control.status, "results": {}})
+            return
+        ticket = waiter.result()
+
+        try:
+            db.record_admission(exec_id, priority, ticket.queue_depth, ticket.wait_seconds)
+            if queued_at is not None:
+                metrics.QUEUE_WAIT_SECONDS.observe(time.monotonic() - queued_at)
+
+            # Update status to running
+            db.update_execution(exec_id, "running")
+            try:
+                result = await run(control)
+                # "completed", or "cancelled" / "deadline_exceeded" with partial results
+                status = "completed" if result["status"] == "success" else result["status"]
+                _finish_execution(exec_id, status, result)
+            except Exception as e:
+                # Update status to failed
+                _finish_execution(exec_id, "failed", {"error": str(e)})
+        finally:
+            admission.release(ticket)
+    finally:
+        active_executions.pop(exec_id, None)
+
+def _finish_execution(exec_id: str, status: str, result: Dict[str, Any]):
+    db.update_execution(exec_id, status, result)
+    # Only after the record is final, so a client reacting to the event reads the result
+    runtime.events.publish(exec_id, TERMINAL_EVENT, status=status)
+
+@app.get("/executions/{exec_id}/events")
+async def stream_execution_events(exec_id: str, request: Request, current_user: auth.User = Depends(auth.get_current_user)):
+    """Server-Sent Events with the progress of an execution, ending with a completed event."""
+    status = db.get_execution_state(exec_id, user_id=current_user.id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return StreamingResponse(
+        _execution_events(exec_id, status, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+async def _execution_events(exec_id: str, status: str, request: Request):
+    if status in db.FINAL_EXECUTION_STATUSES:
+        yield _sse({"type": TERMINAL_EVENT, "execution_id": exec_id, "status": status})
+        return
+
+    with runtime.events.subscribe(exec_id) as subscription:
+        if exec_id in active_executions:
+            # Running here: relay what the runtime publishes
+            while True:
+                event = await subscription.get(timeout=config.EVENT_KEEPALIVE_SECONDS)
+                if event is None:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(event)
+                if event["type"] == TERMINAL_EVENT:
+                    return
+
+    # Running elsewhere (queue worker): follow the status column instead of the full record
+    status = db.get_execution_state(exec_id) or status
+    last_status = None
+    while status not in db.FINAL_EXECUTION_STATUSES:
+        if status != last_status:
+            yield _sse({"type": "status", "execution_id": exec_id, "status": status})
+            last_status = status
+        await asyncio.sleep(config.EVENT_POLL_INTERVAL_SECONDS)
+        if await request.is_disconnected():
+            return
+        status = db.get_execution_state(exec_id) or "failed"
+    yield _sse({"type": TERMINAL_EVENT, "execution_id": exec_id, "status": status})
 
 # --- Secrets APIs (Protected) ---
 from . import secrets_db
@@ -0,0 +1,177 @@
+"""
+Minimal Prometheus-compatible metrics for the runtime.
+
+Counters, gauges and histograms with labels, rendered in the text
+exposition format served by GET /metrics. Kept dependency-free so the
+runtime and the nodes can record measurements on the hot path.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+COMPILE_SECONDS = registry.register(Histogram(
+    "aion_compile_seconds", "Time spent compiling a flow DSL into an execution plan."))
+QUEUE_WAIT_SECONDS = registry.register(Histogram(
+    "aion_execution_queue_wait_seconds", "Time between an execution being accepted and starting to run."))
+EXECUTION_SECONDS = registry.register(Histogram(
+    "aion_execution_seconds", "Wall time of whole plan executions.", ["status"]))
+EXECUTIONS_IN_FLIGHT = registry.register(Gauge(
+    "aion_executions_in_flight", "Plan executions currently running in this process."))
+STEP_SECONDS = registry.register(Histogram(
+    "aion_step_seconds", "Wall time of a single step, by node type.", ["node_type"]))
+STEP_OUTPUT_SIZE = registry.register(Histogram(
+    "aion_step_output_items", "Approximate size of a step output (items in its list/str/dict values).",
+    ["node_type"], buckets=SIZE_BUCKETS))
+STEP_ERRORS = registry.register(Counter(
+    "aion_step_errors_total", "Steps that returned an error, by node type.", ["node_type"]))
+ADMISSION_QUEUE_DEPTH = registry.register(Gauge(
+    "aion_admission_queue_depth", "Executions waiting for admission in this process."))
+ADMISSION_WAIT_SECONDS = registry.register(Histogram(
+    "aion_admission_wait_seconds", "Time executions waited for admission, by priority class.", ["priority"]))
+DB_CALL_SECONDS = registry.register(Histogram(
+    "aion_db_call_seconds", "Latency of runtime database calls, by operation.", ["operation"]))
+
+
+def approximate_size(result: object) -> int:
+    """Cheap size estimate: lengths of the top-level values, never a full traversal."""
+    if not isinstance(result, dict):
+        return len(result) if hasattr(result, "__len__") else 1
+    size = 0
+    for value in result.values():
+        size += len(value) if hasattr(value, "__len__") else 1
+    return size
+
+
+def render() -> str:
+    return registry.render()
@@ -0,0 +1,105 @@
+"""
+Warm pool of initialized node instances.
+
+Instances are keyed by (node_type, config hash) so that state built in
+BaseNode.setup() (sessions, loaded models, compiled patterns) is paid
+once per process instead of once per step. An instance is leased to a
+single step at a time; idle instances are torn down after a timeout,
+checked on every acquire/release and by a background reaper task so a
+config that stops receiving traffic still releases its resources.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from nodes.core.base import BaseNode
+from nodes.registry import NodeRegistry
+
+from .cache import fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class NodeInstancePool:
+    def __init__(self, idle_ttl: float = 300.0, max_idle_per_key: int = 4, reap_interval: Optional[float] = None):
+        self.idle_ttl = idle_ttl
+        self.max_idle_per_key = max_idle_per_key
+        self.reap_interval = reap_interval if reap_interval is not None else max(idle_ttl / 2, 1.0)
+        self._idle: Dict[Tuple[str, str], List[Tuple[float, BaseNode]]] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls) -> "NodeInstancePool":
+        from .config import config
+        return cls(idle_ttl=config.NODE_POOL_IDLE_TTL_SECONDS, max_idle_per_key=config.NODE_POOL_MAX_IDLE)
+
+    async def acquire(self, node_type: str, config: Dict[str, Any]) -> BaseNode:
+        await self.evict_idle()
+        key = (node_type, fingerprint(config))
+        idle = self._idle.get(key)
+        if idle:
+            _, instance = idle.pop()
+            return instance
+
+        instance = NodeRegistry.get_node_class(node_type)(config)
+        await instance.setup()
+        return instance
+
+    async def release(self, node_type: str, instance: BaseNode, reusable: bool = True):
+        key = (node_type, fingerprint(instance.config))
+        idle = self._idle.setdefault(key, [])
+        if reusable and len(idle) < self.max_idle_per_key:
+            idle.append((time.monotonic(), instance))
+        else:
+            await instance.teardown()
+        await self.evict_idle()
+
+    async def evict_idle(self):
+        deadline = time.monotonic() - self.idle_ttl
+        for key in list(self._idle):
+            # Another coroutine may have emptied the key while we awaited a teardown
+            entries = self._idle.get(key, [])
+            expired = [instance for last_used, instance in entries if last_used < deadline]
+            if not expired:
+                continue
+            self._idle[key] = [(last_used, instance) for last_used, instance in entries if last_used >= deadline]
+            if not self._idle[key]:
+                del self._idle[key]
+            for instance in expired:
+                await instance.teardown()
+
+    def start_reaper(self) -> asyncio.Task:
+        """Evict idle instances every reap_interval seconds, also while no step runs."""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap())
+        return self._reaper
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self.evict_idle()
+            except Exception:
+                logger.warning("Evicting idle node instances failed", exc_info=True)
+
+    @asynccontextmanager
+    async def lease(self, node_type: str, config: Dict[str, Any]) -> AsyncIterator[BaseNode]:
+        instance = await self.acquire(node_type, config)
+        reusable = False
+        try:
+            yield instance
+            reusable = True
+        finally:
+            # An instance that raised may hold broken state; do not hand it out again
+            await self.release(node_type, instance, reusable=reusable)
+
+    async def close(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        idle, self._idle = self._idle, {}
+        for entries in idle.values():
+            for _, instance in entries:
+                await instance.teardown()
@@ -0,0 +1,124 @@
+"""
+Process pool for CPU-bound nodes.
+
+Nodes that declare cpu_bound = True are executed in worker processes so
+heavy pure-Python work (feature building, scoring) does not block the
+event loop serving the API. Inputs and outputs cross the process
+boundary as pickles; anything unpicklable runs on the loop. Nodes that
+split their own work (PII hashing of large columns) submit shards to the
+same pool through nodes.core.base.process_runner.
+
+Workers are started with forkserver (spawn where that is unavailable),
+never fork: the runtime already has live threads (to_thread calls, the
+log listener), and forking them can deadlock the child on a held lock.
+If the pool breaks, the work finishes in a thread instead of the loop.
+"""
+import asyncio
+import importlib
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+
+# Each worker keeps one event loop and its own warm instance pool for its lifetime
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_pool = None
+
+
+async def _execute_with_pool(node_type: str, config: Dict[str, Any], method: str, inputs: Any) -> Any:
+    global _worker_pool
+    if _worker_pool is None:
+        from .node_pool import NodeInstancePool
+        _worker_pool = NodeInstancePool.from_config()
+    async with _worker_pool.lease(node_type, config) as node_instance:
+        return await getattr(node_instance, method)(inputs)
+
+
+def _execute_in_worker(node_module: str, node_type: str, config: Dict[str, Any], method: str, payload: bytes) -> bytes:
+    global _worker_loop
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+    # Workers are not forked from the caller: import the node's module so that
+    # types registered outside nodes.registry are known here too
+    importlib.import_module(node_module)
+    inputs = pickle.loads(payload)
+    result = _worker_loop.run_until_complete(_execute_with_pool(node_type, config, method, inputs))
+    return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _mp_context() -> multiprocessing.context.BaseContext:
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+class ProcessOffloader:
+    def __init__(self, max_workers: Optional[int] = None):
+        # None sizes the pool to the machine, 0 disables offloading entirely
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_config(cls) -> "ProcessOffloader":
+        from .config import config
+        return cls(config.NODE_PROCESS_POOL_SIZE)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            from .startup import configure_offload_worker
+            # Every worker process has its own registries; configure them as the worker starts
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=_mp_context(), initializer=configure_offload_worker,
+            )
+        return self._pool
+
+    async def run(
+        self,
+        node_instance: Any,
+        node_type: str,
+        config: Dict[str, Any],
+        inputs: Any,
+        method: str = "execute",
+    ) -> Any:
+        """Run node_instance.<method>(inputs) in a worker process (execute or execute_batch)."""
+        try:
+            payload = pickle.dumps(inputs, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return await getattr(node_instance, method)(inputs)
+
+        loop = asyncio.get_running_loop()
+        node_module = type(node_instance).__module__
+        try:
+            result = await loop.run_in_executor(
+                self._get_pool(), _execute_in_worker, node_module, node_type, config, method, payload,
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time and finish in a
+            # thread with its own loop, so concurrent executions keep running meanwhile
+            self.shutdown()
+            return await asyncio.to_thread(asyncio.run, getattr(node_instance, method)(inputs))
+        return pickle.loads(result)
+
+    async def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        fn(*args) in a worker process, for nodes that shard their own CPU work
+        (exposed to them as nodes.core.base.process_runner). fn and its
+        arguments must be picklable.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        except BrokenProcessPool:
+            self.shutdown()
+            return await asyncio.to_thread(fn, *args)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
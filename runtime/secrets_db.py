@@ -5,7 +5,7 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
-from .database import DB_PATH
+from .database import DB_PATH, timed
 
 # Append to database.py - Secrets CRUD
 
@@ -16,6 +16,7 @@ class SecretRecord(BaseModel):
     encrypted_value: str
     created_at: str
 
+@timed
 def create_secret(user_id: str, key: str, encrypted_value: str) -> str:
     """Create a new secret"""
     conn = sqlite3.connect(DB_PATH)
@@ -33,6 +34,7 @@ def create_secret(user_id: str, key: str, encrypted_value: str) -> str:
     conn.close()
     return secret_id
 
+@timed
 def list_secrets(user_id: str) -> List[Dict[str, Any]]:
     """List all secrets for a user (values masked)"""
     conn = sqlite3.connect(DB_PATH)
@@ -52,6 +54,7 @@ def list_secrets(user_id: str) -> List[Dict[str, Any]]:
         for row in rows
     ]
 
+@timed
 def get_secret_value(user_id: str, key: str) -> Optional[str]:
     """Get decrypted secret value by key"""
     conn = sqlite3.connect(DB_PATH)
@@ -65,6 +68,7 @@ def get_secret_value(user_id: str, key: str) -> Optional[str]:
         return row[0]  # Return encrypted value (decrypt in caller)
     return None
 
+@timed
 def delete_secret(secret_id: str, user_id: str) -> bool:
     """Delete a secret"""
     conn = sqlite3.connect(DB_PATH)
@@ -0,0 +1,56 @@
+"""
+Per-process bootstrap of the shared node subsystems.
+
+The model registry, embedding cache and vector store registry are
+process-wide singletons configured from runtime.config. Every process
+that executes nodes (the API, queue workers and the offload worker
+processes) calls one of the functions below once as it starts.
+"""
+from nodes.core.embeddings import embedding_cache
+from nodes.core.models import model_registry
+from nodes.core.vector_index import vector_stores
+
+from .config import config
+from .node_pool import NodeInstancePool
+
+
+def configure_model_registry(preload: bool = True):
+    """Apply the configured model budget and preload models, so the first scoring request is warm."""
+    model_registry.max_bytes = config.MODEL_REGISTRY_MAX_MB * 1024 * 1024
+    if preload:
+        model_registry.preload(config.MODEL_PRELOAD_PATHS)
+
+
+def configure_embedding_cache():
+    """Size the in-memory embedding cache and attach its on-disk store, if one is configured."""
+    embedding_cache.configure(config.EMBEDDING_CACHE_MAX_ENTRIES, config.EMBEDDING_CACHE_PATH or None)
+
+
+def configure_vector_stores():
+    """Point the vector store registry at the configured directory."""
+    vector_stores.configure(config.VECTOR_STORE_DIR)
+
+
+def configure_process():
+    """Startup of the API and queue worker processes."""
+    configure_model_registry()
+    configure_embedding_cache()
+    configure_vector_stores()
+
+
+def start_node_pool_reaper(node_pool: NodeInstancePool):
+    """
+    Tear down idle warm node instances periodically, so configs that stop
+    receiving traffic release what setup() acquired. Needs a running loop.
+    """
+    node_pool.start_reaper()
+
+
+def configure_offload_worker():
+    """
+    Initializer of the offload worker processes. Model scoring is not
+    offloaded, so workers get the budget but do not preload models.
+    """
+    configure_model_registry(preload=False)
+    configure_embedding_cache()
+    configure_vector_stores()
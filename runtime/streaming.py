@@ -0,0 +1,114 @@
+"""
+Bounded channels that connect streaming-capable steps into pipelines.
+
+A producer step pushes its output batches into a StreamChannel while the
+consumer step pulls them, so at most `maxsize` batches are in flight and a
+slow consumer applies backpressure to its producer.
+"""
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from nodes.core.base import is_batched, merge_batch
+
+_END = object()
+
+
+class StreamClosed(Exception):
+    """Raised to a producer whose consumer stopped reading."""
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class StreamChannel:
+    def __init__(self, maxsize: int):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+
+    async def put(self, batch: Dict[str, Any]):
+        if self.closed:
+            raise StreamClosed()
+        await self._queue.put(batch)
+
+    async def finish(self):
+        if not self.closed:
+            await self._queue.put(_END)
+
+    def fail(self, error: BaseException):
+        # Never blocks: drop buffered batches so the failure marker always fits
+        self._drain()
+        self._queue.put_nowait(_Failure(error))
+
+    def close(self):
+        """Called by the consumer when it stops reading; unblocks a waiting producer."""
+        self.closed = True
+        self._drain()
+
+    def _drain(self):
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    async def batches(self, port: str) -> AsyncIterator[Any]:
+        """Iterate the values of one output port, batch by batch."""
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise RuntimeError(f"Upstream streaming step failed: {item.error}") from item.error
+            if isinstance(item, dict) and port in item:
+                yield item[port]
+
+
+def stream_edges(steps: List[Any], node_classes: Dict[str, Optional[type]]) -> Dict[str, str]:
+    """
+    Pick the producer -> consumer pairs that can be pipelined.
+
+    Both nodes must be streaming-capable, the producer must feed only that
+    consumer and the consumer must read a single port from only that
+    producer. Everything else falls back to full materialization.
+    """
+    by_id = {step.node_id: step for step in steps}
+    edges = {}
+    for step in steps:
+        if len(step.depends_on) != 1 or len(step.input_bindings) != 1:
+            continue
+        producer = by_id.get(step.depends_on[0])
+        if producer is None or step.input_bindings[0].source_node != producer.node_id:
+            continue
+        if producer.consumers != [step.step_id]:
+            continue
+        if all(getattr(node_classes.get(s.node_type), "streaming", False) for s in (producer, step)):
+            edges[producer.node_id] = step.node_id
+    return edges
+
+
+async def pump(node_stream: AsyncIterator[Dict[str, Any]], channel: StreamChannel) -> Dict[str, Any]:
+    """
+    Forward a producer's batches into the channel. Returns the non-list
+    outputs (reports, counters); the batched data itself is not retained.
+    """
+    summary: Dict[str, Any] = {}
+    batch_count = 0
+    try:
+        async for batch in node_stream:
+            await channel.put(batch)
+            batch_count += 1
+            summary.update({key: value for key, value in batch.items() if not is_batched(value)})
+    except StreamClosed:
+        pass
+    except BaseException as exc:
+        channel.fail(exc)
+        raise
+    await channel.finish()
+    summary["streamed_batches"] = batch_count
+    return summary
+
+
+async def materialize(node_stream: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    async for batch in node_stream:
+        merge_batch(result, batch)
+    return result
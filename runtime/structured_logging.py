@@ -0,0 +1,157 @@
+"""
+Structured, sampled and non-blocking logging for the runtime.
+
+Records are emitted as JSON lines tagged with the current execution and
+step. Formatting and I/O happen on a background listener thread behind a
+bounded queue, so a slow stdout never stalls the event loop; when the
+queue is full, records are dropped instead of blocking. Sub-WARNING
+records of executions that are not sampled are discarded up front.
+"""
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Optional
+
+execution_id_var: ContextVar[Optional[str]] = ContextVar("aion_execution_id", default=None)
+step_id_var: ContextVar[Optional[str]] = ContextVar("aion_step_id", default=None)
+execution_sampled_var: ContextVar[bool] = ContextVar("aion_execution_sampled", default=True)
+
+MAX_SUMMARY_KEYS = 16
+MAX_SUMMARY_CHARS = 120
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+def summarize(value: Any, depth: int = 0) -> Any:
+    """
+    Bounded, JSON-friendly description of a step result. Containers are
+    described by type and length rather than formatted, so summarizing
+    a million-row result costs the same as summarizing an empty one.
+    """
+    if isinstance(value, dict):
+        if depth >= 2:
+            return f"<dict len={len(value)}>"
+        summary = {str(key): summarize(item, depth + 1) for key, item in islice(value.items(), MAX_SUMMARY_KEYS)}
+        if len(value) > MAX_SUMMARY_KEYS:
+            summary["..."] = f"{len(value) - MAX_SUMMARY_KEYS} more keys"
+        return summary
+    if isinstance(value, str):
+        if len(value) <= MAX_SUMMARY_CHARS:
+            return value
+        return f"{value[:MAX_SUMMARY_CHARS]}... <len={len(value)}>"
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if hasattr(value, "__len__"):
+        return f"<{type(value).__name__} len={len(value)}>"
+    text = repr(value)
+    return text if len(text) <= MAX_SUMMARY_CHARS else f"{text[:MAX_SUMMARY_CHARS]}..."
+
+
+def is_sampled(execution_id: str, rate: float) -> bool:
+    """Deterministic per-execution decision, so every process agrees on the same execution."""
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    bucket = int(hashlib.sha1(execution_id.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+    return bucket < rate
+
+
+class ExecutionContextFilter(logging.Filter):
+    """Tags records with the execution/step and drops chatter from unsampled executions."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.execution_id = execution_id_var.get()
+        record.step_id = step_id_var.get()
+        return record.levelno >= logging.WARNING or execution_sampled_var.get()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("execution_id", "step_id"):
+            value = getattr(record, key, None)
+            if value:
+                payload[key] = value
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update(fields)
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def _start(level: int, queue_size: int, stream=None):
+    global _listener, _queue_handler
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+    records: queue.Queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = _DroppingQueueHandler(records)
+    _queue_handler.addFilter(ExecutionContextFilter())
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+
+def configure_logging(level: Optional[str] = None, queue_size: Optional[int] = None, stream=None):
+    """Install the queue-backed JSON handler on the root logger (idempotent)."""
+    from .config import config
+
+    shutdown_logging()
+    _start(
+        logging.getLevelName((level or config.LOG_LEVEL).upper()),
+        queue_size or config.LOG_QUEUE_SIZE,
+        stream,
+    )
+
+
+def shutdown_logging():
+    """Flush pending records, stop the listener thread and detach the handler."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def _restart_in_child():
+    # The listener thread does not survive fork (process-pool workers); give the child its own
+    global _listener
+    if _queue_handler is not None:
+        handlers = _listener.handlers if _listener is not None else ()
+        _listener = None
+        root = logging.getLogger()
+        _start(root.level, _queue_handler.queue.maxsize, handlers[0].stream if handlers else None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_in_child)
@@ -0,0 +1,167 @@
+"""
+Execution worker: drains the durable jobs table.
+
+Run one or more of these next to the API (`python -m runtime.worker`) with
+EXECUTION_BACKEND=queue. Each worker claims pending executions atomically,
+heartbeats while running them and records the result on the execution.
+Jobs of a worker that dies stop heartbeating and are put back in the queue
+by whichever worker polls next, so API pods and workers scale separately.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from . import database as db
+from .config import config
+from .executor import AIONRuntime
+from .startup import configure_process, start_node_pool_reaper
+from .structured_logging import configure_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionWorker:
+    def __init__(
+        self,
+        runtime: Optional[AIONRuntime] = None,
+        worker_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        heartbeat_interval: Optional[float] = None,
+        stale_after: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        per_user_limit: Optional[int] = None,
+        max_running: Optional[int] = None,
+    ):
+        self.runtime = runtime or AIONRuntime()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency or config.WORKER_CONCURRENCY
+        self.poll_interval = poll_interval if poll_interval is not None else config.WORKER_POLL_INTERVAL_SECONDS
+        self.heartbeat_interval = heartbeat_interval if heartbeat_interval is not None else config.WORKER_HEARTBEAT_SECONDS
+        self.stale_after = stale_after if stale_after is not None else config.WORKER_STALE_AFTER_SECONDS
+        self.max_attempts = max_attempts or config.WORKER_MAX_ATTEMPTS
+        # Admission caps, enforced across the whole worker fleet when claiming (0 = no cap)
+        self.per_user_limit = per_user_limit if per_user_limit is not None else config.ADMISSION_PER_USER_LIMIT
+        self.max_running = max_running if max_running is not None else config.ADMISSION_MAX_RUNNING
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Stop claiming new jobs; jobs already running are finished."""
+        self._stopping.set()
+
+    async def run(self):
+        logger.info("Worker %s started with concurrency %s", self.worker_id, self.concurrency)
+        await asyncio.gather(*(self._loop() for _ in range(self.concurrency)))
+        logger.info("Worker %s stopped", self.worker_id)
+
+    async def _loop(self):
+        while not self._stopping.is_set():
+            if await self.run_once():
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run_once(self) -> bool:
+        """Recover orphaned jobs, then claim and run one job. False when the queue was empty."""
+        recovered = db.requeue_stale_jobs(self.stale_after, self.max_attempts)
+        if recovered:
+            logger.warning("Recovered %s jobs from workers that stopped heartbeating", recovered)
+
+        job = db.claim_job(self.worker_id, self.per_user_limit, self.max_running)
+        if job is None:
+            return False
+
+        execution = asyncio.create_task(self._execute(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job, execution))
+        try:
+            status = await execution
+        except asyncio.CancelledError:
+            if not heartbeat.done() or heartbeat.cancelled():
+                raise
+            # Lost the lease: another worker owns the job now, leave its record alone
+            logger.warning("Job %s was reclaimed while running; abandoning it", job["id"])
+            return True
+        finally:
+            heartbeat.cancel()
+
+        db.complete_job(job["id"], self.worker_id, status)
+        return True
+
+    async def _heartbeat(self, job: Dict[str, Any], execution: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not db.heartbeat_job(job["id"], self.worker_id):
+                execution.cancel()
+                return
+            # Cancel requests made through the API reach the worker on its next heartbeat
+            if db.is_cancel_requested(job["execution_id"]):
+                self.runtime.cancel(job["execution_id"])
+
+    async def _execute(self, job: Dict[str, Any]) -> str:
+        exec_id = job["execution_id"]
+        payload = job["payload"]
+        if job.get("priority"):
+            db.record_admission(exec_id, job["priority"], None, time.time() - job["enqueued_at"])
+        db.update_execution(exec_id, "running")
+        try:
+            result = await self._dispatch(job["kind"], exec_id, payload)
+        except Exception as e:
+            logger.warning("Execution %s failed: %s", exec_id, e, exc_info=True)
+            db.update_execution(exec_id, "failed", {"error": str(e)})
+            return "failed"
+        # "completed", or "cancelled" / "deadline_exceeded" with partial results
+        status = "completed" if result["status"] == "success" else result["status"]
+        db.update_execution(exec_id, status, result)
+        return "done"
+
+    async def _dispatch(self, kind: str, exec_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if kind == "execute":
+            return await self.runtime.execute_plan(
+                payload["plan"], execution_id=exec_id, snapshot_key=payload.get("flow_id"),
+                timeout=payload.get("timeout_seconds"),
+            )
+        if kind == "execute_batch":
+            return await self.runtime.execute_plan_batch(
+                payload["plan"], payload["items"], max_concurrency=payload.get("max_concurrency"), execution_id=exec_id,
+                timeout=payload.get("timeout_seconds"),
+            )
+        raise ValueError(f"Unknown job kind: {kind}")
+
+
+async def _main(args: argparse.Namespace):
+    configure_logging()
+    db.init_db()
+    configure_process()
+    worker = ExecutionWorker(concurrency=args.concurrency)
+    start_node_pool_reaper(worker.runtime.node_pool)
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, worker.stop)
+        except NotImplementedError:
+            pass
+
+    try:
+        await worker.run()
+    finally:
+        await worker.runtime.shutdown()
+        shutdown_logging()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run AION execution workers against the jobs queue.")
+    parser.add_argument("--concurrency", type=int, default=None, help="Jobs run at the same time by this worker")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
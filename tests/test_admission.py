@@ -0,0 +1,60 @@
+import asyncio
+import unittest
+
+from runtime.admission import AdmissionController
+
+
+class TestAdmission(unittest.IsolatedAsyncioTestCase):
+    async def run_all(self, controller, requests):
+        """Submit (user, priority) requests in order and return the order they were admitted in."""
+        admitted = []
+        release = asyncio.Event()
+
+        async def submit(name, user, priority):
+            async with controller.admit(user, priority):
+                admitted.append(name)
+                await release.wait()
+
+        tasks = [asyncio.create_task(submit(name, user, priority)) for name, user, priority in requests]
+        await asyncio.sleep(0)
+        first = list(admitted)
+        release.set()
+        await asyncio.gather(*tasks)
+        return first, admitted
+
+    async def test_users_share_capacity_fairly(self):
+        controller = AdmissionController(max_running=1, per_user_limit=0)
+        requests = [("a1", "alice", "batch"), ("a2", "alice", "batch"), ("a3", "alice", "batch"), ("b1", "bob", "batch")]
+
+        _, order = await self.run_all(controller, requests)
+
+        # Bob's single execution does not wait behind Alice's whole backlog
+        self.assertEqual(order, ["a1", "b1", "a2", "a3"])
+
+    async def test_per_user_cap_and_priority(self):
+        controller = AdmissionController(max_running=4, per_user_limit=1, weights={"interactive": 4.0, "batch": 1.0})
+        requests = [("a1", "alice", "batch"), ("a2", "alice", "batch"), ("a3", "alice", "interactive"), ("b1", "bob", "batch")]
+
+        first, order = await self.run_all(controller, requests)
+
+        self.assertEqual(first, ["a1", "b1"])
+        self.assertEqual(order, ["a1", "b1", "a3", "a2"])
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        controller = AdmissionController(max_running=1)
+        ticket = await controller.acquire("alice")
+        waiter = asyncio.create_task(controller.acquire("bob"))
+        await asyncio.sleep(0)
+        self.assertEqual(controller.queue_depth, 1)
+
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        controller.release(ticket)
+
+        self.assertEqual(controller.queue_depth, 0)
+        self.assertEqual(controller.running, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from runtime import auth
+from runtime import database as db
+from runtime.main import app
+from nodes.core.base import BaseNode
+from nodes.registry import NodeRegistry
+
+
+class ItemNode(BaseNode):
+    async def execute(self, inputs):
+        if inputs.get("fail"):
+            return {"error": "bad item"}
+        return {"content": inputs.get("text", "")}
+
+
+NodeRegistry.register("test.api_item", ItemNode)
+
+DSL = {
+    "metadata": {"name": "batch-flow"},
+    "nodes": [{"id": "item", "type": "test.api_item", "config": {}}],
+    "edges": [],
+}
+
+
+class TestExecuteBatchEndpoint(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_path = db.DB_PATH
+        db.DB_PATH = os.path.join(self.tmp.name, "aion.db")
+        db.init_db()
+        self.user = auth.User(id="user-1", username="alice")
+        app.dependency_overrides[auth.get_current_user] = lambda: self.user
+        self.flow_id = db.create_flow(DSL, user_id=self.user.id)
+
+    def tearDown(self):
+        app.dependency_overrides.pop(auth.get_current_user, None)
+        db.DB_PATH = self.original_path
+        self.tmp.cleanup()
+
+    async def post(self, path, body):
+        # Background tasks run before the in-process transport returns the response
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json=body)
+
+    async def test_batch_reports_a_status_per_item(self):
+        items = [{"text": "a"}, {"fail": True}, {"text": "c"}]
+        response = await self.post(f"/flows/{self.flow_id}/execute_batch", {"inputs": items})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["status"], body["batch_size"]), ("pending", 3))
+
+        execution = db.get_execution(body["execution_id"], user_id=self.user.id)
+        self.assertEqual(execution["status"], "completed")
+        result = execution["result"]
+        self.assertEqual([item["status"] for item in result["items"]], ["success", "failed", "success"])
+        self.assertEqual(result["items"][2]["results"]["step_item"], {"content": "c"})
+
+    async def test_invalid_requests_are_rejected(self):
+        path = f"/flows/{self.flow_id}/execute_batch"
+        self.assertEqual((await self.post(path, {"inputs": []})).status_code, 400)
+        self.assertEqual((await self.post(path, {"inputs": [{}], "priority": "urgent"})).status_code, 400)
+        self.assertEqual((await self.post(path, {"inputs": "not-a-list"})).status_code, 422)
+
+    async def test_unknown_flow_is_not_found(self):
+        response = await self.post("/flows/missing-flow/execute_batch", {"inputs": [{"text": "a"}]})
+        self.assertEqual(response.status_code, 404)
+
+        # Flows of other users look the same as missing ones
+        other = db.create_flow(DSL, user_id="user-2")
+        response = await self.post(f"/flows/{other}/execute_batch", {"inputs": [{"text": "a"}]})
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
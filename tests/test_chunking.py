@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+
+from nodes.core.rag import ChunkTextNode, iter_char_chunks, iter_token_chunks
+
+TEXT = "First sentence here. Second one follows!\n\nA new paragraph starts. It ends here."
+
+
+def blocks(text, size):
+    return iter([text[start:start + size] for start in range(0, len(text), size)])
+
+
+class TestChunking(unittest.IsolatedAsyncioTestCase):
+    def test_chunks_do_not_depend_on_block_boundaries(self):
+        for chunker, size, overlap in ((iter_char_chunks, 25, 5), (iter_token_chunks, 4, 1)):
+            for boundary in ("none", "sentence", "paragraph"):
+                whole = list(chunker(iter([TEXT]), size, overlap, boundary))
+                self.assertEqual(list(chunker(blocks(TEXT, 7), size, overlap, boundary)), whole)
+                self.assertTrue(all(TEXT[start:end] == text for start, end, text in whole))
+                self.assertEqual((whole[0][0], whole[-1][1]), (0, len(TEXT)))
+
+    def test_boundary_aware_cuts(self):
+        sentences = [text for _, _, text in iter_char_chunks(iter([TEXT]), 45, 0, "sentence")]
+        self.assertEqual(sentences[0], "First sentence here. Second one follows!\n\n")
+        tokens = [text for _, _, text in iter_token_chunks(iter([TEXT]), 6, 0, "paragraph")]
+        self.assertEqual(tokens, ["First sentence here. Second one follows!", "A new paragraph starts.", "It ends here."])
+
+    async def test_node_reads_files_and_rejects_bad_overlap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.txt")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(TEXT)
+            result = await ChunkTextNode({"path": path, "size": 30, "overlap": 10, "batch_size": 2}).execute({})
+
+        self.assertEqual(result["chunks"], [TEXT[start:end] for start, end in result["offsets"]])
+        self.assertEqual(result["offsets"][1][0], 20)
+
+        invalid = await ChunkTextNode({"size": 10, "overlap": 10}).execute({"content": TEXT})
+        self.assertIn("error", invalid)
+        self.assertEqual(invalid["chunks"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,81 @@
 import unittest
 import asyncio
+import os
+import threading
+import time
 
 from compiler.compiler import AIONCompiler
 from runtime.executor import AIONRuntime
+from runtime.incremental import ExecutionSnapshotStore
+from runtime.node_pool import NodeInstancePool
+from runtime.offload import ProcessOffloader
+from nodes.core.base import BaseNode
+from nodes.registry import NodeRegistry
+
+
+class SleepNode(BaseNode):
+    async def execute(self, inputs):
+        await asyncio.sleep(self.config.get("seconds", 0.1))
+        return {"content": self.config.get("text", "")}
+
+
+class PidNode(BaseNode):
+    cpu_bound = True
+
+    async def execute(self, inputs):
+        return {"pid": os.getpid()}
+
+
+class CrashingWorkerNode(BaseNode):
+    cpu_bound = True
+
+    async def execute(self, inputs):
+        if os.getpid() != self.config["parent_pid"]:
+            os._exit(1)
+        return {"pid": os.getpid(), "thread": threading.current_thread().name}
+
+
+class WarmNode(BaseNode):
+    setups = 0
+    teardowns = 0
+
+    async def setup(self):
+        WarmNode.setups += 1
+
+    async def teardown(self):
+        WarmNode.teardowns += 1
+
+    async def execute(self, inputs):
+        return {"content": self.config.get("text", "")}
+
+
+class TracingNode(BaseNode):
+    cacheable = True
+    runs = []
+
+    async def execute(self, inputs):
+        TracingNode.runs.append(self.config["name"])
+        return {"content": f"{self.config['name']}({inputs.get('content', '')})"}
+
+
+NodeRegistry.register("test.sleep", SleepNode)
+NodeRegistry.register("test.trace", TracingNode)
+NodeRegistry.register("test.warm", WarmNode)
+NodeRegistry.register("test.pid", PidNode)
+NodeRegistry.register("test.crash_worker", CrashingWorkerNode)
+
+
+def fan_in_dsl(branches: int, seconds: float):
+    nodes = [
+        {"id": f"load{i}", "type": "test.sleep", "config": {"seconds": seconds, "text": str(i)}}
+        for i in range(branches)
+    ]
+    nodes.append({"id": "join", "type": "test.sleep", "config": {"seconds": 0}})
+    edges = [
+        {"id": f"e{i}", "source": f"load{i}", "source_output": "content", "target": "join", "target_input": "context"}
+        for i in range(branches)
+    ]
+    return {"metadata": {"name": "fan-in"}, "nodes": nodes, "edges": edges}
 
 
 class TestDSLExecution(unittest.IsolatedAsyncioTestCase):
@@ -35,6 +108,209 @@ class TestDSLExecution(unittest.IsolatedAsyncioTestCase):
         self.assertIn("step_src", result["results"])
         self.assertIn("step_clean", result["results"])
 
+    async def test_independent_branches_run_concurrently(self):
+        plan = AIONCompiler().compile(fan_in_dsl(branches=4, seconds=0.2))
+
+        started = time.perf_counter()
+        result = await AIONRuntime().execute_plan(plan)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(list(result["results"]), [step["step_id"] for step in plan["steps"]])
+        self.assertLess(elapsed, 0.6)
+
+    async def test_max_concurrency_limits_parallel_steps(self):
+        plan = AIONCompiler().compile(fan_in_dsl(branches=4, seconds=0.1))
+
+        started = time.perf_counter()
+        await AIONRuntime().execute_plan(plan, max_concurrency=1)
+        elapsed = time.perf_counter() - started
+
+        self.assertGreaterEqual(elapsed, 0.4)
+
+    async def test_free_intermediates_keeps_only_final_outputs(self):
+        dsl = fan_in_dsl(branches=2, seconds=0)
+        dsl["nodes"].append({"id": "out", "type": "api.endpoint", "config": {}})
+        dsl["edges"].append({"id": "e_out", "source": "join", "source_output": "content", "target": "out", "target_input": "result"})
+        plan = AIONCompiler().compile(dsl)
+
+        steps = {step["step_id"]: step for step in plan["steps"]}
+        self.assertEqual(steps["step_load0"]["consumers"], ["step_join"])
+        self.assertFalse(steps["step_join"]["retain_output"])
+        self.assertTrue(steps["step_out"]["retain_output"])
+
+        result = await AIONRuntime().execute_plan(plan, free_intermediates=True)
+        self.assertEqual(list(result["results"]), ["step_out"])
+
+    async def test_cpu_bound_nodes_run_in_process_pool(self):
+        dsl = {"metadata": {"name": "offload"}, "nodes": [{"id": "pid", "type": "test.pid", "config": {}}], "edges": []}
+        plan = AIONCompiler().compile(dsl)
+
+        pooled = AIONRuntime(offloader=ProcessOffloader(max_workers=1))
+        try:
+            result = await pooled.execute_plan(plan)
+        finally:
+            await pooled.shutdown()
+        self.assertNotEqual(result["results"]["step_pid"]["pid"], os.getpid())
+
+        inline = await AIONRuntime(offloader=ProcessOffloader(max_workers=0)).execute_plan(plan)
+        self.assertEqual(inline["results"]["step_pid"]["pid"], os.getpid())
+
+    async def test_broken_process_pool_falls_back_off_the_event_loop(self):
+        node = {"id": "crash", "type": "test.crash_worker", "config": {"parent_pid": os.getpid()}}
+        plan = AIONCompiler().compile({"metadata": {"name": "crash"}, "nodes": [node], "edges": []})
+
+        runtime = AIONRuntime(offloader=ProcessOffloader(max_workers=1))
+        try:
+            result = await runtime.execute_plan(plan)
+        finally:
+            await runtime.shutdown()
+        self.assertEqual(result["results"]["step_crash"]["pid"], os.getpid())
+        self.assertNotEqual(result["results"]["step_crash"]["thread"], threading.current_thread().name)
+
+    async def test_node_instances_are_reused_across_executions(self):
+        dsl = {"metadata": {"name": "warm"}, "nodes": [{"id": "w", "type": "test.warm", "config": {"text": "x"}}], "edges": []}
+        plan = AIONCompiler().compile(dsl)
+        runtime = AIONRuntime()
+        WarmNode.setups = WarmNode.teardowns = 0
+
+        await runtime.execute_plan(plan)
+        await runtime.execute_plan(plan)
+        self.assertEqual(WarmNode.setups, 1)
+
+        await runtime.shutdown()
+        self.assertEqual(WarmNode.teardowns, 1)
+
+    async def test_idle_node_instances_are_torn_down_without_further_releases(self):
+        def plan(text):
+            dsl = {"metadata": {"name": "warm"}, "nodes": [{"id": "w", "type": "test.warm", "config": {"text": text}}], "edges": []}
+            return AIONCompiler().compile(dsl)
+
+        pool = NodeInstancePool(idle_ttl=0.05, reap_interval=0.02)
+        runtime = AIONRuntime(node_pool=pool)
+        WarmNode.setups = WarmNode.teardowns = 0
+
+        # Traffic moving to another config evicts the stale instance on acquire
+        await runtime.execute_plan(plan("a"))
+        await asyncio.sleep(0.1)
+        async with pool.lease("test.warm", {"text": "b"}):
+            self.assertEqual(WarmNode.teardowns, 1)
+
+        # With no traffic at all, the reaper does it
+        pool.start_reaper()
+        await asyncio.sleep(0.2)
+        self.assertEqual(WarmNode.teardowns, 2)
+        self.assertEqual(pool._idle, {})
+        await runtime.shutdown()
+
+    async def test_incremental_run_only_recomputes_changed_steps(self):
+        def dsl(prompt):
+            return {
+                "metadata": {"name": "incremental", "incremental": True},
+                "nodes": [
+                    {"id": "load", "type": "test.trace", "config": {"name": "load"}},
+                    {"id": "embed", "type": "test.trace", "config": {"name": "embed"}},
+                    {"id": "generate", "type": "test.trace", "config": {"name": prompt}},
+                ],
+                "edges": [
+                    {"id": "e1", "source": "load", "source_output": "content", "target": "embed", "target_input": "content"},
+                    {"id": "e2", "source": "embed", "source_output": "content", "target": "generate", "target_input": "content"},
+                ],
+            }
+
+        runtime = AIONRuntime(snapshots=ExecutionSnapshotStore(max_bytes=1 << 20))
+        TracingNode.runs = []
+        await runtime.execute_plan(AIONCompiler().compile(dsl("v1")), snapshot_key="flow-1")
+        second = await runtime.execute_plan(AIONCompiler().compile(dsl("v2")), snapshot_key="flow-1")
+
+        self.assertEqual(TracingNode.runs, ["load", "embed", "v1", "v2"])
+        self.assertEqual(second["reused_steps"], ["step_load", "step_embed"])
+        self.assertEqual(second["results"]["step_generate"]["content"], "v2(embed(load()))")
+
+        third = await runtime.execute_plan(AIONCompiler().compile(dsl("v2")), snapshot_key="flow-1")
+        self.assertEqual(third["reused_steps"], ["step_load", "step_embed", "step_generate"])
+        self.assertEqual(TracingNode.runs, ["load", "embed", "v1", "v2"])
+
+        # Flows that do not opt in, and runtimes without a snapshot budget, always recompute
+        plain = dsl("v2")
+        del plain["metadata"]["incremental"]
+        await runtime.execute_plan(AIONCompiler().compile(plain), snapshot_key="flow-2")
+        await AIONRuntime().execute_plan(AIONCompiler().compile(dsl("v2")), snapshot_key="flow-3")
+        self.assertEqual(TracingNode.runs, ["load", "embed", "v1", "v2"] + ["load", "embed", "v2"] * 2)
+
+    async def test_incremental_run_never_reuses_expiring_steps(self):
+        dsl = {
+            "metadata": {"name": "ttl", "incremental": True},
+            "nodes": [
+                {"id": "fetch", "type": "test.trace", "config": {"name": "fetch", "cache_ttl": 60}},
+                {"id": "use", "type": "test.trace", "config": {"name": "use"}},
+            ],
+            "edges": [{"id": "e1", "source": "fetch", "source_output": "content", "target": "use", "target_input": "content"}],
+        }
+        runtime = AIONRuntime(snapshots=ExecutionSnapshotStore(max_bytes=1 << 20))
+        TracingNode.runs = []
+        await runtime.execute_plan(AIONCompiler().compile(dsl), snapshot_key="ttl-flow")
+        second = await runtime.execute_plan(AIONCompiler().compile(dsl), snapshot_key="ttl-flow")
+
+        # A result with a TTL could be stale, and so could everything built from it
+        self.assertEqual(second["reused_steps"], [])
+        self.assertEqual(TracingNode.runs, ["fetch", "use"] * 2)
+
+    def test_snapshot_store_is_bounded_by_bytes(self):
+        store = ExecutionSnapshotStore(max_bytes=6000)
+        store.save("a", {"step_x": ("f1", {"data": list(range(100))})})
+        store.save("b", {"step_x": ("f1", {"data": list(range(100))})})
+        store.save("huge", {"step_x": ("f1", {"data": list(range(10000))})})
+
+        self.assertEqual(store.reusable("a", {"step_x": "f1"}), {})
+        self.assertEqual(len(store.reusable("b", {"step_x": "f1"})["step_x"]["data"]), 100)
+        self.assertEqual(store.reusable("huge", {"step_x": "f1"}), {})
+        self.assertLessEqual(store.nbytes, 6000)
+
+    def chain_dsl(self, *seconds):
+        return {
+            "metadata": {"name": "chain"},
+            "nodes": [{"id": f"s{i}", "type": "test.sleep", "config": {"seconds": s}} for i, s in enumerate(seconds)],
+            "edges": [
+                {"id": f"e{i}", "source": f"s{i}", "source_output": "content", "target": f"s{i + 1}", "target_input": "content"}
+                for i in range(len(seconds) - 1)
+            ],
+        }
+
+    async def test_cancel_stops_running_and_pending_steps(self):
+        runtime = AIONRuntime()
+        plan = AIONCompiler().compile(self.chain_dsl(0, 5, 0))
+        execution = asyncio.create_task(runtime.execute_plan(plan, execution_id="exec-1"))
+        await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        self.assertTrue(runtime.cancel("exec-1"))
+        result = await execution
+
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(result["status"], "cancelled")
+        self.assertIn("step_s0", result["results"])
+        self.assertEqual(result["interrupted_steps"], ["step_s1"])
+        self.assertEqual(result["not_started_steps"], ["step_s2"])
+        self.assertFalse(runtime.cancel("exec-1"))
+
+    async def test_deadline_is_enforced_and_visible_to_nodes(self):
+        seen = []
+
+        class BudgetNode(BaseNode):
+            async def execute(self, inputs):
+                seen.append(self.remaining_time())
+                return {}
+
+        NodeRegistry.register("test.budget", BudgetNode)
+        dsl = self.chain_dsl(0, 5)
+        dsl["nodes"][0]["type"] = "test.budget"
+        result = await AIONRuntime().execute_plan(AIONCompiler().compile(dsl), timeout=0.2)
+
+        self.assertEqual(result["status"], "deadline_exceeded")
+        self.assertEqual(result["interrupted_steps"], ["step_s1"])
+        self.assertTrue(0 < seen[0] <= 0.2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from nodes.core import embeddings
+from nodes.core.embeddings import EmbeddingCache, HashingEmbeddingProvider, get_provider, register_provider, text_digest
+from nodes.core.rag import EmbedNode
+
+
+class CountingProvider(HashingEmbeddingProvider):
+    def __init__(self, dimension):
+        super().__init__(dimension)
+        self.name = f"test/counting-{dimension}"
+        self.embedded = []
+
+    async def embed(self, texts):
+        self.embedded.extend(texts)
+        return self.encode(texts)
+
+
+class TestEmbeddings(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        embeddings.embedding_cache.configure(1000, None)
+        embeddings.embedding_cache.clear()
+
+    def test_local_provider_is_deterministic_and_normalized(self):
+        provider = HashingEmbeddingProvider(64)
+        matrix = provider.encode(["churn risk is rising", "churn risk is rising fast", "quarterly revenue report", ""])
+        self.assertEqual(matrix.shape, (4, 64))
+        self.assertEqual(matrix.dtype, np.float32)
+        np.testing.assert_allclose(np.linalg.norm(matrix[:3], axis=1), 1.0, rtol=1e-5)
+        self.assertFalse(matrix[3].any())
+        self.assertGreater(matrix[0] @ matrix[1], matrix[0] @ matrix[2])
+        np.testing.assert_array_equal(HashingEmbeddingProvider(64).encode(["churn risk is rising"])[0], matrix[0])
+
+    def test_cache_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "embeddings.db")
+            vector = np.arange(4, dtype=np.float32)
+            EmbeddingCache(path=path).put_many("m", [(text_digest("a"), vector)])
+            found = EmbeddingCache(path=path).get_many("m", [text_digest("a"), text_digest("b")])
+        self.assertEqual(list(found), [text_digest("a")])
+        np.testing.assert_array_equal(found[text_digest("a")], vector)
+
+    async def test_node_batches_and_never_reembeds_cached_chunks(self):
+        register_provider("test/counting", CountingProvider)
+        provider = get_provider("test/counting", 32)
+        chunks = ["alpha beta", "alpha beta", "gamma", "delta epsilon", "zeta"]
+        node = EmbedNode({"model": "test/counting", "dimension": 32, "batch_size": 2, "concurrency": 2})
+
+        first = await node.execute({"chunks": chunks})
+        self.assertEqual(first["chunks"], chunks)
+        self.assertEqual(len(first["embeddings"]), 5)
+        np.testing.assert_array_equal(first["embeddings"][0], first["embeddings"][1])
+        np.testing.assert_array_equal(first["embeddings"][3], provider.encode(["delta epsilon"])[0])
+        self.assertEqual(sorted(provider.embedded), sorted(set(chunks)))
+
+        provider.embedded.clear()
+        second = await node.execute({"chunker": {"chunks": chunks + ["eta"]}})
+        self.assertEqual(provider.embedded, ["eta"])
+        self.assertEqual(second["hashes"][:5], first["hashes"])
+
+    async def test_unknown_model_is_an_error(self):
+        unknown = await EmbedNode({"model": "unknown/model-x", "dimension": 16}).execute({"chunks": ["hello"]})
+        self.assertIn("unknown/model-x", unknown["error"])
+        self.assertEqual(unknown["embeddings"], [])
+
+        result = await EmbedNode({"model": "local/hashing", "dimension": 16}).execute({"chunks": ["hello"]})
+        self.assertTrue(result["model"].startswith("local/hashing"))
+        self.assertEqual(result["embeddings"][0].shape, (16,))
+
+        invalid = await EmbedNode({"batch_size": 0}).execute({"chunks": ["hello"]})
+        self.assertIn("error", invalid)
+
+
+if __name__ == "__main__":
+    unittest.main()
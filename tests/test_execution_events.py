@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+
+from compiler.compiler import AIONCompiler
+from nodes.core.base import BaseNode
+from nodes.registry import NodeRegistry
+from runtime.events import EventBus
+from runtime.executor import AIONRuntime
+
+
+class SlowNode(BaseNode):
+    async def execute(self, inputs):
+        await asyncio.sleep(5)
+        return {}
+
+
+NodeRegistry.register("test.events_slow", SlowNode)
+
+SLOW_DSL = {
+    "metadata": {"name": "slow-flow"},
+    "nodes": [{"id": "slow", "type": "test.events_slow", "config": {}}],
+    "edges": [],
+}
+
+
+async def final_event(runtime, execution_id, stop):
+    """Run the slow flow, stop it with `stop(task)` and return its execution-finished event."""
+    with runtime.events.subscribe(execution_id) as subscription:
+        task = asyncio.create_task(runtime.execute_plan(AIONCompiler().compile(SLOW_DSL), execution_id=execution_id))
+        await asyncio.sleep(0.05)
+        stop(task)
+        await asyncio.gather(task, return_exceptions=True)
+        events = []
+        while (event := await subscription.get(timeout=0)) is not None:
+            events.append(event)
+    return events[-1]
+
+
+class TestExecutionEvents(unittest.IsolatedAsyncioTestCase):
+    async def test_runtime_publishes_step_progress(self):
+        dsl = {
+            "metadata": {"name": "events-flow"},
+            "nodes": [
+                {"id": "src", "type": "loader.static", "config": {"text": "hello"}},
+                {"id": "clean", "type": "transform.clean", "config": {}},
+            ],
+            "edges": [{"id": "e1", "source": "src", "source_output": "content", "target": "clean", "target_input": "text"}],
+        }
+        runtime = AIONRuntime()
+
+        with runtime.events.subscribe("exec-1") as subscription:
+            await runtime.execute_plan(AIONCompiler().compile(dsl), execution_id="exec-1")
+            events = []
+            while (event := await subscription.get(timeout=0)) is not None:
+                events.append((event["type"], event.get("step_id")))
+
+        self.assertEqual(events, [
+            ("execution-started", None),
+            ("step-started", "step_src"),
+            ("step-finished", "step_src"),
+            ("step-started", "step_clean"),
+            ("step-finished", "step_clean"),
+            ("execution-finished", None),
+        ])
+
+    async def test_batch_execution_finishes_even_when_it_crashes(self):
+        class BrokenRuntime(AIONRuntime):
+            def _resolve_inputs(self, *args):
+                raise RuntimeError("boom")
+
+        dsl = {
+            "metadata": {"name": "events-flow"},
+            "nodes": [{"id": "src", "type": "loader.static", "config": {"text": "hello"}}],
+            "edges": [],
+        }
+        runtime = BrokenRuntime()
+
+        with runtime.events.subscribe("exec-2") as subscription:
+            with self.assertRaises(RuntimeError):
+                await runtime.execute_plan_batch(AIONCompiler().compile(dsl), [{}], execution_id="exec-2")
+            events = []
+            while (event := await subscription.get(timeout=0)) is not None:
+                events.append((event["type"], event.get("status")))
+
+        self.assertEqual(events[-1], ("execution-finished", "failed"))
+
+    async def test_cancelled_runs_never_finish_as_success(self):
+        runtime = AIONRuntime()
+
+        requested = await final_event(runtime, "exec-3", lambda task: runtime.cancel("exec-3"))
+        self.assertEqual((requested["type"], requested["status"]), ("execution-finished", "cancelled"))
+
+        # The caller's task itself cancelled (e.g. client disconnect, shutdown)
+        aborted = await final_event(runtime, "exec-4", lambda task: task.cancel())
+        self.assertEqual((aborted["type"], aborted["status"]), ("execution-finished", "cancelled"))
+
+    async def test_late_subscriber_gets_history_and_slow_one_drops_oldest(self):
+        bus = EventBus(queue_size=2, history_size=8)
+        bus.publish("exec-1", "step-started", step_id="a")
+
+        with bus.subscribe("exec-1") as subscription:
+            bus.publish("exec-1", "step-finished", step_id="a")
+            bus.publish("exec-1", "completed", status="completed")
+
+            self.assertEqual(subscription.dropped, 1)
+            self.assertEqual((await subscription.get())["type"], "step-finished")
+            self.assertEqual((await subscription.get())["type"], "completed")
+        self.assertIsNone(await subscription.get(timeout=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from nodes.core.table import Table
+from nodes.executive_intelligence_churn import ExplainabilityNode
+
+
+class TestExplainability(unittest.IsolatedAsyncioTestCase):
+    async def test_explains_every_high_risk_row(self):
+        features = Table({"a": [1.0, -3.0, 2.0], "b": [2.0, 1.0, 0.0], "c": [0.5, 0.0, -4.0]})
+        node = ExplainabilityNode({"top_k": 2, "risk_threshold": 0.5, "feature_importance": {"a": 1.0, "c": -2.0}})
+
+        result = await node.execute({"features": features, "proba": [0.1, 0.6, 0.9]})
+
+        self.assertEqual(result["explained_rows"], 2)
+        self.assertEqual(
+            [(row["row"], row["rank"], row["feature"], row["contribution"]) for row in result["row_factors"].to_rows()],
+            [(1, 1, "a", -3.0), (1, 2, "c", -0.0), (2, 1, "c", 8.0), (2, 2, "a", 2.0)],
+        )
+        self.assertEqual([factor["feature"] for factor in result["top_factors"]], ["c", "a"])
+        self.assertEqual(result["top_factors"][0]["mean_abs_contribution"], 4.0)
+
+    async def test_threshold_without_probabilities_is_an_error(self):
+        result = await ExplainabilityNode({"risk_threshold": 0.5}).execute({"features": Table({"a": [1.0]})})
+        self.assertIn("error", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from compiler.compiler import AIONCompiler
+from runtime import database as db
+from runtime.worker import ExecutionWorker
+
+DSL = {
+    "metadata": {"name": "queued-flow"},
+    "nodes": [{"id": "src", "type": "loader.static", "config": {"text": "hello"}}],
+    "edges": [],
+}
+
+
+class TestJobQueue(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_path = db.DB_PATH
+        db.DB_PATH = os.path.join(self.tmp.name, "aion.db")
+        db.init_db()
+
+    def tearDown(self):
+        db.DB_PATH = self.original_path
+        self.tmp.cleanup()
+
+    def enqueue(self):
+        exec_id = db.create_execution("queued-flow")
+        db.enqueue_job(exec_id, "execute", {"plan": AIONCompiler().compile(DSL), "flow_id": "queued-flow"})
+        return exec_id
+
+    def test_job_is_claimed_once(self):
+        self.enqueue()
+
+        self.assertIsNotNone(db.claim_job("worker-a"))
+        self.assertIsNone(db.claim_job("worker-b"))
+
+    def test_interactive_jobs_are_claimed_before_older_batch_jobs(self):
+        batch = db.create_execution("queued-flow")
+        db.enqueue_job(batch, "execute", {"plan": AIONCompiler().compile(DSL)}, priority="batch", priority_weight=1.0)
+        interactive = db.create_execution("queued-flow")
+        db.enqueue_job(interactive, "execute", {"plan": AIONCompiler().compile(DSL)}, priority="interactive", priority_weight=4.0)
+
+        self.assertEqual(db.claim_job("worker")["execution_id"], interactive)
+        self.assertEqual(db.claim_job("worker")["execution_id"], batch)
+
+    def test_claims_enforce_per_user_caps_and_fair_share(self):
+        def enqueue(user):
+            exec_id = db.create_execution("queued-flow", user_id=user)
+            db.enqueue_job(exec_id, "execute", {"plan": AIONCompiler().compile(DSL)}, user_id=user)
+
+        # Alice bursts first; Bob's single job must not wait behind all of hers
+        for _ in range(4):
+            enqueue("alice")
+        enqueue("bob")
+
+        claimed = [db.claim_job(f"w{index}", per_user_limit=2)["user_id"] for index in range(3)]
+        self.assertEqual(claimed, ["alice", "bob", "alice"])
+        # Alice is at her cap and Bob has nothing left: her remaining jobs keep waiting
+        self.assertIsNone(db.claim_job("w3", per_user_limit=2))
+        self.assertIsNone(db.claim_job("w3", per_user_limit=0, max_running=3))
+        self.assertEqual(db.claim_job("w3")["user_id"], "alice")
+
+    def test_stale_job_is_requeued_then_failed(self):
+        exec_id = self.enqueue()
+        job = db.claim_job("crashed")
+
+        self.assertEqual(db.requeue_stale_jobs(stale_after_seconds=-1, max_attempts=2), 1)
+        self.assertFalse(db.heartbeat_job(job["id"], "crashed"))
+        self.assertEqual(db.get_execution(exec_id)["status"], "pending")
+
+        self.assertEqual(db.claim_job("crashed-again")["attempts"], 2)
+        db.requeue_stale_jobs(stale_after_seconds=-1, max_attempts=2)
+        self.assertEqual(db.get_execution(exec_id)["status"], "failed")
+        self.assertIsNone(db.claim_job("worker"))
+
+    async def test_worker_runs_queued_execution(self):
+        exec_id = self.enqueue()
+        worker = ExecutionWorker(worker_id="worker", heartbeat_interval=60)
+
+        self.assertTrue(await worker.run_once())
+        self.assertFalse(await worker.run_once())
+
+        execution = db.get_execution(exec_id)
+        self.assertEqual(execution["status"], "completed")
+        self.assertEqual(execution["result"]["results"]["step_src"]["content"], "hello")
+        await worker.runtime.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
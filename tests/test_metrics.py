@@ -0,0 +1,36 @@
+import unittest
+
+from compiler.compiler import AIONCompiler
+from runtime import metrics
+from runtime.executor import AIONRuntime
+from runtime.main import metrics_endpoint
+
+
+class TestMetrics(unittest.IsolatedAsyncioTestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        histogram = metrics.Histogram("test_latency_seconds", "Test histogram.", ["op"], buckets=(0.1, 1.0))
+        histogram.observe(0.05, op="read")
+        histogram.observe(0.5, op="read")
+        histogram.observe(5.0, op="read")
+
+        rendered = histogram.render()
+        self.assertIn('test_latency_seconds_bucket{op="read",le="0.1"} 1', rendered)
+        self.assertIn('test_latency_seconds_bucket{op="read",le="1.0"} 2', rendered)
+        self.assertIn('test_latency_seconds_bucket{op="read",le="+Inf"} 3', rendered)
+        self.assertIn('test_latency_seconds_count{op="read"} 3', rendered)
+
+    async def test_execution_records_step_metrics(self):
+        dsl = {
+            "metadata": {"name": "metrics-flow"},
+            "nodes": [{"id": "src", "type": "loader.static", "config": {"text": "hello"}}],
+            "edges": [],
+        }
+        await AIONRuntime().execute_plan(AIONCompiler().compile(dsl))
+
+        body = metrics_endpoint().body.decode("utf-8")
+        self.assertIn('aion_step_seconds_count{node_type="loader.static"}', body)
+        self.assertIn("aion_executions_in_flight 0.0", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from nodes.core.models import ModelRegistry
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, model, mtime=None):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as handle:
+            pickle.dump(model, handle)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_loads_once_and_reloads_only_changed_content(self):
+        registry = ModelRegistry()
+        path = self.write("model.pkl", {"version": 1}, mtime=1_000)
+
+        first = registry.get(path)
+        self.assertIs(registry.get(path), first)
+
+        # Same bytes with a new mtime: the loaded object is kept
+        self.write("model.pkl", {"version": 1}, mtime=2_000)
+        self.assertIs(registry.get(path), first)
+        self.assertEqual(registry.loads, 1)
+
+        self.write("model.pkl", {"version": 2}, mtime=3_000)
+        self.assertEqual(registry.get(path), {"version": 2})
+        self.assertEqual(registry.loads, 2)
+
+    def test_evicts_least_recently_used_over_budget(self):
+        paths = [self.write(f"m{index}.pkl", list(range(200))) for index in range(3)]
+        registry = ModelRegistry(max_bytes=os.path.getsize(paths[0]) * 2)
+
+        registry.get(paths[0])
+        registry.get(paths[1])
+        registry.get(paths[0])
+        registry.get(paths[2])
+
+        self.assertIn(paths[0], registry)
+        self.assertNotIn(paths[1], registry)
+        self.assertEqual(registry.preload([paths[1], os.path.join(self.tmp.name, "missing.pkl")]),
+                         [os.path.join(self.tmp.name, "missing.pkl")])
+
+
+if __name__ == "__main__":
+    unittest.main()
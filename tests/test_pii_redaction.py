@@ -0,0 +1,102 @@
+import csv
+import hashlib
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from nodes.core.base import process_runner
+from nodes.core.table import Table
+from nodes.executive_intelligence_churn import CsvDataSourceNode, PIIRedactionNode
+from runtime.offload import ProcessOffloader
+
+
+def sha(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TestPIIRedaction(unittest.IsolatedAsyncioTestCase):
+    async def test_hashes_repeated_unique_and_numeric_columns(self):
+        table = Table({
+            "City": ["Paris", None, "Paris", "Lyon"],
+            "Email": ["a@x.io", "b@x.io", "c@x.io", "d@x.io"],
+            "CustomerId": np.array([1000.0, np.nan, 1002.0, 1000.0]),
+        })
+        node = PIIRedactionNode({"columns_to_hash": ["City", "Email", "CustomerId"]})
+
+        redacted, _, hashed_count = await node._redact(table, set())
+
+        self.assertEqual(redacted.column("City").tolist(), [sha("Paris"), None, sha("Paris"), sha("Lyon")])
+        self.assertEqual(redacted.column("Email").tolist(), [sha(f"{user}@x.io") for user in "abcd"])
+        self.assertEqual(redacted.column("CustomerId").tolist(), [sha("1000.0"), None, sha("1002.0"), sha("1000.0")])
+        self.assertEqual(hashed_count, 10)
+
+    async def test_inferred_csv_hashes_like_the_raw_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "customers.csv")
+            with open(path, "w", newline="", encoding="utf-8") as handle:
+                handle.write("CustomerId,Code,Score,Rate,Age\n12345678901234567,+5,1e3,0.10,41\n,6,2,0.25,7\n12345678901234567,7,3,1.5,41\n")
+            with open(path, newline="", encoding="utf-8") as handle:
+                raw = list(csv.DictReader(handle))
+            table = (await CsvDataSourceNode({"path": path, "infer_types": True}).execute({}))["rows"]
+
+        columns = ["CustomerId", "Code", "Score", "Rate", "Age"]
+        redacted, _, _ = await PIIRedactionNode({"columns_to_hash": columns})._redact(table, set())
+
+        self.assertEqual(table.schema["Age"], "int64")
+        for column in columns:
+            # Baseline redaction: sha256(str(cell)) of every csv.DictReader value
+            self.assertEqual(redacted.column(column).tolist(), [sha(str(row[column])) for row in raw], column)
+
+    async def test_cardinality_is_not_remembered_across_executions(self):
+        class SpyNode(PIIRedactionNode):
+            indexed = []
+
+            def _distinct_texts(self, name, values, high_cardinality):
+                nulls, texts, inverse = super()._distinct_texts(name, values, high_cardinality)
+                self.indexed.append(inverse is not None)
+                return nulls, texts, inverse
+
+        node = SpyNode({"columns_to_hash": ["Email"]})
+        await node.execute({"rows": Table({"Email": [f"{index}@x.io" for index in range(10)]})})
+        result = await node.execute({"rows": Table({"Email": ["a@x.io"] * 10})})
+
+        # The pooled instance dedupes the second, repetitive dataset again
+        self.assertEqual(SpyNode.indexed, [False, True])
+        self.assertEqual(result["rows"].column("Email").tolist(), [sha("a@x.io")] * 10)
+
+    async def test_process_pool_shards_match_inline_digests(self):
+        texts = [f"value-{index}" for index in range(1000)] + ["", "ünïcode"]
+        offloader = ProcessOffloader(2)
+        self.addCleanup(offloader.shutdown)
+
+        digests = await PIIRedactionNode._digests_in_pool(texts, parallel_min=100, run=offloader.call)
+
+        self.assertEqual(digests, [sha(text) for text in texts])
+
+    async def test_large_columns_are_sharded_only_through_the_runtime_pool(self):
+        shards = []
+
+        async def run(fn, *args):
+            shards.append(len(args[1]) - 1)
+            return fn(*args)
+
+        node = PIIRedactionNode({"columns_to_hash": ["Email"], "parallel_min_values": 100})
+        await node.execute({"rows": Table({"Email": [f"inline-{index}@x.io" for index in range(400)]})})
+        self.assertEqual(shards, [])
+
+        # Emails not seen before, so none of them come from the digest cache
+        emails = [f"sharded-{index}@x.io" for index in range(400)]
+        token = process_runner.set(run)
+        try:
+            sharded = await node.execute({"rows": Table({"Email": emails})})
+        finally:
+            process_runner.reset(token)
+
+        self.assertEqual(sum(shards), 400)
+        self.assertEqual(sharded["rows"].column("Email").tolist(), [sha(email) for email in emails])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from compiler.compiler import AIONCompiler
+from runtime.cache import StepCache, fingerprint
+from runtime.executor import AIONRuntime
+from nodes.core.base import BaseNode
+from nodes.registry import NodeRegistry
+
+
+class CountingNode(BaseNode):
+    cacheable = True
+    calls = 0
+
+    async def execute(self, inputs):
+        CountingNode.calls += 1
+        return {"content": f"{self.config.get('text', '')}:{CountingNode.calls}"}
+
+
+NodeRegistry.register("test.counting", CountingNode)
+
+
+class TestStepCache(unittest.IsolatedAsyncioTestCase):
+    def test_fingerprint_ignores_key_order(self):
+        self.assertEqual(fingerprint({"a": 1, "b": [1, 2]}), fingerprint({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(fingerprint({"a": 1}), fingerprint({"a": 2}))
+
+    def test_lru_eviction(self):
+        cache = StepCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), (True, 1))
+        self.assertEqual(cache.get("b"), (False, None))
+
+    def test_disk_tier_survives_new_instance(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            StepCache(disk_path=tmp).set("key", {"rows": [1, 2]})
+            self.assertEqual(StepCache(disk_path=tmp).get("key"), (True, {"rows": [1, 2]}))
+
+    def test_memory_tier_is_bounded_by_bytes(self):
+        cache = StepCache(max_entries=0, max_bytes=10_000)
+        cache.set("a", {"data": list(range(200))})
+        cache.set("b", {"data": list(range(200))})
+        cache.set("c", {"data": list(range(200))})
+        cache.set("huge", {"data": list(range(100_000))})
+
+        self.assertEqual(cache.get("a"), (False, None))
+        self.assertTrue(cache.get("c")[0])
+        self.assertEqual(cache.get("huge"), (False, None))
+        self.assertLessEqual(cache.nbytes, 10_000)
+        cache.clear()
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_disk_tier_evicts_least_recently_used_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = StepCache(disk_path=tmp, disk_max_bytes=3000)
+            for i, key in enumerate(["aa1", "bb2", "cc3"]):
+                cache.set(key, b"x" * 800)
+                old = time.time() - 100 + i
+                os.utime(cache._disk_file(key), (old, old))
+            # Reading refreshes bb2, so aa1 is the one to go
+            self.assertTrue(StepCache(disk_path=tmp).get("bb2")[0])
+            cache.set("dd4", b"x" * 800)
+
+            fresh = StepCache(disk_path=tmp)
+            self.assertEqual(fresh.get("aa1"), (False, None))
+            self.assertTrue(fresh.get("bb2")[0])
+            self.assertTrue(fresh.get("dd4")[0])
+            self.assertLessEqual(sum(path.stat().st_size for path in Path(tmp).glob("*/*.pkl")), 3000)
+
+    async def test_concurrent_writers_of_one_key_do_not_collide(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = StepCache(disk_path=tmp)
+            await asyncio.gather(*(cache.aset("key", {"rows": list(range(50_000)), "n": n}) for n in range(8)))
+
+            hit, value = StepCache(disk_path=tmp).get("key")
+            self.assertTrue(hit)
+            self.assertEqual(len(value["rows"]), 50_000)
+            self.assertEqual(list(Path(tmp).glob("*/*.tmp")), [])
+
+    def test_expired_entries_are_misses(self):
+        cache = StepCache()
+        cache.set("key", 1, ttl=-1)
+        self.assertEqual(cache.get("key"), (False, None))
+
+    async def test_runtime_reuses_cached_results(self):
+        dsl = {
+            "metadata": {"name": "cached"},
+            "nodes": [
+                {"id": "a", "type": "test.counting", "config": {"text": "x"}},
+                {"id": "b", "type": "test.counting", "config": {"text": "y", "cache": False}},
+            ],
+            "edges": [],
+        }
+        plan = AIONCompiler().compile(dsl)
+        runtime = AIONRuntime(cache=StepCache())
+        CountingNode.calls = 0
+
+        first = await runtime.execute_plan(plan)
+        second = await runtime.execute_plan(plan)
+
+        self.assertEqual(first["results"]["step_a"], second["results"]["step_a"])
+        self.assertNotEqual(first["results"]["step_b"], second["results"]["step_b"])
+        self.assertEqual(CountingNode.calls, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
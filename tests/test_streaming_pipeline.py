@@ -0,0 +1,206 @@
+import csv
+import os
+import pickle
+import tempfile
+import unittest
+
+from compiler.compiler import AIONCompiler
+from nodes.core.table import Table
+from nodes.executive_intelligence_churn import ChurnModelPredictNode, CsvDataSourceNode, ExecutiveBriefNode
+from runtime.executor import AIONRuntime
+from runtime.incremental import ExecutionSnapshotStore
+
+
+class AgeModel:
+    """Picklable stand-in for a trained classifier: churn probability grows with age."""
+
+    feature_names_in_ = ["Age", "Balance"]
+
+    def predict_proba(self, matrix):
+        return [[1 - float(row[0]) / 100, float(row[0]) / 100] for row in matrix]
+
+
+def churn_dsl(csv_path: str, model_path: str, batch_size: int):
+    return {
+        "metadata": {"name": "churn-stream"},
+        "nodes": [
+            {"id": "csv", "type": "aion.nodes.csv_data_source", "config": {"path": csv_path, "batch_size": batch_size}},
+            {"id": "pii", "type": "aion.nodes.pii_redaction", "config": {"columns_to_drop": ["Surname"], "columns_to_hash": ["CustomerId"]}},
+            {"id": "fe", "type": "aion.nodes.feature_engineering_churn", "config": {}},
+            {"id": "predict", "type": "aion.nodes.churn_model_predict", "config": {"model_path": model_path}},
+        ],
+        "edges": [
+            {"id": "e1", "from": {"node": "csv", "port": "rows"}, "to": {"node": "pii", "port": "rows"}},
+            {"id": "e2", "from": {"node": "pii", "port": "rows"}, "to": {"node": "fe", "port": "rows"}},
+            {"id": "e3", "from": {"node": "fe", "port": "features"}, "to": {"node": "predict", "port": "features"}},
+        ],
+    }
+
+
+class TestStreamingPipeline(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp.name, "customers.csv")
+        self.model_path = os.path.join(self.tmp.name, "model.pkl")
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["CustomerId", "Surname", "Age", "Balance", "Geography", "Gender"])
+            for index in range(7):
+                writer.writerow([1000 + index, f"Name{index}", 20 + index * 10, 100.0, "France", "Male"])
+        with open(self.model_path, "wb") as handle:
+            pickle.dump(AgeModel(), handle)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_streaming_chain_is_pipelined_when_freeing_intermediates(self):
+        plan = AIONCompiler().compile(churn_dsl(self.csv_path, self.model_path, batch_size=3))
+        results = (await AIONRuntime().execute_plan(plan, free_intermediates=True))["results"]
+
+        self.assertEqual(results["step_predict"]["proba"], [0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8])
+        self.assertEqual(results["step_predict"]["label"], [0, 0, 0, 1, 1, 1, 1])
+        self.assertEqual(list(results), ["step_predict"])
+
+    async def test_readable_outputs_are_never_pipelined(self):
+        plan = AIONCompiler().compile(churn_dsl(self.csv_path, self.model_path, batch_size=3))
+        results = (await AIONRuntime().execute_plan(plan))["results"]
+
+        self.assertEqual(len(results["step_pii"]["rows"]), 7)
+        self.assertEqual(len(results["step_fe"]["features"]), 7)
+        self.assertNotIn("streamed_batches", results["step_csv"])
+        self.assertEqual(results["step_predict"]["proba"], [0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8])
+
+    async def test_non_streaming_consumer_gets_materialized_output(self):
+        dsl = churn_dsl(self.csv_path, self.model_path, batch_size=2)
+        dsl["nodes"].append({"id": "out", "type": "api.endpoint", "config": {}})
+        dsl["edges"].append({"id": "e4", "from": {"node": "fe", "port": "feature_map"}, "to": {"node": "out", "port": "result"}})
+        plan = AIONCompiler().compile(dsl)
+        results = (await AIONRuntime().execute_plan(plan))["results"]
+
+        self.assertEqual(len(results["step_fe"]["features"]), 7)
+        self.assertEqual(len(results["step_fe"]["feature_map"]), 13)
+        self.assertEqual(len(results["step_predict"]["proba"]), 7)
+
+    async def test_incremental_rerun_skips_unneeded_pipeline_stages(self):
+        dsl = churn_dsl(self.csv_path, self.model_path, batch_size=3)
+        dsl["metadata"]["incremental"] = True
+        plan = AIONCompiler().compile(dsl)
+        runtime = AIONRuntime(snapshots=ExecutionSnapshotStore(max_bytes=1 << 20))
+        await runtime.execute_plan(plan, snapshot_key="churn", free_intermediates=True)
+        second = await runtime.execute_plan(plan, snapshot_key="churn", free_intermediates=True)
+
+        self.assertEqual(second["reused_steps"], ["step_predict"])
+        self.assertEqual(second["skipped_steps"], ["step_csv", "step_pii", "step_fe"])
+        self.assertEqual(len(second["results"]["step_predict"]["proba"]), 7)
+
+    async def test_batch_execution_scores_every_item(self):
+        other_csv = os.path.join(self.tmp.name, "other.csv")
+        with open(other_csv, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["CustomerId", "Surname", "Age", "Balance", "Geography", "Gender"])
+            writer.writerow([2000, "Other", 90, 100.0, "Spain", "Female"])
+        dsl = churn_dsl(self.csv_path, self.model_path, batch_size=3)
+        del dsl["nodes"][0]["config"]["path"]
+        plan = AIONCompiler().compile(dsl)
+
+        batch = await AIONRuntime().execute_plan_batch(
+            plan, [{"path": self.csv_path}, {"path": other_csv}, {"path": os.path.join(self.tmp.name, "missing.csv")}]
+        )
+
+        self.assertEqual(batch["batch_size"], 3)
+        first, second, missing = batch["items"]
+        self.assertEqual(first["results"]["step_predict"]["proba"], [0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8])
+        self.assertEqual(second["results"]["step_predict"]["label"], [1])
+        self.assertEqual(missing["status"], "failed")
+
+    async def test_csv_reader_selects_infers_and_limits(self):
+        node = CsvDataSourceNode({
+            "path": self.csv_path, "batch_size": 2, "columns": ["Age", "CustomerId", "Surname"], "limit": 5, "infer_types": True,
+        })
+        batches = [batch["rows"] async for batch in node.stream({})]
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(batches[0].column_names, ["Age", "CustomerId", "Surname"])
+        self.assertEqual(batches[0].schema, {"Age": "int64", "CustomerId": "int64", "Surname": "object"})
+        self.assertEqual((await node.execute({}))["rows"].column("Age").tolist(), [20, 30, 40, 50, 60])
+
+        missing = await CsvDataSourceNode({"path": self.csv_path, "columns": ["Nope"]}).execute({})
+        self.assertIn("Nope", missing["error"])
+
+    async def test_type_inference_is_off_by_default_and_lossless(self):
+        path = os.path.join(self.tmp.name, "ids.csv")
+        with open(path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["Id", "Signed", "Sci", "Price", "Count"])
+            writer.writerow(["12345678901234567", "+5", "1e3", "0.10", "1"])
+            writer.writerow(["", "6", "2", "0.25", "2"])
+            writer.writerow(["12345678901234568", "7", "3", "1.5", "x"])
+
+        raw = (await CsvDataSourceNode({"path": path}).execute({}))["rows"]
+        self.assertEqual(raw.column("Count").tolist(), ["1", "2", "x"])
+
+        inferred = await CsvDataSourceNode({"path": path, "infer_types": True, "batch_size": 2}).execute({})
+        rows = inferred["rows"]
+        self.assertEqual(rows.column("Id").tolist(), ["12345678901234567", "", "12345678901234568"])
+        # Once a batch settles a column on text, later batches stay text too
+        self.assertEqual(rows.column("Signed").tolist(), ["+5", "6", "7"])
+        self.assertEqual(rows.column("Sci").tolist(), ["1e3", "2", "3"])
+        self.assertEqual(rows.column("Price").tolist(), ["0.10", "0.25", "1.5"])
+        # Locked to int by the first batch; the non-numeric batch stays text instead of widening
+        self.assertEqual(rows.column("Count").tolist(), [1, 2, "x"])
+
+    async def test_predict_scores_in_parallel_batches(self):
+        node = ChurnModelPredictNode({"model_path": self.model_path, "batch_size": 3, "workers": 2})
+        features = Table({"Age": [20.0 + index * 10 for index in range(7)], "Balance": [100.0] * 7})
+
+        result = await node.execute({"features": features})
+
+        self.assertEqual(result["proba"], [0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8])
+        self.assertEqual(result["label"], [0, 0, 0, 1, 1, 1, 1])
+
+    async def test_brief_aggregates_streamed_predictions(self):
+        dsl = churn_dsl(self.csv_path, self.model_path, batch_size=3)
+        dsl["nodes"].append({"id": "brief", "type": "aion.nodes.executive_brief", "config": {}})
+        dsl["edges"].append({"id": "e4", "from": {"node": "predict", "port": "proba"}, "to": {"node": "brief", "port": "proba"}})
+        results = (await AIONRuntime().execute_plan(AIONCompiler().compile(dsl), free_intermediates=True))["results"]
+
+        overall = results["step_brief"]["risk_summary"]["overall"]
+        # Pipelined: the predictions went straight into the brief
+        self.assertNotIn("step_predict", results)
+        self.assertEqual((overall["count"], overall["above_threshold"]), (7, 4))
+        self.assertAlmostEqual(overall["mean"], 0.5)
+        self.assertAlmostEqual(overall["quantiles"]["p50"], 0.5, places=2)
+
+    async def test_brief_groups_by_metadata(self):
+        metadata = Table({"geography": ["France", "Spain", "France", None], "gender": ["Male"] * 4})
+        result = await ExecutiveBriefNode({"risk_threshold": 0.5}).execute(
+            {"proba": [0.2, 0.9, 0.6, 0.1], "metadata": metadata}
+        )
+
+        by_geography = result["risk_summary"]["by_geography"]
+        self.assertEqual(sorted(by_geography), ["France", "Spain", "unknown"])
+        self.assertAlmostEqual(by_geography["France"]["mean"], 0.4)
+        self.assertEqual(by_geography["France"]["above_threshold"], 1)
+        self.assertEqual(result["risk_summary"]["by_gender"]["Male"]["count"], 4)
+        self.assertIn("Spain", result["executive_brief"])
+
+    async def test_brief_keeps_raw_scores_outside_the_unit_range(self):
+        # e.g. a model with only predict(): raw margins rather than probabilities
+        scores = [-2.0, 0.25, 0.75, 3.0]
+        with self.assertLogs("nodes.executive_intelligence_churn", level="WARNING"):
+            result = await ExecutiveBriefNode({"risk_threshold": 0.5}).execute({"proba": scores})
+
+        overall = result["risk_summary"]["overall"]
+        self.assertAlmostEqual(overall["mean"], 0.5)
+        self.assertEqual((overall["min"], overall["max"]), (-2.0, 3.0))
+        self.assertEqual((overall["above_threshold"], overall["out_of_range"]), (2, 2))
+
+    async def test_missing_model_fails_without_hanging(self):
+        plan = AIONCompiler().compile(churn_dsl(self.csv_path, os.path.join(self.tmp.name, "missing.pkl"), batch_size=1))
+        results = (await AIONRuntime().execute_plan(plan, max_concurrency=1))["results"]
+
+        self.assertIn("error", results["step_predict"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import io
+import json
+import logging
+import unittest
+
+from runtime.structured_logging import (
+    configure_logging,
+    execution_id_var,
+    execution_sampled_var,
+    is_sampled,
+    shutdown_logging,
+    summarize,
+)
+
+
+class TestStructuredLogging(unittest.TestCase):
+    def tearDown(self):
+        shutdown_logging()
+
+    def test_summarize_does_not_expand_large_values(self):
+        result = {"rows": [{"id": i} for i in range(100_000)], "content": "x" * 1000, "count": 3}
+        summary = summarize(result)
+
+        self.assertEqual(summary["rows"], "<list len=100000>")
+        self.assertTrue(summary["content"].endswith("<len=1000>"))
+        self.assertEqual(summary["count"], 3)
+
+    def test_sampling_is_deterministic_per_execution(self):
+        self.assertTrue(is_sampled("exec-1", 1.0))
+        self.assertFalse(is_sampled("exec-1", 0.0))
+        self.assertEqual(is_sampled("exec-1", 0.5), is_sampled("exec-1", 0.5))
+
+    def test_records_are_json_and_unsampled_info_is_dropped(self):
+        stream = io.StringIO()
+        configure_logging(level="INFO", stream=stream)
+        logger = logging.getLogger("aion.test")
+
+        token = execution_id_var.set("exec-1")
+        logger.info("kept", extra={"fields": {"rows": 3}})
+        sampled_token = execution_sampled_var.set(False)
+        logger.info("dropped")
+        logger.warning("warnings always pass")
+        execution_sampled_var.reset(sampled_token)
+        execution_id_var.reset(token)
+        shutdown_logging()
+
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual([record["message"] for record in records], ["kept", "warnings always pass"])
+        self.assertEqual(records[0]["execution_id"], "exec-1")
+        self.assertEqual(records[0]["rows"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
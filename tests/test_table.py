@@ -0,0 +1,89 @@
+import hashlib
+import json
+import pickle
+import unittest
+
+import numpy as np
+
+from nodes.core.table import Table, content_digest, json_default
+from nodes.executive_intelligence_churn import FeatureEngineeringChurnNode, PIIRedactionNode
+
+
+def sha(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TestTable(unittest.IsolatedAsyncioTestCase):
+    def test_append_null_fills_and_round_trips(self):
+        table = Table.from_rows([{"a": 1, "b": "x"}])
+        table.append(Table({"a": [2], "c": [3.5]}))
+
+        self.assertEqual(table.column_names, ["a", "b", "c"])
+        self.assertEqual(table.to_rows(), [
+            {"a": 1, "b": "x", "c": None},
+            {"a": 2, "b": None, "c": 3.5},
+        ])
+        self.assertEqual(pickle.loads(pickle.dumps(table)).to_rows(), table.to_rows())
+        self.assertEqual(json.loads(json.dumps({"t": table}, default=json_default))["t"], table.to_rows())
+
+    def test_columns_only_use_native_dtypes_losslessly(self):
+        mixed = Table.from_rows([{"amt": 2}, {"amt": 2.5}])
+        self.assertEqual(mixed.column("amt").tolist(), [2, 2.5])
+        self.assertIs(type(mixed.column("amt")[0]), int)
+
+        big = Table({"id": [10**17 + 1, 10**17 + 2], "huge": [2**63, 1]})
+        self.assertEqual(big.column("id").dtype, np.int64)
+        self.assertEqual(big.column("id").tolist(), [10**17 + 1, 10**17 + 2])
+        self.assertEqual(big.column("huge").tolist(), [2**63, 1])
+
+        self.assertEqual(Table({"x": [1.0, 2.5]}).column("x").dtype, np.float64)
+        self.assertEqual(Table({"x": [True, False]}).column("x").dtype, np.bool_)
+        self.assertEqual(Table({"x": [1, None]}).column("x").tolist(), [1, None])
+
+    async def test_mixed_numbers_hash_like_the_row_dicts(self):
+        rows = [{"amt": 2}, {"amt": 2.5}]
+        redacted, _, _ = await PIIRedactionNode({"columns_to_hash": ["amt"]})._redact(Table.from_rows(rows), set())
+        self.assertEqual(redacted.column("amt").tolist(), [sha(str(row["amt"])) for row in rows])
+
+    def test_content_digest_follows_values(self):
+        first = Table({"x": np.array([1.0, 2.0])})
+        self.assertEqual(content_digest(first), content_digest(Table({"x": [1.0, 2.0]})))
+        self.assertNotEqual(content_digest(first), content_digest(Table({"x": [1.0, 3.0]})))
+
+    async def test_tabular_nodes_exchange_tables(self):
+        rows = [
+            {"CustomerId": "1", "Surname": "A", "Age": "30", "Geography": "Spain", "Gender": "Female"},
+            {"CustomerId": None, "Surname": "B", "Age": "", "Geography": "France", "Gender": "Male"},
+        ]
+        pii = PIIRedactionNode({"columns_to_drop": ["Surname"], "columns_to_hash": ["CustomerId"]})
+        redacted = await pii.execute({"rows": rows})
+
+        self.assertIsInstance(redacted["rows"], Table)
+        self.assertNotIn("Surname", redacted["rows"])
+        self.assertEqual(redacted["governance_report"]["hashed_count"], 1)
+
+        features = (await FeatureEngineeringChurnNode({}).execute({"rows": redacted["rows"]}))["features"]
+        self.assertEqual(features.schema["Age"], "float32")
+        self.assertEqual(features.column("Age").tolist(), [30.0, 0.0])
+        self.assertEqual(features.column("Geography_Spain").tolist(), [1.0, 0.0])
+        matrix = features.to_matrix(FeatureEngineeringChurnNode.FEATURE_ORDER, dtype=np.float32)
+        self.assertTrue(np.shares_memory(matrix, features.column("Age")))
+        self.assertEqual(matrix.shape, (2, 13))
+        self.assertEqual(features.to_matrix(["Age", "Missing"]).tolist(), [[30.0, 0.0], [0.0, 0.0]])
+
+    async def test_text_columns_parse_like_cell_by_cell(self):
+        columns = {
+            "Age": ["30", " 41 ", None, "", "2.5"],
+            "Balance": ["1", "  ", "3", "4", "5"],
+            "Tenure": ["1", "x", "3", None, "5"],
+            "CreditScore": [1, 2.5, "3", None, "7"],
+        }
+        features = (await FeatureEngineeringChurnNode({}).execute({"rows": Table(columns)}))["features"]
+
+        for name, cells in columns.items():
+            expected = [FeatureEngineeringChurnNode._to_float(cell) for cell in cells]
+            self.assertEqual(features.column(name).tolist(), expected, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
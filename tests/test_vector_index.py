@@ -0,0 +1,101 @@
+import multiprocessing
+import tempfile
+import unittest
+
+import numpy as np
+
+from nodes.core.rag import EmbedNode, RetrieveNode, VectorStoreNode
+from nodes.core.vector_index import VectorStoreRegistry, vector_stores
+
+
+def unit_vectors(count, dimension, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _write_rows(root, prefix, seed):
+    # Interleaved small upserts, so the two processes' writes overlap
+    index = VectorStoreRegistry(root).open("shared-store")
+    vectors = unit_vectors(200, 8, seed=seed)
+    totals = [0, 0]
+    for start in range(0, 200, 10):
+        hashes = [f"{prefix}{row}" for row in range(start, start + 10)]
+        inserted, updated = index.upsert(hashes, vectors[start:start + 10], hashes)
+        totals[0] += inserted
+        totals[1] += updated
+    return tuple(totals)
+
+
+class TestVectorIndex(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_upsert_dedupes_deletes_and_persists(self):
+        vectors = unit_vectors(5, 8)
+        index = VectorStoreRegistry(self.tmp.name).open("docs-store", 8)
+        self.assertEqual(index.upsert(["a", "b", "c", "a"], vectors[:4], ["A", "B", "C", "A2"]), (3, 0))
+        self.assertEqual(index.upsert(["c", "d"], vectors[[2, 4]], ["C", "D"]), (1, 1))
+        self.assertEqual(index.delete(["b", "missing"]), 1)
+
+        reopened = VectorStoreRegistry(self.tmp.name).open("docs-store")
+        self.assertEqual(len(reopened), 3)
+        hits = reopened.search(vectors[3], k=2)
+        self.assertEqual((hits[0]["hash"], hits[0]["content"]), ("a", "A2"))
+        self.assertAlmostEqual(hits[0]["score"], 1.0, places=5)
+        self.assertNotIn("b", [hit["hash"] for hit in reopened.search(vectors[1], k=5)])
+
+        with self.assertRaises(ValueError):
+            reopened.upsert(["e"], unit_vectors(1, 4))
+        with self.assertRaises(FileNotFoundError):
+            VectorStoreRegistry(self.tmp.name).open("other-store")
+
+    def test_concurrent_writers_from_separate_processes(self):
+        VectorStoreRegistry(self.tmp.name).open("shared-store", 8)
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(2) as pool:
+            results = pool.starmap(_write_rows, [(self.tmp.name, "a", 0), (self.tmp.name, "b", 1)])
+
+        self.assertEqual(results, [(200, 0), (200, 0)])
+        reopened = VectorStoreRegistry(self.tmp.name).open("shared-store")
+        self.assertEqual(len(reopened), 400)
+        vectors = unit_vectors(200, 8, seed=1)
+        hit = reopened.search(vectors[7], k=1)[0]
+        self.assertEqual((hit["hash"], hit["content"]), ("b7", "b7"))
+
+    def test_ivf_search_matches_exact_search(self):
+        index = VectorStoreRegistry(self.tmp.name).open("big-store", 16)
+        centers = unit_vectors(20, 16, seed=1)
+        vectors = centers[np.arange(4000) % 20] + 0.05 * unit_vectors(4000, 16, seed=2)
+        hashes = [str(i) for i in range(4000)]
+        index.upsert(hashes[:3000], vectors[:3000], ivf_min_rows=2000)
+        self.assertIsNotNone(index.centroids)
+        # Rows written after training are searchable before the lists are regrouped
+        index.upsert(hashes[3000:], vectors[3000:], ivf_min_rows=2000)
+
+        for row in (5, 3500):
+            approximate = index.search(vectors[row], k=5, nprobe=4)
+            exact = index.search(vectors[row], k=5, exact=True)
+            self.assertEqual(approximate[0]["hash"], str(row))
+            self.assertEqual([hit["hash"] for hit in approximate], [hit["hash"] for hit in exact])
+
+    async def test_nodes_index_and_retrieve_chunks(self):
+        vector_stores.configure(self.tmp.name)
+        self.addCleanup(vector_stores.configure, "vector_stores")
+        chunks = ["churn risk rises in the south region", "quarterly revenue grew", "customer retention program"]
+        embedded = await EmbedNode({}).execute({"chunks": chunks})
+        store = VectorStoreNode({"index": "kb"})
+
+        first = await store.execute({key: embedded[key] for key in ("embeddings", "chunks", "hashes", "model")})
+        self.assertEqual((first["store_id"], first["inserted"], first["size"]), ("kb-store", 3, 3))
+        again = await store.execute({"embedder": embedded, "delete": [embedded["hashes"][1]]})
+        self.assertEqual((again["inserted"], again["updated"], again["deleted"], again["size"]), (0, 3, 1, 2))
+
+        result = await RetrieveNode({"top_k": 1}).execute({"store_id": "kb-store", "query": "churn risk in the south"})
+        self.assertEqual([doc["content"] for doc in result["documents"]], [chunks[0]])
+        missing = await RetrieveNode({}).execute({"store_id": "nope-store", "query": "x"})
+        self.assertIn("error", missing)
+
+
+if __name__ == "__main__":
+    unittest.main()